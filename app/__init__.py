@@ -1,9 +1,10 @@
 from ucmexport import *
+from ucmexport.objects.linetable import KIND_PHONE
 from user_dependency_graph import UserGraph
 import logging
 from typing import List, Dict, Set, Tuple, Iterable, Optional
-from itertools import chain
-from collections import defaultdict, Counter, namedtuple
+from itertools import chain, islice
+from collections import defaultdict, Counter
 import plotly.graph_objects as go
 import plotly.express as px
 import digit_analysis
@@ -157,6 +158,15 @@ class App:
         self.only_new_relations = False
         self.user_graph: Optional[UserGraph] = None
 
+    def first_line_css_combinations(self) -> Dict[Tuple[str, str], int]:
+        """
+        Combinations of line CSS and device CSS on the first lines of all phones
+        :return: number of phones for each (line CSS, device CSS) combination
+        """
+        line_table = self.proxy.line_table
+        return line_table.group_counts(('css', 'device_css'),
+                                       rows=line_table.first_lines() & line_table.rows(kind=KIND_PHONE))
+
     @menu_register('Switch tar file')
     def menu_switch_tar_file(self):
         self.user_graph = None
@@ -291,9 +301,8 @@ class App:
 
     @menu_register('Supported vs. unsupported phones for migration')
     def menu_supported_phones(self):
-        phones = self.proxy.phones.list
         # we can ignore phones with certain device types
-        relevant_phones = [phone for phone in phones if phone.device_type not in self.ANONYMOUS_DEVICE_TYPES]
+        relevant_phones = self.proxy.query(Phone).where(device_type__not_in=self.ANONYMOUS_DEVICE_TYPES).all()
 
         sb = SunBurstHelper()
         sb_data = {
@@ -462,15 +471,11 @@ class App:
 
     @menu_register('External phone number masks')
     def menu_external_phone_number_masks(self):
-        phones_by_mask: Dict[str, List[Phone]] = defaultdict(list)
-        for phone in self.proxy.phones.list:
-            line = next((line for line in phone.lines.values()), None)
-            if not line:
-                continue
-            mask = line.external_phone_number_mask
-            if not mask:
-                continue
-            phones_by_mask[mask].append(phone)
+        # external phone number masks on the first lines of all phones
+        line_table = self.proxy.line_table
+        phones_by_mask: Dict[str, List[Phone]] = line_table.group_devices(
+            'external_phone_number_mask', rows=line_table.first_lines() & line_table.rows(kind=KIND_PHONE))
+        phones_by_mask.pop('', None)
         sb = SunBurstHelper()
         root = sb.add_entry(parent_id='', label='External Phone Number Masks')
         for mask in sorted(phones_by_mask):
@@ -487,73 +492,54 @@ class App:
         get all DNs of all 1st lines of all phones and analyze the structure
         :return: None
         """
-        DNP = namedtuple('DNP', ['dn', 'partition'])
-        dnps = [DNP._make((line1.directory_number, line1.partition))
-                for phone in self.proxy.phones.list
-                if (line1 := phone.lines.get(1))]
+        # prefix tries over the DNs of all 1st lines: all DNs and per partition
+        tries = self.proxy.phones.dn_tries(line_index=1)
 
-        def do_analysis(dnps: List[DNP]):
+        def do_analysis(trie: DnTrie):
             """
             Analysis of a set of DNs
-            :param dnps:
+            :param trie: prefix trie of the DNs
             :return:
             """
-            # group DNs by len
-            dn_by_len: Dict[int, List[str]] = defaultdict(list)
-            for dnp in dnps:
-                dn_by_len[len(dnp.dn)].append(dnp.dn)
-
-            DNCluster = namedtuple('DNCluster', ['prefix', 'dns'])
 
-            def find_clusters(prefix: str, digit_strings: List[str], total_count=None) -> List[Tuple[str, List[str]]]:
+            def find_clusters(dn_len: int, prefix: str = '', total_count=None):
                 if not prefix:
-                    total_count = len(digit_strings)
-                if len(digit_strings[0]) <= 1:
-                    return []
-
-                # determine DNs per next level digit
-                first_digits = set()
-                next_level_dns: Dict[str, List[str]] = defaultdict(set)
-                for ds in digit_strings:
-                    first_digit = ds[0]
-                    first_digits.add(first_digit)
-                    next_level_dns[first_digit].add(ds[1:])
-                first_digits = sorted(first_digits)
-                total_count /= len(first_digits)
-                for fd in first_digits:
-                    nld = sorted(next_level_dns[fd])[:10]
-                    output = [f'{prefix}{fd}-{ds}' for ds in nld]
-                    if len(next_level_dns[fd]) > 10:
+                    total_count = trie.count(length=dn_len)
+                if dn_len - len(prefix) <= 1:
+                    return
+
+                # number of distinct DNs per next level digit
+                next_level_counts = trie.children(prefix, length=dn_len, distinct=True)
+                total_count /= len(next_level_counts)
+                # remaining digits after the next level digit
+                remaining_length = dn_len - len(prefix) - 1
+                for fd, count in next_level_counts.items():
+                    nld = list(islice(trie.numbers(f'{prefix}{fd}', length=dn_len), 10))
+                    output = [f'{prefix}{fd}-{ds[len(prefix) + 1:]}' for ds in nld]
+                    if count > 10:
                         output.append('...')
-                    remaining_length = len(next(dn for dn in next_level_dns[fd]))
                     density = 9 ** remaining_length
 
                     print(
-                        f'prefix {prefix}-{fd}: {int(total_count)} {len(next_level_dns[fd])}/{density} digit strings: '
+                        f'prefix {prefix}-{fd}: {int(total_count)} {count}/{density} digit strings: '
                         f'{", ".join(output)}')
-                for fd in first_digits:
-                    find_clusters(prefix=f'{prefix}{fd}', digit_strings=list(next_level_dns[fd]),
-                                  total_count=total_count)
+                for fd in next_level_counts:
+                    find_clusters(dn_len, prefix=f'{prefix}{fd}', total_count=total_count)
 
-                return []
-
-            for dn_len in dn_by_len:
+            for dn_len in trie.lengths():
                 print(f'  len({dn_len}):')
-                find_clusters('', dn_by_len[dn_len])
-            return []
+                find_clusters(dn_len)
 
         # analysis of all DNS
         print('All DNs')
-        do_analysis(dnps)
-
-        dn_by_partition: Dict[str, List[DNP]] = defaultdict(list)
-        for dnp in dnps:
-            dn_by_partition[dnp.partition].append(dnp)
+        do_analysis(tries[None])
 
         # analysis by partition
-        for partition in dn_by_partition:
+        for partition, trie in tries.items():
+            if partition is None:
+                continue
             print(f'Partition \'{partition}\'')
-            do_analysis(dn_by_partition[partition])
+            do_analysis(trie)
 
     @menu_register('Find Locations based on users phone numbers')
     def menu_locations_based_on_users_phones(self):
@@ -566,9 +552,7 @@ class App:
         print(f'                       # of phones: {len(self.proxy.phones.list)}')
 
         # Ignore "anonymous" phones
-        relevant_phones = [phone
-                           for phone in self.proxy.phones.list
-                           if phone.device_type not in self.ANONYMOUS_DEVICE_TYPES]
+        relevant_phones = self.proxy.query(Phone).where(device_type__not_in=self.ANONYMOUS_DEVICE_TYPES).all()
         print(f'              w/o anonymous phones: {len(relevant_phones)}')
 
         # ignore phones w/o users or with multiple users
@@ -610,65 +594,60 @@ class App:
                 dn = 'no line!'
             print(f'{phone.device_name:{device_name_len}} {user_id:{uid_len}} {user_phone_number} {dn}')
 
-        dns = [line1.directory_number for phone in relevant_phones if (line1 := phone.lines.get(1))]
-        dns_by_len: Dict[int, List[str]] = defaultdict(list)
-        for dn in dns:
-            dns_by_len[len(dn)].append(dn)
+        trie = DnTrie(line1.directory_number for phone in relevant_phones if (line1 := phone.lines.get(1)))
 
-        for dn_len, dns_work in dns_by_len.items():
-            print(f'len {dn_len}: {len(dns_work)}')
+        for dn_len in trie.lengths():
+            print(f'len {dn_len}: {trie.count(length=dn_len)}')
 
             for prefix_len in range(1, dn_len + 1):
-                prefixes = sorted(list(set(dn[:prefix_len] for dn in dns_work)))
+                prefixes = trie.prefixes(prefix_len, length=dn_len)
                 if len(prefixes) > 15:
                     prefixes_output = prefixes[:15] + ['...']
                 else:
                     prefixes_output = prefixes
                 print(f'  len {prefix_len}: {len(prefixes)} prefixes: {", ".join(prefixes_output)}')
 
-        def search_location_prefixes(dn_len, prefix_len, dns):
-            prefixes = sorted(list(set(dn[:prefix_len] for dn in dns)))
+        def search_location_prefixes(dn_len, prefix_len):
+            prefixes = trie.prefixes(prefix_len, length=dn_len)
 
             pass
 
-        for dn_len, dns_work in dns_by_len.items():
-            search_location_prefixes(dn_len=dn_len, prefix_len=1, dns=dns_work)
+        for dn_len in trie.lengths():
+            search_location_prefixes(dn_len=dn_len, prefix_len=1)
 
     @menu_register('Sankey Diagram of DNs')
     def menu_sankey_dn(self):
-        # get all DNs from the 1st line of all phones
-        dns = [line1.directory_number
-               for phone in self.proxy.phones.list
-               if (line1 := phone.lines.get(1))]
+        # prefix trie of all DNs from the 1st line of all phones
+        trie = self.proxy.phones.dn_trie(line_index=1)
 
         node_label = []
         links_source = []
         link_target = []
         link_value = []
 
-        def add_to_sankey(numbers: List[str], parent_node_id: int = None):
-            first_digits = sorted(set(n[0] for n in numbers))
-            for first_digit in first_digits:
+        def add_to_sankey(prefix: str = '', parent_node_id: int = None):
+            for first_digit in trie.children(prefix):
                 node_id = len(node_label)
                 label = first_digit
                 if parent_node_id is not None:
                     label = f'{node_label[parent_node_id].strip("X")}{label}'
-                # noinspection PyUnboundLocalVariable
-                next_level_numbers = [s for n in numbers if n[0] == first_digit and (s := n[1:])]
-                if not next_level_numbers:
+                next_prefix = f'{prefix}{first_digit}'
+                # numbers continuing after the next digit
+                next_level_count = trie.count(next_prefix) - trie.count(next_prefix, length=len(next_prefix))
+                if not next_level_count:
                     node_label.append(label)
                     continue
-                max_len = max(map(len, next_level_numbers))
+                max_len = max(trie.lengths(next_prefix)) - len(next_prefix)
                 node_label.append(f'{label}{"X" * max_len}')
                 if max_len < 2:
                     continue
-                if next_level_numbers and parent_node_id is not None:
+                if parent_node_id is not None:
                     links_source.append(parent_node_id)
                     link_target.append(node_id)
-                    link_value.append(len(next_level_numbers))
-                add_to_sankey(next_level_numbers, parent_node_id=node_id)
+                    link_value.append(next_level_count)
+                add_to_sankey(next_prefix, parent_node_id=node_id)
 
-        add_to_sankey(numbers=dns)
+        add_to_sankey()
         fig = go.Figure(data=[go.Sankey(
             node=dict(
                 pad=15,
@@ -713,16 +692,14 @@ class App:
 
     @menu_register('CSS Combinations on first lines')
     def menu_css_combinations(self):
-        css_combinations = Counter((first_line.css, phone.css)
-                                   for phone in self.proxy.phones.list
-                                   if (first_line := next(iter(phone.lines.values()), None)))
+        css_combinations = self.first_line_css_combinations()
         frequency_len = len(f'{max(css_combinations.values())}')
         css_len = max(len(f'{", ".join(css_combination)}') for css_combination in css_combinations)
         for css_combination in sorted(css_combinations,
                                       key=lambda x: css_combinations[x],
                                       reverse=True):
             frequency = css_combinations[css_combination]
-            combined_partitions = list(chain.from_iterable(map(self.proxy.css.partition_names, css_combination)))
+            combined_partitions = self.proxy.css_graph.combined_partitions(*css_combination, strict=True)
             print(
                 f'frequency: {frequency:{frequency_len}}: {", ".join(css_combination):{css_len}} -> '
                 f'{":".join(combined_partitions)}')
@@ -736,16 +713,13 @@ class App:
         # - look out for blocking TPs
 
         # get CSS combinations on phones
-        # noinspection PyShadowingNames
-        css_count = Counter((first_line.css, phone.css)
-                            for phone in self.proxy.phones.list
-                            if (first_line := next(iter(phone.lines.values()), None)))
+        css_count = self.first_line_css_combinations()
 
         css_combinations = sorted(css_count, key=lambda c: css_count[c], reverse=True)
         for line_css_name, device_css_name in css_combinations:
             print(f'Looking at line_css:device_css: {line_css_name}:{device_css_name}')
-            combined_partitions = list(chain(self.proxy.css.partition_names(line_css_name),
-                                             self.proxy.css.partition_names(device_css_name)))
+            combined_partitions = list(self.proxy.css_graph.combined_partitions(line_css_name, device_css_name,
+                                                                                strict=True))
             # add <NONE> partition at the end if not already present somewhere in the partition list
             if next((p for p in combined_partitions if not p), None) is None:
                 print(f'appending NONE partition')
@@ -785,15 +759,13 @@ class App:
         pattern and then see if that transformed digit string can hit DNs """
         da_tree = digit_analysis.DaNode.from_proxy(self.proxy)
 
-        css_count = Counter((first_line.css, phone.css)
-                            for phone in self.proxy.phones.list
-                            if (first_line := next(iter(phone.lines.values()), None)))
+        css_count = self.first_line_css_combinations()
 
         css_combinations = sorted(css_count, key=lambda c: css_count[c], reverse=True)
         for line_css_name, device_css_name in css_combinations:
             print(f'Looking at line_css:device_css: {line_css_name}+{device_css_name}')
-            combined_partitions = list(chain(self.proxy.css.partition_names(line_css_name),
-                                             self.proxy.css.partition_names(device_css_name)))
+            combined_partitions = list(self.proxy.css_graph.combined_partitions(line_css_name, device_css_name,
+                                                                                strict=True))
             # add <NONE> partition at the end if not already present somewhere in the partition list
             if next((p for p in combined_partitions if not p), None) is None:
                 print(f'appending NONE partition')
@@ -824,11 +796,11 @@ class App:
         print('Hunt pilots:')
         for hp in hunt_pilots:
             phones = hp.phones_or_device_profiles(hunt_pilot_container=self.proxy.hunt_pilot,
-                                                  container=self.proxy.phones)
+                                                  container=self.proxy.phones, as_row_set=True)
             device_profiles = hp.phones_or_device_profiles(hunt_pilot_container=self.proxy.hunt_pilot,
-                                                           container=self.proxy.device_profile)
-            phones |= device_profiles
-            print(f'{hp.pilot_and_partition}{"" if phones else " (no phones)"}, {hp.description}, hunt lists: '
+                                                           container=self.proxy.device_profile, as_row_set=True)
+            has_phones = phones or device_profiles
+            print(f'{hp.pilot_and_partition}{"" if has_phones else " (no phones)"}, {hp.description}, hunt lists: '
                   f'{", ".join(f"{hl}" for hl in hp.hunt_lists)}')
 
         # list hunt lists
@@ -837,24 +809,23 @@ class App:
         print('Hunt Lists')
         for hl in hunt_lists:
             phones = hl.phones_or_device_profiles(hunt_list_container=self.proxy.hunt_list,
-                                                  container=self.proxy.phones)
+                                                  container=self.proxy.phones, as_row_set=True)
             device_profiles = hl.phones_or_device_profiles(hunt_list_container=self.proxy.hunt_list,
-                                                           container=self.proxy.device_profile)
-            phones |= device_profiles
+                                                           container=self.proxy.device_profile, as_row_set=True)
+            has_phones = phones or device_profiles
             members = hl.members
             members.sort(key=lambda m: m.selection_order)
-            print(f'{hl.name}{"" if phones else " (no phones)"}, {hl.description}, '
+            print(f'{hl.name}{"" if has_phones else " (no phones)"}, {hl.description}, '
                   f'members: {", ".join(f"{m}" for m in hl.members)}')
-        users_by_pe: Dict[str, List[EndUser]] = self.proxy.end_user.by_attribute('primary_extension')
-        users_by_pe.pop(None, None)
+        references = self.proxy.references
         line_groups = self.proxy.line_group.list
         print()
         print('Line Groups')
         for line_group in line_groups:
-            phones = line_group.phones_or_device_profiles(container=self.proxy.phones)
-            device_profiles = line_group.phones_or_device_profiles(container=self.proxy.device_profile)
-            phones |= device_profiles
-            if not phones:
+            phones = line_group.phones_or_device_profiles(container=self.proxy.phones, as_row_set=True)
+            device_profiles = line_group.phones_or_device_profiles(container=self.proxy.device_profile,
+                                                                   as_row_set=True)
+            if not (phones or device_profiles):
                 # skip line groups w/o phones
                 continue
             print(f'Line group "{line_group.name}"')
@@ -864,12 +835,11 @@ class App:
             for lg_member in lg_members:
                 dnp = lg_member.pattern_and_partition
                 print(f'  {lg_member.selection_order}) DN: {dnp}', end='')
-                users_pe = users_by_pe.get(dnp)
+                users_pe = references.objects(dnp, role=ROLE_PRIMARY_EXTENSION)
                 if users_pe:
                     print(f', primary extension for user(s) {", ".join(f"{u.user_id}" for u in users_pe)}', end='')
-                phones = self.proxy.phones.by_dn_and_partition.get(dnp, set())
-                device_profiles = self.proxy.device_profile.by_dn_and_partition.get(dnp, set())
-                phones |= device_profiles
+                # phones and device profiles with the DN on a line
+                phones = references.objects(dnp, role=ROLE_LINE)
                 if phones:
                     print(', phones or device profiles: ', end='')
                     owners: List[List[str]] = []  # list of owners per phone
@@ -895,7 +865,8 @@ class App:
                 """
 
                 print(f' DNs: {", ".join(members)}')
-                users = list(chain.from_iterable(users_by_pe.get(m, []) for m in members))
+                users = list(chain.from_iterable(references.objects(m, role=ROLE_PRIMARY_EXTENSION)
+                                                 for m in members))
                 users.sort()
                 if users:
                     print(f' Users by primary extension: {", ".join(u.user_id for u in users)}')
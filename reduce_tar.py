@@ -15,16 +15,14 @@ from itertools import chain
 from tarfile import TarFile
 
 from dotenv import load_dotenv
+from tqdm import tqdm
 
 
-def progress(items):
-    print(f'reading ', end='', flush=True)
-    i = 0
-    for i, e in enumerate(items):
-        if i % 200 == 0:
-            print('.', end='', flush=True)
-        yield e
-    print(f', got {i + 1} records')
+def progress(items, desc: str = 'reading'):
+    """
+    Progress bar with throughput for records read
+    """
+    return tqdm(items, desc=desc, unit=' records', mininterval=0.5)
 
 
 def column_repr(columns: Iterable[str]) -> str:
@@ -89,7 +87,7 @@ def evaluate():
         # try to identify empty columns
         col_usage: dict[str, set[str]] = defaultdict(set)
         key_field = 'USER ID'
-        for row_number, row in enumerate(progress(csv_reader)):
+        for row_number, row in enumerate(progress(csv_reader, desc=f'reading {csv_file}')):
             key = row[key_field]
             for col in (col for col, value in row.items() if value):
                 col_usage[col].add(key)
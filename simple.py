@@ -2,8 +2,12 @@ from ucmexport import Proxy
 
 if __name__ == '__main__':
     proxy = Proxy('sample.tar')
-    phones = proxy.phones.list
-    print(f'{len(phones)} phones in TAR')
-    phones_w_multiple_lines = [phone for phone in phones
-                               if len(phone.lines)> 1]
-    print(f'{len(phones_w_multiple_lines)} phones with multiple lines')
\ No newline at end of file
+    # single pass over the phones; phones are not kept in memory
+    phones = 0
+    phones_w_multiple_lines = 0
+    for phone in proxy.stream('phones'):
+        phones += 1
+        if len(phone.lines) > 1:
+            phones_w_multiple_lines += 1
+    print(f'{phones} phones in TAR')
+    print(f'{phones_w_multiple_lines} phones with multiple lines')
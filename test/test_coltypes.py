@@ -0,0 +1,88 @@
+from unittest import TestCase
+from test import TAR_FILE
+from test.proxytestcase import ProxyTestCase
+from ucmexport import Proxy, RowSchema, ColumnType, ColumnTypes, Bool, Int, Enum, Str
+from ucmexport.objects.table import row_dict
+
+
+class TestColumnTypes(TestCase):
+    header = ['NAME', 'ENABLED', 'ORDER 1', 'ORDER 2', 'ALGORITHM']
+
+    def types(self) -> ColumnTypes:
+        return ColumnTypes(Bool('ENABLED'), Int('ORDER n'), Enum('ALGORITHM'), Str('NAME'))
+
+    def test_resolve(self):
+        types = self.types()
+        self.assertEqual([1, 2, 3, 4], sorted(types.resolve(self.header)))
+        self.assertIsNone(types.type_of('OTHER'))
+        self.assertIsInstance(types.type_of('order 2'), Int)
+
+    def test_str(self):
+        column_type = Str('NAME')
+        self.assertEqual('a', column_type.text(column_type.decode(column_type.encode('a'))))
+        with self.assertRaises(TypeError):
+            ColumnType('NAME')
+
+    def test_coerce(self):
+        schema = RowSchema(self.header, types=self.types())
+        values = ['a', 't', '1', '', 'Top Down']
+        row = schema.row(values)
+        # mapping view is unchanged
+        self.assertEqual(row_dict(self.header, values), row)
+        self.assertIs(True, row.value('ENABLED'))
+        self.assertEqual(1, row.value('ORDER 1'))
+        self.assertIsNone(row.value('ORDER 2'))
+        self.assertEqual('Top Down', row.value('ALGORITHM'))
+        self.assertEqual(1, row.attribute('order_1'))
+        self.assertEqual([('NAME', 'a'), ('ENABLED', True), ('ORDER 1', 1), ('ORDER 2', ''),
+                          ('ALGORITHM', 'Top Down')], list(row.typed_items()))
+        self.assertEqual([], schema.errors)
+
+    def test_errors(self):
+        schema = RowSchema(self.header, types=self.types())
+        schema.row(['a', 't', '1', '2', 'x'])
+        values = ['b', 'yes', '01', 'x', 'y']
+        row = schema.row(values)
+        self.assertEqual(row_dict(self.header, values), row)
+        self.assertEqual([(1, 'ENABLED', 'yes'), (1, 'ORDER 1', '01'), (1, 'ORDER 2', 'x')],
+                         [(e.row, e.column, e.value) for e in schema.errors])
+        # values which can't be coerced are kept as strings
+        self.assertEqual('x', row.value('ORDER 2'))
+
+    def test_fixed_enum(self):
+        schema = RowSchema(['A'], types=ColumnTypes(Enum('A', values=['x', 'y'])))
+        self.assertEqual('y', schema.row(['y']).value('A'))
+        schema.row(['z'])
+        self.assertEqual(1, len(schema.errors))
+
+    def test_modify(self):
+        schema = RowSchema(self.header, types=self.types())
+        row = schema.row(['a', 'f', '1', '2', 'x'])
+        row['ORDER 1'] = '5'
+        self.assertEqual('5', row['ORDER 1'])
+        self.assertEqual(5, row.value('ORDER 1'))
+        self.assertIs(False, row.value('ENABLED'))
+
+
+class TestTypedObjects(ProxyTestCase):
+
+    def test_location(self):
+        for location in self.proxy.location.list:
+            self.assertIsInstance(location.audio_bandwidth, int)
+            self.assertEqual(location.dict['AUDIO BANDWIDTH'], str(location.audio_bandwidth))
+
+    def test_members(self):
+        for hunt_list in self.proxy.hunt_list.list:
+            self.assertIsInstance(hunt_list.enabled, bool)
+            for member in hunt_list.members:
+                self.assertIsInstance(member.selection_order, int)
+
+    def test_coercion_errors(self):
+        proxy = Proxy(tar=TAR_FILE, use_cache=False)
+        with self.assertLogs('ucmexport.objects.base', level='WARNING'):
+            edges = proxy.location_edge.list
+        errors = proxy.coercion_errors()
+        self.assertEqual(['location_edge'], list(errors))
+        error = errors['location_edge'][0]
+        self.assertEqual('IMMERSIVE VIDEO BANDWIDTH', error.column)
+        self.assertEqual(error.value, edges[error.row].immersive_video_bandwidth)
@@ -0,0 +1,43 @@
+from unittest import TestCase
+from test.proxytestcase import ProxyTestCase
+from ucmexport import Phone
+from ucmexport.objects.phone import ColumnPlan, column_plan
+
+HEADER = ('DEVICE NAME', 'DIRECTORY NUMBER 1', 'ROUTE PARTITION 1', 'DIRECTORY NUMBER 2', 'ROUTE PARTITION 2',
+          'SPEED DIAL NUMBER 1', 'SPEED DIAL LABEL 1', 'BUSY LAMP FIELD DESTINATION 1',
+          'BUSY LAMP FIELD DIRECTORY NUMBER 1', 'BUSY LAMP FIELD CALL PICKUP 1', 'USER ID 1', 'USER ID 2')
+
+
+class TestColumnPlan(TestCase):
+
+    def test_plan(self):
+        plan = ColumnPlan(HEADER)
+        self.assertEqual([(1, 1, 3, ('DIRECTORY NUMBER', 'ROUTE PARTITION')),
+                          (2, 3, 5, ('DIRECTORY NUMBER', 'ROUTE PARTITION'))], plan.lines)
+        self.assertEqual({1: (('NUMBER', 'LABEL'), (5, 6))}, plan.speed_dials)
+        self.assertEqual([7, 8, 9], list(plan.busy_lamp_fields[1][1]))
+        self.assertEqual([10, 11], plan.user_ids)
+        self.assertIs(column_plan(HEADER), column_plan(HEADER))
+
+    def test_dict(self):
+        # objects created from plain dictionaries use a plan for the keys of the dictionary
+        phone = Phone(dict(zip(HEADER, ('SEP1', '1000', 'PT', '', 'PT', '2000', 'sd', 'x', '1001 in PT', 'f', 'u1',
+                                        ''))))
+        self.assertEqual(['1000:PT'], [line.dn_and_partition for line in phone.lines.values()])
+        self.assertEqual(['sd:2000'], [str(sd) for sd in phone.speed_dials.values()])
+        self.assertEqual(['1001:PT'], [blf.dn_and_partition for blf in phone.busy_lamp_fields.values()])
+        self.assertEqual(['u1'], phone.user_ids)
+
+
+class TestColumnPlanRows(ProxyTestCase):
+
+    def test_modified_row(self):
+        phone = next(p for p in self.proxy.phones.list if len(p.lines) > 1)
+        expected = {i: dict(line.dict) for i, line in phone.lines.items()}
+        row = phone.dict.schema.row(phone.dict.texts())
+        # modified rows fall back to a plan for the keys of the row
+        row['DEVICE NAME'] = 'SEP000000000001'
+        self.assertTrue(row.modified)
+        modified = Phone(row)
+        self.assertEqual(expected, {i: dict(line.dict) for i, line in modified.lines.items()})
+        self.assertEqual(phone.user_ids, modified.user_ids)
@@ -0,0 +1,58 @@
+from test.proxytestcase import ProxyTestCase
+from ucmexport import ROLE_DEVICE_CSS, ROLE_LINE_CSS, ROLE_PATTERN_CSS
+
+
+class TestCssGraph(ProxyTestCase):
+
+    def test_partitions(self):
+        graph = self.proxy.css_graph
+        for css in self.proxy.css.list:
+            self.assertEqual(tuple(self.proxy.css.partition_names(css.name)), graph.partitions(css.name))
+            for partition in css.partitions:
+                self.assertIn(css.name, graph.css_with_partition(partition))
+
+    def test_combined_partitions(self):
+        graph = self.proxy.css_graph
+        for phone in self.proxy.phones.list:
+            for line in phone.lines.values():
+                expected = [*self.proxy.css.partition_names(line.css), *self.proxy.css.partition_names(phone.css)]
+                self.assertEqual(expected, list(graph.combined_partitions(line.css, phone.css)))
+                self.assertEqual(expected, list(graph.combined_partitions(line.css, phone.css, strict=True)))
+        # an undefined CSS is only distinguishable from an empty CSS in strict mode
+        self.assertEqual((), graph.combined_partitions('', 'no such CSS'))
+        with self.assertRaises(KeyError):
+            graph.combined_partitions('', 'no such CSS', strict=True)
+        with self.assertRaises(KeyError):
+            self.proxy.css.partition_names('no such CSS')
+
+    def test_device_and_line_css(self):
+        graph = self.proxy.css_graph
+        for phone in self.proxy.phones.list:
+            if phone.css:
+                self.assertIn(phone, graph.users(phone.css, role=ROLE_DEVICE_CSS))
+            for index, line in phone.lines.items():
+                if line.css:
+                    self.assertIn((phone.device_name, index, line.dn_and_partition),
+                                  [(r.key, r.index, r.dn_and_partition)
+                                   for r in graph.references(line.css, role=ROLE_LINE_CSS)])
+
+    def test_reachable_partitions(self):
+        graph = self.proxy.css_graph
+        for phone in self.proxy.phones.list:
+            expected = set(self.proxy.css.partition_names(phone.css))
+            expected.update(self.proxy.css.partition_names(phone.aar_css))
+            for line in phone.lines.values():
+                expected.update(self.proxy.css.partition_names(line.css))
+            self.assertEqual(expected, graph.reachable_partitions(phone))
+
+    def test_impacted_by_partition(self):
+        graph = self.proxy.css_graph
+        for tp in self.proxy.translation_pattern.list:
+            for partition in self.proxy.css.partition_names(tp.css):
+                self.assertIn(tp, [r.obj for r in graph.impacted_by_partition(partition, role=ROLE_PATTERN_CSS)])
+
+    def test_unknown(self):
+        graph = self.proxy.css_graph
+        self.assertEqual((), graph.partitions('no such css'))
+        self.assertEqual(set(), graph.css_with_partition('no such partition'))
+        self.assertEqual([], graph.references('no such css'))
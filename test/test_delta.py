@@ -0,0 +1,157 @@
+from unittest import TestCase
+from test import TAR_FILE
+from ucmexport import Proxy, Delta, ROLE_LINE
+
+
+def names(index):
+    """
+    Device names of the objects in an index; to compare indexes independent of object identity and order
+    """
+    return {k: sorted(p.device_name for p in v) for k, v in index.items()}
+
+
+class TestDelta(TestCase):
+
+    def setUp(self) -> None:
+        self.proxy = Proxy(tar=TAR_FILE, use_cache=False)
+
+    def test_change_line(self):
+        proxy = self.proxy
+        phones = proxy.phones
+        phones.build_indexes()
+        references = proxy.references
+        notifications = []
+        proxy.subscribe(notifications.append)
+
+        old = phones.list[0]
+        old_dnp = old.lines[1].dn_and_partition
+        row = dict(old.dict)
+        row['DIRECTORY NUMBER 1'] = '\\+19999999999'
+        deltas = proxy.apply_delta(changed={'phones': [row]})
+
+        self.assertEqual([deltas], notifications)
+        self.assertEqual(['phones'], list(deltas))
+        (changed_old, new), = deltas['phones'].changed
+        self.assertIs(old, changed_old)
+        self.assertIs(new, phones[old.device_name])
+        self.assertIs(new, phones.list[0])
+        self.assertEqual({new}, phones.by_dn_and_partition['\\+19999999999:' + old.lines[1].partition])
+        self.assertNotIn(old, phones.by_dn_and_partition.get(old_dnp, []))
+        self.assertIn(new, references.objects('\\+19999999999:' + old.lines[1].partition, role=ROLE_LINE))
+        self.assertNotIn(old, references.objects(old_dnp, role=ROLE_LINE))
+
+    def test_indexes_match_rebuild(self):
+        proxy = self.proxy
+        phones = proxy.phones
+        phones.build_indexes()
+        phones.by_attribute('device_pool')
+        first, second = phones.list[:2]
+        added = dict(first.dict)
+        added['DEVICE NAME'] = 'SEP999999999999'
+        proxy.apply_delta(added={'phones': [added]}, removed={'phones': [second.device_name]})
+
+        self.assertNotIn(second.device_name, phones.by_key)
+        self.assertEqual('SEP999999999999', phones['SEP999999999999'].device_name)
+        for name in phones.index_stats:
+            index = phones.by_attribute(name)
+            phones._indexes.pop(name)
+            rebuilt = phones.by_attribute(name)
+            if name == 'key':
+                self.assertEqual({k: o.device_name for k, o in rebuilt.items()},
+                                 {k: o.device_name for k, o in index.items()})
+            else:
+                self.assertEqual(names(rebuilt), names(index))
+
+    def test_unknown_key(self):
+        phones = self.proxy.phones
+        objects = list(phones.list)
+        with self.assertRaises(KeyError):
+            self.proxy.apply_delta(removed={'phones': ['no such phone']})
+        self.assertEqual(objects, phones.list)
+        with self.assertRaises(ValueError):
+            self.proxy.apply_delta(removed={'no such container': ['x']})
+
+    def test_second_container_fails(self):
+        proxy = self.proxy
+        phones = proxy.phones
+        phones.build_indexes()
+        phone = phones.list[0]
+        objects = list(phones.list)
+        by_dn_and_partition = names(phones.by_dn_and_partition)
+        references = proxy.references
+        ids = proxy.ids
+        notifications = []
+        proxy.subscribe(notifications.append)
+        with self.assertRaises(KeyError):
+            proxy.apply_delta(removed={'phones': [phone.device_name], 'css': ['no such css']})
+        self.assertEqual(objects, phones.list)
+        self.assertIs(phone, phones[phone.device_name])
+        self.assertEqual(by_dn_and_partition, names(phones.by_dn_and_partition))
+        self.assertIs(references, proxy.references)
+        self.assertIs(ids, proxy.ids)
+        self.assertEqual([], notifications)
+
+    def test_second_container_fails_on_commit(self):
+        proxy = self.proxy
+        phones = proxy.phones
+        phone = phones.list[0]
+        ids = proxy.ids
+        notifications = []
+        proxy.subscribe(notifications.append)
+
+        def fail(delta):
+            raise RuntimeError('commit failed')
+
+        proxy.css.commit_delta = fail
+        with self.assertRaises(RuntimeError):
+            proxy.apply_delta(removed={'phones': [phone.device_name], 'css': [proxy.css.list[0].name]})
+        # changes already applied are not lost: derived data is invalidated and subscribers are notified
+        self.assertNotIn(phone, phones.list)
+        self.assertIsNot(ids, proxy.ids)
+        self.assertEqual([['phones']], [list(deltas) for deltas in notifications])
+
+    def test_css(self):
+        proxy = self.proxy
+        graph = proxy.css_graph
+        css = proxy.css.list[0]
+        row = dict(css.dict)
+        row['ROUTE PARTITION 1'] = 'PT_NEW'
+        deltas = proxy.apply_delta(changed={'css': [row]})
+        self.assertIsInstance(deltas['css'], Delta)
+        self.assertEqual(('PT_NEW',), graph.partitions(css.name))
+        self.assertEqual({css.name}, graph.css_with_partition('PT_NEW'))
+
+    def test_empty(self):
+        notifications = []
+        self.proxy.subscribe(notifications.append)
+        self.assertEqual({}, self.proxy.apply_delta())
+        self.assertEqual([], notifications)
+
+    def test_hunt_pilot_partition(self):
+        proxy = self.proxy
+        hunt_pilots = proxy.hunt_pilot
+        first = hunt_pilots.list[0]
+        row = dict(first.dict)
+        row['ROUTE PARTITION'] = 'OTHER_PT'
+        proxy.apply_delta(added={'hunt_pilot': [row]})
+        other = hunt_pilots.list[-1]
+        row = dict(row)
+        row['DESCRIPTION'] = 'changed'
+        (old, new), = proxy.apply_delta(changed={'hunt_pilot': [row]})['hunt_pilot'].changed
+        self.assertIs(other, old)
+        self.assertIs(first, hunt_pilots[first.pilot_and_partition])
+        self.assertIs(new, hunt_pilots[other.pilot_and_partition])
+        self.assertEqual('changed', new.description)
+
+    def test_duplicate_key(self):
+        proxy = self.proxy
+        hunt_pilots = proxy.hunt_pilot
+        first = hunt_pilots.list[0]
+        proxy.apply_delta(added={'hunt_pilot': [dict(first.dict)]})
+        self.assertIn(first.pilot_and_partition, hunt_pilots.by_key.duplicates)
+        objects = list(hunt_pilots.list)
+        with self.assertRaises(ValueError):
+            proxy.apply_delta(changed={'hunt_pilot': [dict(first.dict)]})
+        with self.assertRaises(ValueError):
+            proxy.apply_delta(removed={'hunt_pilot': [first.pilot_and_partition]})
+        self.assertEqual(objects, hunt_pilots.list)
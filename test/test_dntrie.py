@@ -0,0 +1,68 @@
+from unittest import TestCase
+from test.proxytestcase import ProxyTestCase
+from ucmexport import DnTrie
+
+
+class TestDnTrie(TestCase):
+    numbers = ['1000', '1001', '1001', '1099', '2000', '20000', '3']
+
+    def test_counts(self):
+        trie = DnTrie(self.numbers)
+        self.assertEqual(7, len(trie))
+        self.assertEqual(6, trie.distinct)
+        self.assertEqual(4, trie.count('10'))
+        self.assertEqual(3, trie.count('10', distinct=True))
+        self.assertEqual(2, trie.count('2'))
+        self.assertEqual(1, trie.count('2', length=4))
+        self.assertEqual(0, trie.count('4'))
+        self.assertEqual([4, 5, 1], trie.lengths())
+        self.assertEqual({'1': 4, '2': 2, '3': 1}, trie.children())
+        self.assertEqual({'0': 3, '9': 1}, trie.children('10'))
+        self.assertEqual({'0': 2, '9': 1}, trie.children('10', distinct=True))
+        self.assertIn('1001', trie)
+        self.assertNotIn('100', trie)
+
+    def test_numbers(self):
+        trie = DnTrie(self.numbers)
+        self.assertEqual(['1000', '1001', '1099'], list(trie.numbers('1')))
+        self.assertEqual(['1', '2', '3'], trie.prefixes(1))
+        self.assertEqual(['10', '20'], trie.prefixes(2, length=4))
+        self.assertEqual(['1001', '1099'], list(trie.in_range('1001', '1500')))
+        self.assertEqual(4, trie.range_count('0000', '9999'))
+        self.assertEqual(3 / 100, trie.density('10', 4))
+        with self.assertRaises(ValueError):
+            list(trie.in_range('1', '20'))
+
+    def test_discard(self):
+        trie = DnTrie(self.numbers)
+        trie.discard('1001')
+        self.assertEqual(3, trie.count('10'))
+        self.assertEqual(3, trie.count('10', distinct=True))
+        trie.discard('1001')
+        self.assertNotIn('1001', trie)
+        self.assertEqual(2, trie.count('10', distinct=True))
+        trie.discard('3')
+        self.assertEqual([4, 5], trie.lengths())
+        trie.discard('no such number')
+        self.assertEqual(4, trie.distinct)
+
+
+class TestContainerDnTrie(ProxyTestCase):
+
+    def test_phones(self):
+        phones = self.proxy.phones
+        dns = [(line.directory_number, line.partition) for p in phones.list for line in p.lines.values()]
+        self.assertEqual(len(dns), len(phones.dn_trie()))
+        for partition in {partition for _, partition in dns}:
+            self.assertEqual(sorted({dn for dn, p in dns if p == partition}),
+                             sorted(phones.dn_trie(partition).numbers()))
+        first_lines = [line.directory_number for p in phones.list if (line := p.lines.get(1))]
+        self.assertEqual(len(first_lines), len(phones.dn_trie(line_index=1)))
+        self.assertEqual(0, len(phones.dn_trie('no such partition')))
+
+    def test_directory_numbers(self):
+        directory_numbers = self.proxy.directory_number
+        trie = directory_numbers.dn_trie()
+        self.assertEqual(len(directory_numbers.list), len(trie))
+        for dn in directory_numbers.list:
+            self.assertIn(dn.number, directory_numbers.dn_trie(dn.partition))
@@ -0,0 +1,59 @@
+from unittest import TestCase
+from test import TAR_FILE
+from test.proxytestcase import ProxyTestCase
+from ucmexport import Proxy
+from ucmexport.objects.frames import LINE_INDEX
+
+
+class TestFrames(ProxyTestCase):
+
+    def test_to_frame(self):
+        phones = self.proxy.phones
+        frame = phones.to_frame()
+        self.assertEqual(phones.header, list(frame.columns))
+        self.assertEqual([p.device_name for p in phones.list], list(frame['DEVICE NAME']))
+        self.assertEqual('category', str(frame['DEVICE POOL'].dtype))
+        self.assertEqual([p.device_pool for p in phones.list], list(frame['DEVICE POOL'].astype(object)))
+        frame = phones.to_frame(columns=['DEVICE TYPE', 'DEVICE NAME'])
+        self.assertEqual(['DEVICE TYPE', 'DEVICE NAME'], list(frame.columns))
+        with self.assertRaises(KeyError):
+            phones.to_frame(columns=['NO SUCH COLUMN'])
+
+    def test_typed_columns(self):
+        hunt_lists = self.proxy.hunt_list
+        frame = hunt_lists.to_frame()
+        self.assertEqual('boolean', str(frame['ROUTE LIST ENABLED'].dtype))
+        self.assertEqual([hl.route_list_enabled for hl in hunt_lists.list], list(frame['ROUTE LIST ENABLED']))
+        self.assertEqual('Int64', str(frame['SELECTION ORDER 1'].dtype))
+
+    def test_lines_frame(self):
+        for container in (self.proxy.phones, self.proxy.device_profile):
+            frame = container.lines_frame()
+            key = container.key_columns[0]
+            expected = [(str(p), index, line.dn_and_partition, line.css)
+                        for p in container.list for index, line in p.lines.items()]
+            self.assertEqual(expected, list(zip(frame[key].astype(object), frame[LINE_INDEX],
+                                                frame['DIRECTORY NUMBER'].astype(object) + ':' +
+                                                frame['ROUTE PARTITION'].astype(object),
+                                                frame['LINE CSS'].astype(object))))
+        frame = self.proxy.phones.lines_frame(columns=['ROUTE PARTITION'])
+        self.assertEqual(['DEVICE NAME', LINE_INDEX, 'ROUTE PARTITION'], list(frame.columns))
+
+    def test_to_frames(self):
+        frames = self.proxy.to_frames(['end_user', 'phone_lines'])
+        self.assertEqual(['end_user', 'phone_lines'], list(frames))
+        self.assertEqual(len(self.proxy.end_user.list), len(frames['end_user']))
+        with self.assertRaises(ValueError):
+            self.proxy.to_frames(['no_such_container'])
+
+
+class TestFramesDelta(TestCase):
+
+    def test_delta(self):
+        proxy = Proxy(tar=TAR_FILE, use_cache=False)
+        phones = proxy.phones
+        phone = phones.list[0]
+        proxy.apply_delta(removed={'phones': [phone.device_name]})
+        frame = phones.to_frame()
+        self.assertEqual([p.device_name for p in phones.list], list(frame['DEVICE NAME']))
+        self.assertNotIn(phone.device_name, set(phones.lines_frame()['DEVICE NAME']))
@@ -0,0 +1,91 @@
+from unittest import TestCase
+from test import TAR_FILE
+from test.proxytestcase import ProxyTestCase
+from ucmexport import (Proxy, IdRelation, IdSpace, ID_PHONE, ID_USER, ID_DN_AND_PARTITION, ID_PARTITION,
+                       ID_LINE_GROUP, ID_DEVICE_PROFILE)
+
+
+class TestIdRelation(TestCase):
+
+    def setUp(self) -> None:
+        # 0 -> 1, 2; 1 -> -; 2 -> 2
+        self.relation = IdRelation.from_rows('a', 'b', [[1, 2], [], [2]])
+
+    def test_rows(self):
+        relation = self.relation
+        self.assertEqual(3, len(relation))
+        self.assertEqual([1, 2], list(relation[0]))
+        self.assertEqual([], list(relation[1]))
+        self.assertEqual(1, relation.degree(2))
+        self.assertEqual([(0, 1), (0, 2), (2, 2)], list(relation.pairs()))
+        self.assertEqual({1, 2}, relation.targets_of([0, 2]))
+
+    def test_inverse(self):
+        inverse = self.relation.inverse(size=4)
+        self.assertEqual(('b', 'a'), (inverse.source, inverse.target))
+        self.assertEqual([[], [0], [0, 2], []], [list(inverse[i]) for i in range(len(inverse))])
+
+    def test_compose(self):
+        shared = self.relation.compose(self.relation.inverse())
+        self.assertEqual([[0, 2], [], [0, 2]], [list(shared[i]) for i in range(len(shared))])
+        with self.assertRaises(ValueError):
+            self.relation.compose(self.relation)
+
+    def test_space(self):
+        space = IdSpace('x')
+        self.assertEqual([0, 1, 0], [space.id('a'), space.id('b'), space.id('a')])
+        self.assertEqual([1], space.ids(['b', 'c']))
+        self.assertEqual(['b', 'a'], space.keys([1, 0]))
+        self.assertIsNone(space.get('c'))
+
+
+class TestIdRegistry(ProxyTestCase):
+
+    def test_spaces(self):
+        ids = self.proxy.ids
+        self.assertEqual([ID_USER, ID_DN_AND_PARTITION, ID_PARTITION, ID_PHONE, ID_DEVICE_PROFILE, ID_LINE_GROUP],
+                         ids.spaces())
+        self.assertEqual({p.device_name for p in self.proxy.phones.list}, set(ids[ID_PHONE]))
+
+    def test_phone_lines(self):
+        proxy = self.proxy
+        ids = proxy.ids
+        dnps = ids[ID_DN_AND_PARTITION]
+        lines = ids.relation(ID_PHONE, ID_DN_AND_PARTITION)
+        for phone in proxy.phones.list:
+            self.assertEqual([line.dn_and_partition for line in phone.lines.values()],
+                             dnps.keys(lines[ids[ID_PHONE].id(phone.device_name)]))
+        # inverse relation matches the index on DN:partition
+        phones_by_dnp = ids.relation(ID_DN_AND_PARTITION, ID_PHONE)
+        self.assertEqual(len(dnps), len(phones_by_dnp))
+        for dnp, phones in proxy.phones.by_dn_and_partition.items():
+            self.assertEqual(sorted(p.device_name for p in phones),
+                             sorted(ids[ID_PHONE].keys(phones_by_dnp[dnps.id(dnp)])))
+
+    def test_partition(self):
+        ids = self.proxy.ids
+        partitions = ids.relation(ID_DN_AND_PARTITION, ID_PARTITION)
+        for i, dnp in enumerate(ids[ID_DN_AND_PARTITION]):
+            self.assertEqual(dnp.split(':')[1], ids[ID_PARTITION].key(partitions[i][0]))
+
+    def test_related(self):
+        proxy = self.proxy
+        phone = next(p for p in proxy.phones.list if p.user_set)
+        dnps = [line.dn_and_partition for line in phone.lines.values()]
+        expected = {u for dnp in dnps for p in proxy.phones.by_dn_and_partition[dnp] for u in p.user_set}
+        ids = proxy.ids
+        phones = ids.related(ID_DN_AND_PARTITION, ID_PHONE, dnps)
+        self.assertEqual(expected, set(ids.related(ID_PHONE, ID_USER, phones)))
+        with self.assertRaises(KeyError):
+            ids.relation(ID_PHONE, ID_LINE_GROUP)
+
+
+class TestIdRegistryDelta(TestCase):
+
+    def test_delta(self):
+        proxy = Proxy(tar=TAR_FILE, use_cache=False)
+        ids = proxy.ids
+        phone = proxy.phones.list[0]
+        proxy.apply_delta(removed={'phones': [phone.device_name]})
+        self.assertIsNot(ids, proxy.ids)
+        self.assertNotIn(phone.device_name, proxy.ids[ID_PHONE])
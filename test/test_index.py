@@ -0,0 +1,156 @@
+import shutil
+import tempfile
+from collections import defaultdict
+from unittest import TestCase
+from test import TAR_FILE
+from test.proxytestcase import ProxyTestCase
+from ucmexport import Index, MultiIndex, UniqueIndex, build_indexes, Proxy
+
+
+class Item:
+    def __init__(self, name: str, group: str, tags: list):
+        self.name = name
+        self.group = group
+        self.tags = tags
+
+    @property
+    def upper(self) -> str:
+        return self.name.upper()
+
+
+class TestIndex(TestCase):
+    items = [Item('a', 'x', ['t1', 't2']), Item('b', 'x', ['t1', 't1']), Item('c', '', [])]
+
+    def test_build(self):
+        indexes = [Index('group'), Index('upper', skip_empty=True), MultiIndex('tags', collection=set),
+                   Index('composite', key=('group', 'name'), separator=':'), Index('pair', key=('group', 'name')),
+                   Index('first', key=lambda item: item.name[0])]
+        built, stats = build_indexes(indexes, factory=Item, objects=self.items)
+        a, b, c = self.items
+        self.assertEqual({'x': [a, b], '': [c]}, built['group'])
+        self.assertEqual({'A': [a], 'B': [b], 'C': [c]}, built['upper'])
+        self.assertEqual({'t1': {a, b}, 't2': {a}}, built['tags'])
+        self.assertEqual({'x:a', 'x:b', ':c'}, set(built['composite']))
+        self.assertEqual(('x', 'a'), next(iter(built['pair'])))
+        self.assertEqual(['a', 'b', 'c'], list(built['first']))
+        self.assertEqual(3, stats['tags'].entries)
+        self.assertEqual(2, stats['tags'].keys)
+        self.assertGreater(stats['group'].bytes, 0)
+
+    def test_multi_once(self):
+        built, _ = build_indexes([MultiIndex('tags')], factory=Item, objects=self.items)
+        self.assertEqual({'t1': [self.items[0], self.items[1]], 't2': [self.items[0]]}, built['tags'])
+
+
+    def test_unique(self):
+        a, b, c = self.items
+        with self.assertLogs('ucmexport.objects.index', level='WARNING'):
+            built, stats = build_indexes([UniqueIndex('group')], factory=Item, objects=self.items)
+        index = built['group']
+        self.assertIs(a, index['x'])
+        self.assertIs(c, index[''])
+        self.assertEqual({'x': [a, b]}, index.duplicates)
+        self.assertEqual(1, stats['group'].duplicates)
+
+
+class TestContainerIndexes(ProxyTestCase):
+
+    def test_declared(self):
+        phones = self.proxy.phones
+        phones.build_indexes()
+        self.assertLessEqual({index.name for index in phones.indexes}, set(phones.index_stats))
+        self.assertIn('phones', self.proxy.index_stats())
+
+        expected = defaultdict(set)
+        for phone in phones.list:
+            for line in phone.lines.values():
+                expected[line.dn_and_partition].add(phone)
+        self.assertEqual(expected, phones.by_dn_and_partition)
+
+        expected = defaultdict(list)
+        for phone in phones.list:
+            for user_id in phone.user_set:
+                expected[user_id].append(phone)
+        self.assertEqual(expected, phones.by_user_id)
+
+    def test_ad_hoc(self):
+        phones = self.proxy.phones
+        by_location = phones.by_location
+        self.assertIs(by_location, phones.by_attribute('location'))
+        self.assertEqual(len(phones.list), sum(map(len, by_location.values())))
+        self.assertIn('location', phones.index_stats)
+
+    def test_getitem(self):
+        for container, key in ((self.proxy.phones, 'device_name'), (self.proxy.css, 'name'),
+                               (self.proxy.device_pools, 'name'), (self.proxy.end_user, 'user_id'),
+                               (self.proxy.route_pattern, 'pattern_and_partition'),
+                               (self.proxy.hunt_pilot, 'pilot_and_partition')):
+            first = dict()
+            for o in container.list:
+                first.setdefault(getattr(o, key), o)
+            self.assertEqual(first, container.by_key)
+            self.assertTrue(all(container[k] is o for k, o in first.items()))
+            self.assertIsNone(container.get('no such key'))
+            # duplicates are reported
+            self.assertEqual(len(container.list) - len(first),
+                             sum(len(d) - 1 for d in container.by_key.duplicates.values()))
+        with self.assertRaises(TypeError):
+            self.proxy.rdp['x']
+
+
+class TestHuntPilotKey(TestCase):
+
+    def test_same_pattern_in_two_partitions(self):
+        proxy = Proxy(tar=TAR_FILE, use_cache=False)
+        hunt_pilots = proxy.hunt_pilot
+        first = hunt_pilots.list[0]
+        row = dict(first.dict)
+        row['ROUTE PARTITION'] = 'OTHER_PT'
+        proxy.apply_delta(added={'hunt_pilot': [row]})
+        other = hunt_pilots.list[-1]
+        self.assertEqual(f'{first.hunt_pilot}:OTHER_PT', other.pilot_and_partition)
+        self.assertFalse(hunt_pilots.by_key.duplicates)
+        self.assertIs(first, hunt_pilots[first.pilot_and_partition])
+        self.assertIs(other, hunt_pilots[other.pilot_and_partition])
+        self.assertEqual({first, other}, set(proxy.query(hunt_pilots).where(hunt_pilot=first.hunt_pilot)))
+
+
+class TestPersistedIndex(TestCase):
+
+    def setUp(self) -> None:
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_persisted(self):
+        built = Proxy(tar=TAR_FILE, cache_dir=self.cache_dir)
+        built.phones.build_indexes()
+        built.phones.by_attribute('device_pool')
+        built.end_user.build_indexes()
+        self.assertTrue(all(s.source == 'scan' for s in built.phones.index_stats.values()))
+
+        loaded = Proxy(tar=TAR_FILE, cache_dir=self.cache_dir)
+        loaded.phones.build_indexes()
+        loaded.phones.by_attribute('device_pool')
+        self.assertTrue(all(s.source == 'snapshot' for s in loaded.phones.index_stats.values()))
+        # objects in persisted indexes are the objects of the container
+        positions = {id(o): i for i, o in enumerate(loaded.phones.list)}
+        for name in built.phones.index_stats:
+            expected = {k: [p.device_name for p in v] if isinstance(v, list) else
+                        ({p.device_name for p in v} if isinstance(v, set) else v.device_name)
+                        for k, v in built.phones.by_attribute(name).items()}
+            index = loaded.phones.by_attribute(name)
+            self.assertEqual(expected, {k: [p.device_name for p in v] if isinstance(v, list) else
+                                        ({p.device_name for p in v} if isinstance(v, set) else v.device_name)
+                                        for k, v in index.items()})
+            for v in index.values():
+                for p in (v if isinstance(v, (list, set)) else [v]):
+                    self.assertIn(id(p), positions)
+        self.assertEqual(built.end_user.by_key.duplicates.keys(), loaded.end_user.by_key.duplicates.keys())
+        self.assertEqual('snapshot', loaded.end_user.index_stats['key'].source)
+
+    def test_no_cache(self):
+        proxy = Proxy(tar=TAR_FILE, use_cache=False)
+        proxy.phones.build_indexes()
+        self.assertTrue(all(s.source == 'scan' for s in proxy.phones.index_stats.values()))
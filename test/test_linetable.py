@@ -0,0 +1,57 @@
+from collections import Counter
+from unittest import TestCase
+from test import TAR_FILE
+from test.proxytestcase import ProxyTestCase
+from ucmexport import Proxy
+from ucmexport.objects.linetable import KIND_PHONE, KIND_DEVICE_PROFILE
+
+
+class TestLineTable(ProxyTestCase):
+
+    def test_rows(self):
+        proxy = self.proxy
+        table = proxy.line_table
+        devices = proxy.phones.list + proxy.device_profile.list
+        self.assertEqual(devices, table.devices)
+        lines = [(d, index, line) for d in devices for index, line in d.lines.items()]
+        self.assertEqual(len(lines), len(table))
+        self.assertEqual([devices.index(d) for d, _, _ in lines], table.device.tolist())
+        self.assertEqual([index for _, index, _ in lines], table.line_index.tolist())
+        self.assertEqual([line.dn_and_partition for _, _, line in lines], table.values('dn_and_partition'))
+        self.assertEqual([line.css for _, _, line in lines], table.values('css'))
+        self.assertEqual([line.call_pickup_group for _, _, line in lines], table.values('call_pickup_group'))
+        self.assertEqual([d.dict['CSS'] for d, _, _ in lines], table.values('device_css'))
+        # devices w/o lines have no rows
+        self.assertEqual([p for p in proxy.phones.list if p.lines], table.devices_of(table.rows(kind=KIND_PHONE)))
+        self.assertEqual(-1, table.code('dn', 'no such dn'))
+        self.assertFalse(table.rows(dn='no such dn').any())
+
+    def test_counts(self):
+        proxy = self.proxy
+        table = proxy.line_table
+        self.assertEqual(Counter(line.partition for d in table.devices for line in d.lines.values()),
+                         table.value_counts('partition'))
+        phones = table.rows(kind=KIND_PHONE)
+        first_lines = table.first_lines() & phones
+        expected = Counter((line.css, phone.css) for phone in proxy.phones.list
+                           if (line := next(iter(phone.lines.values()), None)))
+        self.assertEqual(list(expected.items()), list(table.group_counts(('css', 'device_css'),
+                                                                         rows=first_lines).items()))
+        self.assertEqual({dnp: len(phones) for dnp, phones in proxy.phones.by_dn_and_partition.items()
+                          if len(phones) > 1},
+                         table.shared(rows=phones))
+        by_cpg = table.group_devices('call_pickup_group', rows=table.rows(kind=KIND_DEVICE_PROFILE))
+        by_cpg.pop('', None)
+        self.assertEqual({cpg: sorted(profiles) for cpg, profiles in proxy.device_profile.by_call_pickup_group.items()},
+                         {cpg: sorted(profiles) for cpg, profiles in by_cpg.items()})
+
+
+class TestLineTableDelta(TestCase):
+
+    def test_delta(self):
+        proxy = Proxy(tar=TAR_FILE, use_cache=False)
+        table = proxy.line_table
+        phone = proxy.phones.list[0]
+        proxy.apply_delta(removed={'phones': [phone.device_name]})
+        self.assertIsNot(table, proxy.line_table)
+        self.assertEqual(len(table) - len(phone.lines), len(proxy.line_table))
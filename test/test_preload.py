@@ -0,0 +1,28 @@
+from unittest import TestCase
+from test import TAR_FILE
+from ucmexport import Proxy
+
+
+class TestPreload(TestCase):
+
+    def test_preload_same_as_lazy(self):
+        preloaded = Proxy(tar=TAR_FILE, use_cache=False)
+        preloaded.preload(workers=2)
+        self.assertTrue(all(container.loaded for container in preloaded.containers().values()))
+        lazy = Proxy(tar=TAR_FILE, use_cache=False)
+        for name, container in preloaded.containers().items():
+            self.assertEqual([o.dict for o in getattr(lazy, name).list],
+                             [o.dict for o in container.list],
+                             f'{name} differs')
+
+    def test_preload_selected(self):
+        proxy = Proxy(tar=TAR_FILE, use_cache=False)
+        proxy.preload(containers=['phones', 'end_user'], workers=2)
+        self.assertTrue(proxy.phones.loaded)
+        self.assertTrue(proxy.end_user.loaded)
+        self.assertFalse(proxy.css.loaded)
+
+    def test_preload_unknown_container(self):
+        proxy = Proxy(tar=TAR_FILE, use_cache=False)
+        with self.assertRaises(ValueError):
+            proxy.preload(containers=['foo'])
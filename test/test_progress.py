@@ -0,0 +1,63 @@
+import io
+import shutil
+import tempfile
+from unittest import TestCase
+from test import TAR_FILE
+from ucmexport import Proxy, MetricsCollector, TqdmProgress, ProgressReporter
+
+
+class CountingProgress(ProgressReporter):
+    def __init__(self):
+        self.rows = 0
+
+    def track(self, csv_file, rows, total_bytes=None):
+        for row in rows:
+            self.rows += 1
+            yield row
+
+
+class TestProgress(TestCase):
+
+    def setUp(self) -> None:
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_stats(self):
+        proxy = Proxy(tar=TAR_FILE, cache_dir=self.cache_dir)
+        phones = proxy.phones.list
+        stats = proxy.stats()
+        self.assertEqual(['phones'], list(stats))
+        metrics = stats['phones']
+        self.assertEqual('csv', metrics.source)
+        self.assertEqual(len(phones), metrics.rows)
+        self.assertEqual(proxy.tar.members['phone.csv'].size, metrics.bytes)
+        self.assertGreater(metrics.parse_seconds, 0)
+        self.assertGreater(metrics.construct_seconds, 0)
+        # 2nd proxy reads from the snapshot
+        proxy = Proxy(tar=TAR_FILE, cache_dir=self.cache_dir)
+        proxy.phones.list
+        self.assertEqual('snapshot', proxy.stats()['phones'].source)
+
+    def test_preload(self):
+        collector = MetricsCollector()
+        proxy = Proxy(tar=TAR_FILE, use_cache=False, progress=collector)
+        proxy.preload(['phones', 'css'], workers=2)
+        self.assertEqual({'PhoneContainer', 'CssContainer'}, set(collector.metrics))
+        self.assertEqual('worker', proxy.stats()['phones'].source)
+        self.assertEqual(len(proxy.phones.list), collector.metrics['PhoneContainer'].rows)
+        self.assertTrue(collector.summary())
+
+    def test_track(self):
+        progress = CountingProgress()
+        proxy = Proxy(tar=TAR_FILE, use_cache=False, progress=progress)
+        self.assertEqual(len(proxy.phones.list), progress.rows)
+        progress.rows = 0
+        self.assertEqual(len(list(proxy.stream('css'))), progress.rows)
+
+    def test_tqdm(self):
+        out = io.StringIO()
+        proxy = Proxy(tar=TAR_FILE, use_cache=False, progress=TqdmProgress(file=out))
+        proxy.phones.list
+        self.assertIn('PhoneContainer', out.getvalue())
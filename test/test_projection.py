@@ -0,0 +1,59 @@
+from unittest import TestCase
+from test import TAR_FILE
+from ucmexport import Proxy, Projection
+
+import shutil
+import tempfile
+
+
+class TestProjection(TestCase):
+
+    def setUp(self) -> None:
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_select(self):
+        header = ['DEVICE NAME', 'DESCRIPTION', 'DIRECTORY NUMBER 1', 'ROUTE PARTITION 1', 'DIRECTORY NUMBER 2',
+                  'ROUTE PARTITION 2', 'URI 1 ON DIRECTORY NUMBER 2', 'SPEED DIAL NUMBER 1']
+        projection = Projection(columns=['device name'], groups=['DIRECTORY NUMBER n', 'URI # ON DIRECTORY NUMBER'],
+                                patterns=['SPEED .*'])
+        self.assertEqual([0, 2, 4, 6, 7], projection.select(header))
+        projection = Projection(exclude=['ROUTE PARTITION', 'URI # on Directory Number'])
+        self.assertEqual([0, 1, 2, 4, 7], projection.select(header))
+
+    def test_signature(self):
+        self.assertEqual(Projection(columns=['A', 'B']).signature, Projection(columns=['b', 'a']).signature)
+        self.assertNotEqual(Projection(columns=['A']).signature, Projection(groups=['A']).signature)
+
+    def test_projected_phones(self):
+        groups = ['DIRECTORY NUMBER n', 'ROUTE PARTITION n']
+        full = Proxy(tar=TAR_FILE, use_cache=False)
+        projected = Proxy(tar=TAR_FILE, cache_dir=self.cache_dir, projections={'phones': Projection(groups=groups)})
+        phones = projected.phones.list
+        # key column is always read
+        self.assertTrue(all(phone.device_name for phone in phones))
+        self.assertTrue(all(column == 'DEVICE NAME' or column.startswith('DIRECTORY NUMBER') or
+                            column.startswith('ROUTE PARTITION') for column in projected.phones.header))
+        self.assertEqual({phone.device_name: [line.dn_and_partition for line in phone.lines.values()]
+                          for phone in full.phones.list},
+                         {phone.device_name: [line.dn_and_partition for line in phone.lines.values()]
+                          for phone in phones})
+
+        # snapshot of the projection is used and doesn't interfere with the snapshot w/o projection
+        projected = Proxy(tar=TAR_FILE, cache_dir=self.cache_dir, projections={'phones': Projection(groups=groups)})
+        self.assertIsNotNone(projected.snapshot.load('phone.csv', variant=projected.phones.projection.signature))
+        self.assertIsNone(projected.snapshot.load('phone.csv'))
+        self.assertEqual(len(phones), len(projected.phones.list))
+
+    def test_projected_stream(self):
+        proxy = Proxy(tar=TAR_FILE, use_cache=False, projections={'end_user': Projection(columns=['LAST NAME'])})
+        users = list(proxy.stream('end_user', first_name=lambda v: v != ''))
+        self.assertTrue(all(set(user.dict) <= {'USER ID', 'LAST NAME'} for user in users))
+
+    def test_projection_after_read(self):
+        proxy = Proxy(tar=TAR_FILE, use_cache=False)
+        proxy.css.list
+        with self.assertRaises(ValueError):
+            proxy.css.projection = Projection(columns=['NAME'])
@@ -0,0 +1,76 @@
+from unittest import TestCase
+from test import TAR_FILE
+from test.proxytestcase import ProxyTestCase
+from ucmexport import Proxy, Phone, TranslationPattern
+
+
+class TestQuery(ProxyTestCase):
+
+    def test_index(self):
+        phones = self.proxy.phones.list
+        device_type = phones[0].device_type
+        query = self.proxy.query(Phone).where(device_type=device_type)
+        self.assertEqual([p for p in phones if p.device_type == device_type], query.all())
+        self.assertTrue(query.explain().splitlines()[1].strip().startswith('index: by_device_type'))
+
+    def test_index_intersection(self):
+        phone = self.proxy.phones.list[0]
+        dnp = phone.lines[1].dn_and_partition
+        query = self.proxy.query('phones').where(dn_and_partition=dnp, device_name__in=[phone.device_name, 'x'])
+        self.assertEqual([phone], query.all())
+        self.assertEqual(2, sum(line.strip().startswith('index:') for line in query.explain().splitlines()))
+
+    def test_nested(self):
+        phones = self.proxy.phones.list
+        partition = phones[0].lines[1].partition
+        css = phones[0].css
+        expected = [p for p in phones if p.css == css and any(line.partition == partition for line in p.lines.values())]
+        query = self.proxy.query(Phone).where(lines__partition=partition, css=css)
+        self.assertEqual(expected, query.all())
+        self.assertEqual(len(expected), query.count())
+
+    def test_operators(self):
+        phones = self.proxy.phones.list
+        device_types = {phones[0].device_type}
+        self.assertEqual([p for p in phones if p.device_type not in device_types],
+                         self.proxy.query(Phone).where(device_type__not_in=device_types).all())
+        self.assertEqual([p for p in phones if p.device_name.startswith('SEP00000000000')],
+                         self.proxy.query(Phone).where(device_name__startswith='SEP00000000000').all())
+        self.assertEqual([p for p in phones if len(p.lines) > 1],
+                         self.proxy.query(Phone).where(lambda p: len(p.lines) > 1).all())
+
+    def test_select(self):
+        phone = self.proxy.phones.list[0]
+        self.assertEqual((phone.device_name, phone.css),
+                         self.proxy.query(Phone).where(device_name=phone.device_name).select('device_name',
+                                                                                             'css').first())
+        self.assertIsNone(self.proxy.query(Phone).where(device_name='no such phone').first())
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            self.proxy.query('no such container')
+
+
+class TestQueryStream(TestCase):
+
+    def test_stream(self):
+        proxy = Proxy(tar=TAR_FILE, use_cache=False)
+        css = Proxy(tar=TAR_FILE, use_cache=False).phones.list[0].css
+        query = proxy.query(Phone).where(css=css)
+        self.assertIn('stream: phone.csv where css=', query.explain())
+        streamed = [p.device_name for p in query]
+        # streaming does not read the objects of the container
+        self.assertFalse(proxy.phones.loaded)
+        self.assertEqual([p.device_name for p in proxy.phones.list if p.css == css], streamed)
+        # translation patterns have no CSS column: the condition can't be pushed down
+        plan = proxy.query(TranslationPattern).where(css=css).explain().splitlines()
+        self.assertEqual(['stream: translationpattern.csv', f'filter: css={css!r}'], [s.strip() for s in plan[1:]])
+
+    def test_unique_index_duplicates(self):
+        proxy = Proxy(tar=TAR_FILE, use_cache=False)
+        phone = proxy.phones.list[0]
+        proxy.apply_delta(added={'phones': [dict(phone.dict)]})
+        duplicate = proxy.phones.list[-1]
+        query = proxy.query(Phone).where(device_name=phone.device_name)
+        self.assertIn('index: by_key', query.explain())
+        self.assertEqual([phone, duplicate], query.all())
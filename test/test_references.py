@@ -0,0 +1,39 @@
+from test.proxytestcase import ProxyTestCase
+from ucmexport import ROLE_LINE, ROLE_MEMBER, ROLE_PRIMARY_EXTENSION, ROLE_BLF
+
+
+class TestReferences(ProxyTestCase):
+
+    def test_lines(self):
+        references = self.proxy.references
+        for container in (self.proxy.phones, self.proxy.device_profile):
+            for dnp, devices in container.by_dn_and_partition.items():
+                self.assertEqual(set(map(id, devices)),
+                                 set(map(id, references.objects(dnp, object_type=container.factory.__name__,
+                                                                role=ROLE_LINE))))
+
+    def test_line_group_members(self):
+        references = self.proxy.references
+        for line_group in self.proxy.line_group.list:
+            for member in line_group.members:
+                self.assertIn((line_group.name, member.selection_order),
+                              [(r.key, r.index) for r in references.get(member.pattern_and_partition,
+                                                                        role=ROLE_MEMBER)])
+
+    def test_primary_extension(self):
+        references = self.proxy.references
+        for user in self.proxy.end_user.list:
+            if (pe := user.primary_extension) is not None:
+                self.assertIn(user, references.objects(str(pe), role=ROLE_PRIMARY_EXTENSION))
+
+    def test_blf(self):
+        references = self.proxy.references
+        for phone in self.proxy.phones.list:
+            for index, blf in phone.busy_lamp_fields.items():
+                if blf.directory_number:
+                    self.assertIn((phone.device_name, index),
+                                  [(r.key, r.index) for r in references.get(blf.dn_and_partition, role=ROLE_BLF)])
+
+    def test_unknown(self):
+        self.assertEqual([], self.proxy.references['no such dn:partition'])
+        self.assertNotIn('no such dn:partition', self.proxy.references)
@@ -0,0 +1,54 @@
+import itertools
+from unittest import TestCase
+from test import TAR_FILE
+from test.proxytestcase import ProxyTestCase
+from ucmexport import Proxy, DeviceRelations, ID_CALL_PICKUP_GROUP, ID_DN_AND_PARTITION, ID_USER
+from ucmexport.objects.index import build_indexes
+
+
+def related_lines(by_dn_and_partition):
+    return {dnp: others for dnp, devices in by_dn_and_partition.items()
+            if (others := set(itertools.chain.from_iterable((line.dn_and_partition for line in p.lines.values())
+                                                            for p in devices)) - {dnp})}
+
+
+class TestDeviceRelations(ProxyTestCase):
+
+    def test_relations(self):
+        phones = self.proxy.phones.list
+        relations = DeviceRelations(phones)
+        for position, phone in enumerate(phones):
+            self.assertEqual(list(dict.fromkeys(line.dn_and_partition for line in phone.lines.values())),
+                             relations.dn_and_partitions.keys(relations.lines[position]))
+            self.assertEqual(phone.user_set, set(relations.users.keys(relations.user_ids[position])))
+        for i, dnp in enumerate(relations.dn_and_partitions):
+            self.assertEqual(dnp.split(':')[1], relations.partitions.key(relations.partition_of[i]))
+        with self.assertRaises(KeyError):
+            relations.relation(ID_DN_AND_PARTITION + 'x')
+
+    def test_indexes(self):
+        for container in (self.proxy.phones, self.proxy.device_profile):
+            names = ('user_id', 'dn_and_partition', 'call_pickup_group')
+            scanned, _ = build_indexes([container.declared_index(name) for name in names], factory=container.factory,
+                                       objects=container.list)
+            relations = container.relations
+            for name, target in zip(names, (ID_USER, ID_DN_AND_PARTITION, ID_CALL_PICKUP_GROUP)):
+                index = relations.index(target, container.declared_index(name).collection)
+                self.assertEqual(scanned[name], index)
+                self.assertEqual(scanned[name], container.by_attribute(name))
+            self.assertNotIn('', container.by_call_pickup_group)
+            self.assertEqual(related_lines(scanned['dn_and_partition']), container.related_lines())
+
+
+class TestDeviceRelationsDelta(TestCase):
+
+    def test_delta(self):
+        proxy = Proxy(tar=TAR_FILE, use_cache=False)
+        phones = proxy.phones
+        relations = phones.relations
+        _ = phones.by_dn_and_partition
+        phone = phones.list[0]
+        proxy.apply_delta(removed={'phones': [phone.device_name]})
+        self.assertIsNot(relations, phones.relations)
+        self.assertEqual(len(phones.list), len(phones.relations.lines))
+        self.assertEqual(related_lines(phones.by_dn_and_partition), phones.related_lines())
@@ -0,0 +1,73 @@
+from unittest import TestCase
+from test.proxytestcase import ProxyTestCase
+from ucmexport import Row, RowSchema
+from ucmexport.objects.table import row_dict
+
+
+class TestRow(TestCase):
+    header = ['A', 'B', 'C', 'D']
+
+    def test_same_as_dict(self):
+        schema = RowSchema(self.header)
+        for values in (['1', '', '3', ''], ['', '', '', ''], ['1', '2', '3', '4']):
+            row = schema.row(values)
+            self.assertIsInstance(row, Row)
+            expected = row_dict(self.header, values)
+            self.assertEqual(expected, row)
+            self.assertEqual(list(expected.items()), list(row.items()))
+            self.assertEqual(list(expected), list(row))
+            self.assertEqual(expected.get('B'), row.get('B'))
+            self.assertIsNone(row.get('X'))
+            with self.assertRaises(KeyError):
+                row['X']
+
+    def test_without_empty(self):
+        schema = RowSchema(self.header, keep_empty=False)
+        row = schema.row(['1', '', '3', ''])
+        self.assertEqual({'A': '1', 'C': '3'}, row)
+        self.assertNotIn('B', row)
+        with self.assertRaises(KeyError):
+            row['B']
+
+    def test_shared_columns(self):
+        schema = RowSchema(self.header)
+        schema.row(['1', '', '3', ''])
+        schema.row(['5', '', '6', ''])
+        self.assertEqual(1, schema.layouts)
+
+    def test_malformed_row(self):
+        schema = RowSchema(self.header)
+        self.assertEqual({'A': '1', 'B': '2', 'C': '3', 'D': '4', None: ['5']}, schema.row(['1', '2', '3', '4', '5']))
+        self.assertEqual({'A': '1', 'B': None, 'C': None, 'D': None}, schema.row(['1']))
+
+    def test_modify(self):
+        schema = RowSchema(self.header)
+        row = schema.row(['1', '', '3', ''])
+        row['B'] = '2'
+        self.assertEqual('2', row.pop('B'))
+        self.assertEqual({'A': '1', 'C': '3', 'D': ''}, row)
+        self.assertEqual('x', row.pop('B', 'x'))
+
+
+class TestCompactObjects(ProxyTestCase):
+
+    def test_phone_rows(self):
+        table = self.proxy.phones.read_table()
+        self.assertEqual([row_dict(table.header, row) for row in table.rows],
+                         [phone.dict for phone in self.proxy.phones.list])
+
+    def test_user_without_empty(self):
+        self.assertTrue(all(all(user.dict.values()) for user in self.proxy.end_user.list))
+
+    def test_accessors(self):
+        phones = self.proxy.phones.list
+        self.assertTrue(phones)
+        phone = phones[0]
+        self.assertIsInstance(type(phone).__dict__.get('device_name'), property)
+        column = next(c for c in self.proxy.phones.header if c.startswith('USER ID'))
+        self.assertEqual(phone.dict[column], getattr(phone, column.lower().replace(' ', '_')))
+        with self.assertRaises(AttributeError):
+            phone.no_such_column
+        self.assertEqual(set(self.proxy.phones.by_device_name),
+                         set(self.proxy.phones.by_attribute('device_name')))
+        self.assertEqual(len(self.proxy.device_profile.by_dp_name), len(self.proxy.device_profile.list))
@@ -0,0 +1,54 @@
+from unittest import TestCase
+from test.proxytestcase import ProxyTestCase
+from ucmexport import RowGroup, RowSchema
+
+
+class TestRowGroup(TestCase):
+
+    def setUp(self) -> None:
+        schema = RowSchema(('NAME', 'DIRECTORY NUMBER 1', 'ROUTE PARTITION 1', 'LINE CSS 1'))
+        self.row = schema.row(['SEP1', '1000', 'PT', ''])
+        self.group = RowGroup(self.row, ('DIRECTORY NUMBER', 'ROUTE PARTITION', 'LINE CSS'), (1, 2, 3))
+
+    def test_view(self):
+        group = self.group
+        self.assertEqual('1000', group['DIRECTORY NUMBER'])
+        self.assertEqual('', group['LINE CSS'])
+        self.assertEqual({'DIRECTORY NUMBER': '1000', 'ROUTE PARTITION': 'PT', 'LINE CSS': ''}, dict(group))
+        self.assertNotIn('NAME', group)
+        self.assertIsNone(group.get('NAME'))
+        with self.assertRaises(KeyError):
+            _ = group['NAME']
+        selected = group.select(('NUMBER', 'PARTITION'), ['DIRECTORY NUMBER', 'ROUTE PARTITION'])
+        self.assertIsInstance(selected, RowGroup)
+        self.assertEqual({'NUMBER': '1000', 'PARTITION': 'PT'}, dict(selected.items()))
+
+    def test_modify(self):
+        group = self.group
+        group['LINE CSS'] = 'CSS'
+        self.assertEqual('CSS', group['LINE CSS'])
+        self.assertEqual('PT', group.pop('ROUTE PARTITION'))
+        self.assertEqual(['DIRECTORY NUMBER', 'LINE CSS'], list(group))
+        # modifying the group does not change the row
+        self.assertEqual('', self.row['LINE CSS 1'])
+        self.assertEqual({'NUMBER': '1000'}, group.select(('NUMBER',), ['DIRECTORY NUMBER']))
+
+
+class TestPhoneGroups(ProxyTestCase):
+
+    def test_slots(self):
+        phone = next(p for p in self.proxy.phones.list if p.uris and p.speed_dials and p.busy_lamp_fields)
+        objects = [*phone.lines.values(), *phone.uris, *phone.speed_dials.values(), *phone.busy_lamp_fields.values()]
+        for o in objects:
+            self.assertFalse(hasattr(o, '__dict__'), o.__class__.__name__)
+            self.assertIsInstance(o.dict, RowGroup)
+
+    def test_lines(self):
+        for phone in self.proxy.phones.list:
+            for line_index, line in phone.lines.items():
+                self.assertEqual(phone.dict[f'DIRECTORY NUMBER {line_index}'], line.directory_number)
+                self.assertEqual(phone.dict[f'ROUTE PARTITION {line_index}'], line.partition)
+                self.assertEqual(phone.dict[f'LINE CSS {line_index}'], line.css)
+                self.assertEqual(phone.dict[f'CALL PICKUP GROUP {line_index}'], line.call_pickup_group)
+                for uri_index, uri in line.uris.items():
+                    self.assertEqual(phone.dict[f'URI {uri_index} ON DIRECTORY NUMBER {line_index}'], uri.uri)
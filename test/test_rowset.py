@@ -0,0 +1,124 @@
+from unittest import TestCase
+from test import TAR_FILE
+from test.proxytestcase import ProxyTestCase
+from ucmexport import Proxy, RowSet, RowUniverse
+
+
+class TestRowSet(TestCase):
+
+    def setUp(self) -> None:
+        self.objects = [object() for _ in range(20)]
+        self.universe = RowUniverse(self.objects)
+
+    def rows(self, *positions: int) -> RowSet:
+        return self.universe.row_set(self.objects[i] for i in positions)
+
+    def test_algebra(self):
+        a = self.rows(0, 3, 9, 17)
+        b = self.rows(3, 4, 17, 19)
+        self.assertEqual(4, len(a))
+        self.assertEqual([0, 3, 4, 9, 17, 19], list((a | b).positions()))
+        self.assertEqual([3, 17], list((a & b).positions()))
+        self.assertEqual([0, 9], list((a - b).positions()))
+        self.assertEqual([0, 4, 9, 19], list((a ^ b).positions()))
+        self.assertEqual(a | b, a.union(b))
+        self.assertEqual(a & b, a.intersection(b))
+        self.assertTrue(a & b <= a)
+        self.assertTrue(a >= a & b)
+        self.assertFalse(a.isdisjoint(b))
+        self.assertFalse(self.rows())
+        self.assertEqual(20, len(self.universe.all()))
+
+    def test_sparse(self):
+        objects = [object() for _ in range(1000)]
+        universe = RowUniverse(objects)
+        sparse = universe.row_set(objects[i] for i in (990, 500, 990, 10))
+        dense = universe.row_set(objects[:100])
+        self.assertTrue(sparse.sparse)
+        self.assertFalse(dense.sparse)
+        self.assertEqual(3, len(sparse))
+        self.assertEqual([10, 500, 990], list(sparse.positions()))
+        self.assertEqual([objects[10], objects[500], objects[990]], list(sparse))
+        self.assertIn(objects[500], sparse)
+        self.assertNotIn(objects[501], sparse)
+        # same results as bitmaps
+        as_bits = RowSet(universe, sparse.bits)
+        self.assertEqual(as_bits, sparse)
+        self.assertEqual(hash(as_bits), hash(sparse))
+        for other in (dense, as_bits, universe.row_set(objects[i] for i in (500, 700))):
+            self.assertEqual(set(as_bits.positions()) | set(other.positions()), set((sparse | other).positions()))
+            self.assertEqual(set(as_bits.positions()) & set(other.positions()), set((sparse & other).positions()))
+            self.assertEqual(set(as_bits.positions()) & set(other.positions()), set((other & sparse).positions()))
+            self.assertEqual(set(as_bits.positions()) - set(other.positions()), set((sparse - other).positions()))
+            self.assertEqual(set(as_bits.positions()) ^ set(other.positions()), set((sparse ^ other).positions()))
+            self.assertEqual(as_bits.isdisjoint(other), sparse.isdisjoint(other))
+            self.assertEqual(as_bits <= other, sparse <= other)
+            self.assertEqual(other <= as_bits, other <= sparse)
+        self.assertTrue((sparse & universe.row_set(objects[900:])).sparse)
+        self.assertTrue(universe.row_set(objects[i] for i in (500,)) <= sparse)
+
+    def test_objects(self):
+        rows = self.rows(17, 2, 2, 8)
+        self.assertEqual([self.objects[i] for i in (2, 8, 17)], list(rows))
+        self.assertIn(self.objects[8], rows)
+        self.assertNotIn(self.objects[9], rows)
+        self.assertNotIn(object(), rows)
+        with self.assertRaises(KeyError):
+            self.universe.row_set([object()])
+
+    def test_other_universe(self):
+        other = RowUniverse(self.objects)
+        with self.assertRaises(ValueError):
+            _ = self.rows(1) | other.row_set(self.objects[:1])
+        with self.assertRaises(TypeError):
+            _ = self.rows(1) | {self.objects[1]}
+
+
+class TestContainerRowSet(ProxyTestCase):
+
+    def test_rows_with(self):
+        phones = self.proxy.phones
+        dnps = list(phones.by_dn_and_partition)[:10]
+        expected = {p for dnp in dnps for p in phones.by_dn_and_partition[dnp]}
+        rows = phones.rows_with('dn_and_partition', dnps + ['no such dn:partition'])
+        self.assertEqual(expected, set(rows))
+        self.assertEqual(len(expected), len(rows))
+        self.assertEqual([p for p in phones.list if p in expected], list(rows))
+
+    def test_row_sets(self):
+        phones = self.proxy.phones
+        row_sets = phones.row_sets('call_pickup_group')
+        self.assertEqual({k: set(v) for k, v in phones.by_call_pickup_group.items()},
+                         {k: set(v) for k, v in row_sets.items()})
+        self.assertEqual({k: set(v) for k, v in phones.by_call_pickup_group.items()},
+                         {k: set(RowSet(phones.row_universe, v.bits)) for k, v in row_sets.items()})
+        keys = list(row_sets)[:3]
+        self.assertEqual(set(phones.rows_with('call_pickup_group', keys)),
+                         set().union(*(phones.by_call_pickup_group[k] for k in keys)))
+
+    def test_hunt_pilot(self):
+        proxy = self.proxy
+        for hp in proxy.hunt_pilot.list:
+            members = hp.pattern_and_partition_set(hunt_pilot_container=proxy.hunt_pilot)
+            expected = {p for dnp in members for p in proxy.phones.by_dn_and_partition.get(dnp, [])}
+            self.assertEqual(expected, hp.phones_or_device_profiles(hunt_pilot_container=proxy.hunt_pilot,
+                                                                    container=proxy.phones))
+            rows = hp.phones_or_device_profiles(hunt_pilot_container=proxy.hunt_pilot, container=proxy.phones,
+                                                as_row_set=True)
+            self.assertEqual(len(expected), len(rows))
+
+
+class TestRowSetDelta(TestCase):
+
+    def test_delta(self):
+        proxy = Proxy(tar=TAR_FILE, use_cache=False)
+        phones = proxy.phones
+        first, second = phones.list[:2]
+        dnp = first.lines[1].dn_and_partition
+        before = phones.rows_with('dn_and_partition', [dnp])
+        self.assertIn(first, before)
+        proxy.apply_delta(removed={'phones': [first.device_name]})
+        after = phones.rows_with('dn_and_partition', [dnp])
+        self.assertNotIn(first, after)
+        self.assertIsNot(before.universe, after.universe)
+        self.assertEqual(0, phones.row_universe.position(second))
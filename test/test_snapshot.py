@@ -0,0 +1,74 @@
+from unittest import TestCase
+from test import TAR_FILE
+from ucmexport import Proxy, SnapshotCache, TarIndex
+
+import os
+import shutil
+import tempfile
+
+
+class TestSnapshot(TestCase):
+
+    def setUp(self) -> None:
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_snapshot_written(self):
+        proxy = Proxy(tar=TAR_FILE, cache_dir=self.cache_dir)
+        proxy.css.list
+        self.assertTrue(os.path.isfile(proxy.snapshot.path('css.csv')))
+
+    def test_snapshot_same_as_csv(self):
+        proxy = Proxy(tar=TAR_FILE, cache_dir=self.cache_dir)
+        from_csv = [phone.dict for phone in proxy.phones.list]
+        proxy = Proxy(tar=TAR_FILE, cache_dir=self.cache_dir)
+        self.assertIsNotNone(proxy.snapshot.load('phone.csv'))
+        from_snapshot = [phone.dict for phone in proxy.phones.list]
+        self.assertEqual(from_csv, from_snapshot)
+
+    def test_no_cache(self):
+        proxy = Proxy(tar=TAR_FILE, use_cache=False, cache_dir=self.cache_dir)
+        proxy.css.list
+        self.assertIsNone(proxy.snapshot)
+        self.assertFalse(os.listdir(self.cache_dir))
+
+    def test_invalid_snapshot_ignored(self):
+        cache = SnapshotCache(tar=TarIndex(TAR_FILE), cache_dir=self.cache_dir)
+        os.makedirs(cache.directory)
+        with open(cache.path('css.csv'), mode='wb') as f:
+            f.write(b'garbage')
+        self.assertIsNone(cache.load('css.csv'))
+        self.assertFalse(os.path.exists(cache.path('css.csv')))
+
+    def test_stale_snapshots_removed(self):
+        cache = SnapshotCache(tar=TarIndex(TAR_FILE), cache_dir=self.cache_dir)
+        stale = os.path.join(self.cache_dir, f'{cache.prefix}0000000000000000.v0')
+        os.makedirs(stale)
+        proxy = Proxy(tar=TAR_FILE, cache_dir=self.cache_dir)
+        proxy.css.list
+        self.assertFalse(os.path.exists(stale))
+
+    def test_unusable_cache_dir(self):
+        # a file where the cache directory should be: snapshots can neither be read nor written
+        not_a_directory = os.path.join(self.cache_dir, 'file')
+        with open(not_a_directory, mode='w'):
+            pass
+        proxy = Proxy(tar=TAR_FILE, cache_dir=os.path.join(not_a_directory, 'cache'))
+        self.assertTrue(proxy.phones.list)
+        # persisting indexes fails the same way
+        proxy.phones.build_indexes()
+        self.assertTrue(proxy.phones.by_key)
+        self.assertIsNone(proxy.snapshot.load('phone.csv'))
+
+    def test_read_only_cache_dir(self):
+        os.chmod(self.cache_dir, 0o500)
+        try:
+            if os.access(self.cache_dir, os.W_OK):
+                self.skipTest('directory permissions are not enforced')
+            proxy = Proxy(tar=TAR_FILE, cache_dir=self.cache_dir)
+            self.assertTrue(proxy.css.list)
+            self.assertFalse(os.listdir(self.cache_dir))
+        finally:
+            os.chmod(self.cache_dir, 0o700)
@@ -0,0 +1,97 @@
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+from unittest import TestCase
+from test.proxytestcase import ProxyTestCase
+from test import TAR_FILE
+from ucmexport import Proxy, Phone, Projection
+
+
+class TestStream(ProxyTestCase):
+
+    def test_stream_same_as_list(self):
+        proxy = Proxy(tar=TAR_FILE, use_cache=False)
+        streamed = [phone.dict for phone in proxy.stream('phones')]
+        self.assertFalse(proxy.phones.loaded)
+        self.assertEqual([phone.dict for phone in self.proxy.phones.list], streamed)
+
+    def test_stream_instances(self):
+        proxy = Proxy(tar=TAR_FILE, use_cache=False)
+        self.assertTrue(all(isinstance(phone, Phone) for phone in proxy.stream('phones')))
+
+    def test_column_filter(self):
+        device_types = set(list(self.proxy.phones.by_device_type)[:2])
+        expected = [phone.device_name for phone in self.proxy.phones.list if phone.device_type in device_types]
+        proxy = Proxy(tar=TAR_FILE, use_cache=False)
+        self.assertEqual(expected, [phone.device_name for phone in proxy.stream('phones', device_type=device_types)])
+        # same filter on an already loaded container
+        self.assertEqual(expected,
+                         [phone.device_name for phone in self.proxy.phones.iter(device_type=device_types)])
+
+    def test_where(self):
+        expected = [phone.device_name for phone in self.proxy.phones.list if phone.owner]
+        proxy = Proxy(tar=TAR_FILE, use_cache=False)
+        self.assertEqual(expected,
+                         [phone.device_name for phone in proxy.stream('phones',
+                                                                      where=lambda row: row['OWNER USER ID'])])
+
+    def test_unknown_column(self):
+        with self.assertRaises(KeyError):
+            list(self.proxy.phones.iter(this_column_does_not_exist='foo'))
+
+    def test_unknown_container(self):
+        with self.assertRaises(ValueError):
+            self.proxy.stream('foo')
+
+
+class TestStreamProjection(TestCase):
+
+    def test_filter_outside_projection(self):
+        full = Proxy(tar=TAR_FILE, use_cache=False)
+        device_types = set(list(full.phones.by_device_type)[:2])
+        expected = [phone.device_name for phone in full.phones.list if phone.device_type in device_types]
+        proxy = Proxy(tar=TAR_FILE, use_cache=False, projections={'phones': Projection(columns=['DEVICE POOL'])})
+        phones = proxy.phones
+        streamed = [phone.device_name for phone in phones.iter(device_type=device_types)]
+        phones.list
+        self.assertNotIn('DEVICE TYPE', phones.header)
+        # same result for the container already read
+        self.assertEqual(expected, streamed)
+        loaded = list(phones.iter(device_type=device_types))
+        self.assertEqual(expected, [phone.device_name for phone in loaded])
+        self.assertTrue(all(any(phone is o for o in phones.list) for phone in loaded))
+        with self.assertRaises(KeyError):
+            list(phones.iter(this_column_does_not_exist='foo'))
+        # after a delta objects don't correspond to the rows of the CSV file anymore
+        proxy.apply_delta(removed={'phones': [phones.list[0].device_name]})
+        with self.assertRaises(KeyError):
+            list(phones.iter(device_type=device_types))
+
+    def test_filter_outside_projection_sorted(self):
+        # route patterns are presented sorted; filters on columns not read still need to refer to the right objects
+        temp_dir = tempfile.mkdtemp()
+        try:
+            tar_file = os.path.join(temp_dir, 'export.tar')
+            data = ('ROUTE PATTERN,ROUTE PARTITION,DESCRIPTION\n'
+                    '9.1[2-9]XX[2-9]XXXXXX,PT_PSTN,first\n'
+                    '9.011!,PT_PSTN,second\n').encode()
+            with tarfile.open(tar_file, mode='w') as tar:
+                info = tarfile.TarInfo('routepattern.csv')
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+            proxy = Proxy(tar=tar_file, use_cache=False,
+                          projections={'route_pattern': Projection(columns=['ROUTE PATTERN'])})
+            route_patterns = proxy.route_pattern
+            streamed = [str(rp) for rp in route_patterns.iter(description='first')]
+            self.assertEqual(['9.011!:PT_PSTN', '9.1[2-9]XX[2-9]XXXXXX:PT_PSTN'],
+                             [str(rp) for rp in route_patterns.list])
+            self.assertEqual(['9.1[2-9]XX[2-9]XXXXXX:PT_PSTN'], streamed)
+            self.assertEqual(streamed, [str(rp) for rp in route_patterns.iter(description='first')])
+            self.assertEqual(streamed, [str(rp) for rp in proxy.query('route_pattern').where(description='first')])
+            for key in ('9.011!:PT_PSTN', '9.1[2-9]XX[2-9]XXXXXX:PT_PSTN'):
+                query = proxy.query('route_pattern').where(pattern_and_partition=key, description='first')
+                self.assertEqual([key] if key in streamed else [], [str(rp) for rp in query])
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
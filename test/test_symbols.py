@@ -0,0 +1,71 @@
+from unittest import TestCase
+from test import TAR_FILE
+from ucmexport import Proxy, SymbolTable, CsvTable
+
+import shutil
+import tempfile
+
+
+class TestSymbols(TestCase):
+
+    def test_low_cardinality_columns(self):
+        header = ['NAME', 'POOL', 'EMPTY']
+        rows = [[f'name{i}', f'pool{i % 3}', ''] for i in range(100)]
+        self.assertEqual([1], SymbolTable.low_cardinality_columns(header, rows))
+
+    def test_intern_table(self):
+        symbols = SymbolTable()
+        header = ['NAME', 'POOL']
+        table = CsvTable(header=header, rows=[[f'name{i}', ''.join(['pool', str(i % 3)])] for i in range(2000)])
+        self.assertEqual([1], symbols.intern_table(table))
+        self.assertIs(table.rows[0][1], table.rows[3][1])
+        self.assertEqual(3, len(symbols))
+        # same values in another table are replaced by the instances from the symbol table
+        other = CsvTable(header=header, rows=[[''.join(['other', 'name']), ''.join(['pool', '1'])]])
+        symbols.intern_table(other)
+        self.assertIs(table.rows[1][1], other.rows[0][1])
+        # all values of small tables are kept
+        self.assertIs(other.rows[0][0], symbols.intern(''.join(['other', 'name'])))
+
+    def assertSharedBetweenContainers(self, proxy: Proxy):
+        phones = proxy.phones.list
+        device_pools = {dp.name: dp for dp in proxy.device_pools.list}
+        shared = [phone for phone in phones if phone.device_pool in device_pools]
+        self.assertTrue(shared)
+        self.assertTrue(all(phone.device_pool is device_pools[phone.device_pool].name for phone in shared))
+
+    def test_shared_between_containers(self):
+        self.assertSharedBetweenContainers(Proxy(tar=TAR_FILE, use_cache=False))
+
+    def test_shared_between_containers_after_snapshot(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            proxy = Proxy(tar=TAR_FILE, cache_dir=cache_dir)
+            proxy.phones.list
+            proxy.device_pools.list
+            proxy = Proxy(tar=TAR_FILE, cache_dir=cache_dir)
+            self.assertSharedBetweenContainers(proxy)
+            self.assertEqual('snapshot', proxy.phones.metrics.source)
+            # snapshots loaded by preload
+            proxy = Proxy(tar=TAR_FILE, cache_dir=cache_dir)
+            proxy.preload(containers=['phones', 'device_pools'])
+            self.assertSharedBetweenContainers(proxy)
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    def test_shared_between_containers_after_preload(self):
+        proxy = Proxy(tar=TAR_FILE, use_cache=False)
+        proxy.preload(containers=['phones', 'device_pools'], workers=2)
+        self.assertEqual('worker', proxy.phones.metrics.source)
+        self.assertSharedBetweenContainers(proxy)
+
+    def test_shared_after_snapshot(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            Proxy(tar=TAR_FILE, cache_dir=cache_dir).phones.list
+            proxy = Proxy(tar=TAR_FILE, cache_dir=cache_dir)
+            by_pool = proxy.phones.by_device_pool
+            self.assertTrue(all(len(set(map(id, (phone.device_pool for phone in phones)))) == 1
+                                for phones in by_pool.values()))
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
@@ -0,0 +1,91 @@
+import os
+import pickle
+import shutil
+import tempfile
+from unittest import TestCase
+from test.proxytestcase import ProxyTestCase
+from test import TAR_FILE
+from ucmexport import TarIndex, Proxy
+
+from tarfile import TarFile
+
+
+class TestTarIndex(ProxyTestCase):
+
+    def test_members(self):
+        index = TarIndex(TAR_FILE)
+        with TarFile(name=TAR_FILE, mode='r') as tar:
+            names = set(ti.name for ti in tar.getmembers() if ti.isfile())
+        self.assertEqual(names, set(index.names))
+
+    def test_member_content(self):
+        index = TarIndex(TAR_FILE)
+        with TarFile(name=TAR_FILE, mode='r') as tar:
+            for name in index.names:
+                with index.open(name) as file:
+                    data = file.read()
+                self.assertEqual(tar.extractfile(name).read(), data, f'content of {name} differs')
+
+    def test_missing_member(self):
+        index = TarIndex(TAR_FILE)
+        with self.assertRaises(KeyError):
+            index.open('does not exist.csv')
+
+    def test_shared_index(self):
+        self.assertTrue(all(container.tar is self.proxy.tar
+                            for container in (self.proxy.phones, self.proxy.end_user, self.proxy.css)))
+
+    def test_member_timing(self):
+        # timing is only recorded when actually reading from the TAR file
+        proxy = Proxy(tar=TAR_FILE, use_cache=False)
+        phones = proxy.phones.list
+        timing = proxy.member_timing().get('phone.csv')
+        self.assertTrue(phones)
+        self.assertIsNotNone(timing)
+        self.assertEqual(timing.bytes_read, timing.size)
+        self.assertGreater(timing.seconds, 0)
+
+
+class TestCompressedTarIndex(TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.mkdtemp()
+        self.tar = os.path.join(self.temp_dir, 'export.tar.gz')
+        with TarFile.open(TAR_FILE, mode='r') as source, TarFile.open(self.tar, mode='w:gz') as target:
+            for ti in source.getmembers():
+                target.addfile(ti, source.extractfile(ti) if ti.isfile() else None)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_member_content(self):
+        index = TarIndex(self.tar)
+        with TarFile.open(TAR_FILE, mode='r') as tar:
+            for name in index.names:
+                with index.open(name) as file:
+                    data = file.read()
+                self.assertEqual(tar.extractfile(name).read(), data, f'content of {name} differs')
+                timing = index.timing[name]
+                self.assertEqual(timing.size, timing.bytes_read)
+        # the compressed TAR file is only opened once
+        tar_file = index._tar_file
+        self.assertIsNotNone(tar_file)
+        with index.open(index.names[0]):
+            self.assertIs(tar_file, index._tar_file)
+        index.close()
+        self.assertIsNone(index._tar_file)
+
+    def test_pickle(self):
+        index = TarIndex(self.tar)
+        name = index.names[0]
+        with index.open(name) as file:
+            data = file.read()
+        copy = pickle.loads(pickle.dumps(index))
+        with copy.open(name) as file:
+            self.assertEqual(data, file.read())
+        index.close()
+        copy.close()
+
+    def test_proxy(self):
+        self.assertEqual([p.device_name for p in Proxy(tar=TAR_FILE, use_cache=False).phones.list],
+                         [p.device_name for p in Proxy(tar=self.tar, use_cache=False).phones.list])
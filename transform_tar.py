@@ -16,6 +16,8 @@ from io import TextIOWrapper, TextIOBase
 from tarfile import TarFile
 from typing import Optional
 
+from tqdm import tqdm
+
 # columns to remove from phones.csv
 PHONE_CSV_EXCLUDED_FIELDS = ['Services Provisioning', 'CSS', 'AAR CSS', 'Network Locale', 'Media Resource Group List',
                              'User Hold MOH Audio Source', 'Network Hold MOH Audio Source', 'Device User Locale',
@@ -137,16 +139,11 @@ ENDUSER_CSV_EXCLUDED_FIELDS = ['ASSOCIATED PC', 'MIDDLE NAME', 'PAGER', 'HOME PH
                                'MLPP PASSWORD', 'HEADSET SERIAL NUMBER']
 
 
-def progress(items):
+def progress(items, desc: Optional[str] = None):
     """
-    Primitive progress indicator; print a "." every 200 records
+    Progress bar with throughput for records read
     """
-    i = 0
-    for i, e in enumerate(items):
-        if i % 200 == 0:
-            print('.', end='', flush=True)
-        yield e
-    print(f', got {i + 1} records', end='', flush=True)
+    return tqdm(items, desc=desc, unit=' records', mininterval=0.5)
 
 
 def remove_fields(in_file: TextIOBase, fields_to_remove: list[str], max_devices: int=None) -> TextIOBase:
@@ -183,10 +180,8 @@ def remove_fields(in_file: TextIOBase, fields_to_remove: list[str], max_devices:
     col_idx_to_keep = [i for i in range(len(fieldnames)) if i not in col_idx_to_remove]
     csv_writer.writerow([fieldnames[i] for i in col_idx_to_keep])
 
-    print(f'removing {len(col_idx_to_remove)} columns: ', end='', flush=True)
-    for row in progress(reader):
+    for row in progress(reader, desc=f'removing {len(col_idx_to_remove)} columns'):
         csv_writer.writerow([row[i] for i in col_idx_to_keep])
-    print()
     out_file.seek(0)
     return out_file
 
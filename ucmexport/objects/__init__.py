@@ -1,3 +1,20 @@
+from .tarindex import *
+from .progress import *
+from .index import *
+from .references import *
+from .cssgraph import *
+from .delta import *
+from .rowset import *
+from .ids import *
+from .relations import *
+from .query import *
+from .dntrie import *
+from .projection import *
+from .table import *
+from .coltypes import *
+from .row import *
+from .symbols import *
+from .snapshot import *
 from .phone import *
 from .devicepool import *
 from .css import *
@@ -1,41 +1,137 @@
-from tarfile import TarFile
-from io import TextIOWrapper
-from csv import DictReader
-from re import compile
-from itertools import chain
-
 import logging
-
-from collections import defaultdict
-from typing import List, Dict, Set
-
-__all__ = ['RE_TO_SNAIL', 'to_snail', 'ObjBase', 'CsvBase', 'DNAandPartitionRelated', 'REMOVE_ATTR_FROM_PARENT']
+import marshal
+from itertools import chain
+from time import perf_counter
+
+from collections.abc import MutableMapping
+from typing import List, Dict, Set, Union, Optional, Iterator, Callable, Any, Tuple, Iterable, Sequence, TYPE_CHECKING
+
+from .tarindex import TarIndex
+from .table import CsvTable, read_table, read_rows
+from .index import Index, IndexStats, UniqueDict, build_indexes, report_duplicates, INDEX_SCHEMA_VERSION
+from .progress import LoadMetrics, ProgressReporter
+from .projection import Projection, project_rows
+from .references import DnReference
+from .cssgraph import CssReference
+from .delta import Delta
+from .rowset import RowSet, RowUniverse
+from .coltypes import ColumnTypes, CoercionError
+from .row import Row, RowSchema, RE_TO_SNAIL, to_snail
+from .symbols import SymbolTable
+from .snapshot import SnapshotCache
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
+__all__ = ['RE_TO_SNAIL', 'to_snail', 'ObjBase', 'CsvBase', 'DNAandPartitionRelated', 'REMOVE_ATTR_FROM_PARENT',
+           'TarSource', 'parse_csv']
 
 log = logging.getLogger(__name__)
 
-RE_TO_SNAIL = compile(r"[ ./\-()']")
-
 # remove attributes from dict of parent: has significant performance impact
 # .. and does not really save memory
 REMOVE_ATTR_FROM_PARENT = False
 
 
-def to_snail(key: str) -> str:
-    """
-    Convert a header ro snail case. For example: "JIM DOE" -> "jim_doe"
-    :param key: string to convert
-    :return: snail case version
-    """
-    return RE_TO_SNAIL.sub('_', key).lower().strip('_')
-
-
 CHECK_FOR_NONE = False      # Raise an Exception if some CSV has a "None" column
 POP_NONE = True             # Remove "None" column when importing CSV
 CSV_TO_UPPER = True         # Convert all CSV Headers to uppercase
 WARN_LOWERCASE_HEADER = True   # log a warning for CSV files that have lowercase headers
+PERSIST_INDEXES = True      # persist built indexes next to the snapshots of the CSV files
 
 DNAandPartitionRelated = Dict[str, Set[str]]
 
+# containers read from a TAR file given by name or from an index shared by multiple containers
+TarSource = Union[str, TarIndex]
+
+
+def parse_csv(tar: TarIndex, csv_file: str, snapshot: Optional[SnapshotCache] = None,
+              progress=None, projection: Optional[Projection] = None,
+              symbols: Optional[SymbolTable] = None, metrics: Optional[LoadMetrics] = None) -> Optional[CsvTable]:
+    """
+    Parse a CSV file from a TAR file; use a snapshot if available
+    :param tar: TAR file
+    :param csv_file: name of the CSV file in the TAR file
+    :param snapshot: optional snapshot cache
+    :param progress: optional wrapper for the iterator of rows read from the CSV file
+    :param projection: optional projection; only the selected columns are kept. Snapshots are kept per projection
+    :param symbols: optional symbol table to intern the values of the table; applies to snapshots as well
+    :param metrics: optional metrics; source, rows, bytes, and parse time are updated
+    :return: parsed table or None if the CSV file does not exist in the TAR file
+    """
+    start = perf_counter()
+    if metrics is not None:
+        metrics.bytes = getattr(tar.members.get(csv_file), 'size', 0)
+    variant = '' if projection is None else projection.signature
+    if snapshot is not None and (table := snapshot.load(csv_file, variant=variant)) is not None:
+        log.debug(f'parse_csv: got {csv_file} from snapshot')
+        if symbols is not None:
+            # values are only shared within the snapshot; share them with the tables of other containers
+            symbols.intern_table(table)
+        if metrics is not None:
+            metrics.source = 'snapshot'
+            metrics.rows = len(table)
+            metrics.parse_seconds = perf_counter() - start
+        return table
+    log.debug(f'parse_csv: reading {csv_file} from {tar}')
+    try:
+        file = tar.open_text(csv_file)
+    except KeyError:
+        # file not found
+        return None
+    with file:
+        table = read_table(file, csv_file=csv_file, upper_header=CSV_TO_UPPER,
+                           warn_lowercase_header=WARN_LOWERCASE_HEADER, progress=progress, projection=projection)
+    if symbols is not None:
+        symbols.intern_table(table)
+    if metrics is not None:
+        metrics.source = 'csv'
+        metrics.rows = len(table)
+        metrics.parse_seconds = perf_counter() - start
+    if snapshot is not None:
+        snapshot.store(csv_file, table, variant=variant)
+    return table
+
+
+def column_index(header: List[str], column: str) -> int:
+    """
+    Determine the index of a column in a CSV header
+    :param header: CSV header
+    :param column: column name or snail case version of the column name
+    :return: index of the column. Raises KeyError if the column does not exist
+    """
+    try:
+        return header.index(column)
+    except ValueError:
+        pass
+    try:
+        return next(i for i, c in enumerate(header) if to_snail(c) == column)
+    except StopIteration:
+        raise KeyError(column)
+
+
+def column_filter(value: Any) -> Callable[[str], bool]:
+    """
+    Create a filter for a column value
+    :param value: a value to compare to, a collection of acceptable values or a predicate for the value. True and False
+        are treated as 't' and 'f'
+    :return: predicate for a column value
+    """
+    def as_csv(v):
+        if v is True:
+            return 't'
+        if v is False:
+            return 'f'
+        return v
+
+    if callable(value):
+        return value
+    if isinstance(value, (set, frozenset, list, tuple)):
+        values = frozenset(map(as_csv, value))
+        return values.__contains__
+    value = as_csv(value)
+    return value.__eq__
+
 
 class ObjMeta(type):
 
@@ -46,10 +142,48 @@ class ObjMeta(type):
         return c
 
 
+class ColumnAccessor:
+    """
+    Descriptor for an attribute of objects read from CSV files. Accessors are installed on object classes for all
+    columns of the CSV headers read so that attribute access does not need to fall back to ObjBase.__getattr__
+    """
+    __slots__ = ['name']
+
+    def __init__(self, name: str):
+        """
+        :param name: attribute name; snail case version of a column name
+        """
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        o = obj._obj
+        if type(o) is not Row:
+            return obj.__getattr__(self.name)
+        try:
+            r = o.attribute(self.name)
+        except KeyError:
+            raise AttributeError(self.name)
+        if r == 't':
+            return True
+        elif r == 'f':
+            return False
+        return r
+
+
 class ObjBase(metaclass=ObjMeta):
     __slots__ = ['_obj']
 
-    def __init__(self, o: Dict):
+    # if False then empty cells are not part of the object's dictionary
+    keep_empty_cells = True
+
+    # declared types of columns; values of typed columns are coerced when rows are read
+    column_types: Optional[ColumnTypes] = None
+
+    def __init__(self, o: MutableMapping):
+        if not self.keep_empty_cells and not (isinstance(o, Row) and not o.schema.keep_empty):
+            o = {k: v for k, v in o.items() if v}
         if CHECK_FOR_NONE:
             assert next((k for k in o if k is None), '') == '', \
                 f'ObjBase.__init__ None key found {", ".join(f"{k}:{v}" for k, v in o.items())}'
@@ -59,23 +193,35 @@ class ObjBase(metaclass=ObjMeta):
         self._obj = o
 
     @property
-    def dict(self):
+    def dict(self) -> MutableMapping:
+        """
+        Mapping of column names to values; typically a compact Row sharing the header with all other objects read
+        from the same CSV file
+        """
         return self._obj
 
     def __getattr__(self, item):
         if item == '_obj':
             raise AttributeError
-        attribute = self._snail_to_attribute.get(item)
-        if attribute is None:
-            # check if there is any attribute that matches the snail..
-            attribute = next((a for a in self._obj if item == to_snail(a)), None)
+        o = self._obj
+        if type(o) is Row:
+            # rows read from CSV files have a precompiled mapping from snail case identifiers to columns
+            try:
+                r = o.attribute(item)
+            except KeyError:
+                raise AttributeError
+        else:
+            attribute = self._snail_to_attribute.get(item)
             if attribute is None:
+                # check if there is any attribute that matches the snail..
+                attribute = next((a for a in o if item == to_snail(a)), None)
+                if attribute is None:
+                    raise AttributeError
+                self._snail_to_attribute[item] = attribute
+            try:
+                r = o[attribute]
+            except KeyError:
                 raise AttributeError
-            self._snail_to_attribute[item] = attribute
-        try:
-            r = self._obj[attribute]
-        except KeyError:
-            raise AttributeError
 
         if r == 't':
             return True
@@ -83,101 +229,709 @@ class ObjBase(metaclass=ObjMeta):
             return False
         return r
 
+    def value(self, column: str):
+        """
+        Typed value of a column; see column_types
+        :param column: column name
+        :return: value; None for empty cells of typed columns. Values which could not be coerced are returned as strings
+        """
+        o = self._obj
+        if type(o) is Row:
+            return o.value(column)
+        value = o[column]
+        column_type = self.column_types and self.column_types.type_of(column)
+        if column_type is None or column_type.typecode is None or not isinstance(value, str):
+            return value
+        if not value:
+            return None
+        try:
+            return column_type.decode(column_type.encode(value))
+        except ValueError:
+            return value
+
+    def typed_items(self) -> Iterator[Tuple[str, Any]]:
+        """
+        Iterate over the items of the object's dictionary with typed values for typed columns; empty cells are ''
+        """
+        o = self._obj
+        if type(o) is Row:
+            return o.typed_items()
+        return ((k, self.value(k) if v else v) for k, v in o.items())
+
     def __repr__(self):
         return f'{self.__class__.__name__}({self})'
 
     def __str__(self):
         return super(ObjBase, self).__repr__()
 
+    @classmethod
+    def install_accessors(cls, attributes: Iterable[str]):
+        """
+        Install accessors for attributes not yet defined on the class
+        :param attributes: attribute names; snail case versions of column names
+        """
+        for name in attributes:
+            if name.isidentifier() and not hasattr(cls, name):
+                setattr(cls, name, ColumnAccessor(name))
+
 
 class CsvBase:
-    __slots__ = ['_tar', '_objects', '_by_attribute']
+    __slots__ = ['_tar', '_snapshot', '_symbols', '_projection', '_progress', '_metrics', '_header', '_schema',
+                 '_objects', '_indexes', '_index_stats', '_persisted_indexes', '_modified', '_row_universe',
+                 '_row_sets']
+
+    # columns identifying an object; always kept when a projection is applied
+    key_columns: Tuple[str, ...] = ()
+
+    # declared indexes; available as by_<index name>. Indexes not declared are created on demand by by_attribute().
+    # A UniqueIndex named "key" on the natural key of the objects is used for container[key]
+    indexes: Tuple[Index, ...] = ()
 
-    def __init__(self, tar: str):
-        self._tar = tar
+    def __init__(self, tar: TarSource):
+        """
+        :param tar: TAR file name or index of a TAR file shared with other containers
+        """
+        self._tar = TarIndex.of(tar)
+        self._snapshot: Optional[SnapshotCache] = None
+        self._symbols: Optional[SymbolTable] = None
+        self._projection: Optional[Projection] = None
+        self._progress: Optional[ProgressReporter] = None
+        self._metrics: Optional[LoadMetrics] = None
+        self._header: List[str] = []
+        self._schema: Optional[RowSchema] = None
         self._objects = None
-        self._by_attribute: Dict[str, Dict[str, List[...]]] = dict()
+        self._indexes: Dict[str, Dict[Any, Any]] = dict()
+        self._index_stats: Dict[str, IndexStats] = dict()
+        # persisted indexes: index name -> (signature, marshalled index); None if not read yet
+        self._persisted_indexes: Optional[Dict[str, Tuple[str, bytes]]] = None
+        # True if a delta has been applied: the objects don't match the CSV file anymore
+        self._modified = False
+        # row ids of the objects and row sets by index name; see row_sets()
+        self._row_universe: Optional[RowUniverse] = None
+        self._row_sets: Dict[str, Dict[Any, RowSet]] = dict()
+
+    @classmethod
+    def csv_file(cls) -> str:
+        """
+        Name of the CSV file in the TAR file. Class names are assumed to be <csv file name>Container
+        :return: CSV file name
+        """
+        csv_file = cls.__name__.lower()
+        assert csv_file.endswith('container')
+        # strip 'container'
+        return f'{csv_file[:-9]}.csv'
+
+    @property
+    def tar(self) -> TarIndex:
+        """
+        Index of the TAR file the container reads from
+        """
+        return self._tar
+
+    @property
+    def snapshot(self) -> Optional[SnapshotCache]:
+        """
+        Cache for parsed CSV contents; None if no cache is used
+        """
+        return self._snapshot
+
+    @snapshot.setter
+    def snapshot(self, snapshot: Optional[SnapshotCache]):
+        self._snapshot = snapshot
+
+    @property
+    def symbols(self) -> Optional[SymbolTable]:
+        """
+        Symbol table used to intern values of CSV files read; None if values are not interned
+        """
+        return self._symbols
+
+    @symbols.setter
+    def symbols(self, symbols: Optional[SymbolTable]):
+        self._symbols = symbols
+
+    @property
+    def progress(self) -> Optional[ProgressReporter]:
+        """
+        Reporter for the progress of reading the CSV file; None if progress is not reported
+        """
+        return self._progress
+
+    @progress.setter
+    def progress(self, progress: Optional[ProgressReporter]):
+        self._progress = progress
+
+    @property
+    def metrics(self) -> Optional[LoadMetrics]:
+        """
+        Metrics of reading the objects of the container; None if the container has not been read yet
+        """
+        return self._metrics
+
+    def new_metrics(self) -> LoadMetrics:
+        """
+        Create empty metrics for reading the objects of the container
+        """
+        return LoadMetrics(container=self.__class__.__name__, csv_file=self.csv_file())
+
+    @property
+    def projection(self) -> Optional[Projection]:
+        """
+        Projection applied when reading the CSV file; includes the key columns of the container. None if all columns
+        are read
+        """
+        if self._projection is None:
+            return None
+        return self._projection.with_columns(self.key_columns)
+
+    @projection.setter
+    def projection(self, projection: Optional[Projection]):
+        if self.loaded:
+            raise ValueError(f'{self.__class__.__name__}: projection can only be set before objects are read')
+        self._projection = projection
+
+    def _track(self, csv_file: str) -> Optional[Callable[[Iterable], Iterable]]:
+        """
+        Wrapper for the iterator of rows read from the CSV file; None if progress is not reported
+        """
+        reporter = self._progress
+        if reporter is None:
+            return None
+        total_bytes = getattr(self._tar.members.get(csv_file), 'size', None)
+        return lambda rows: reporter.track(csv_file, rows, total_bytes=total_bytes)
+
+    def read_table(self, metrics: Optional[LoadMetrics] = None) -> Optional[CsvTable]:
+        """
+        Parse the CSV file of the container; use a snapshot if available
+        :param metrics: optional metrics updated with the parse time
+        :return: parsed table or None if the CSV file does not exist in the TAR file
+        """
+        csv_file = self.csv_file()
+        return parse_csv(tar=self._tar, csv_file=csv_file, snapshot=self._snapshot, progress=self._track(csv_file),
+                         projection=self.projection, symbols=self._symbols, metrics=metrics)
+
+    def frame_table(self) -> CsvTable:
+        """
+        Table the frames of the container are built from: the parsed CSV file, or the current rows of the objects if
+        deltas have been applied
+        :return: table; empty if the CSV file does not exist in the TAR file
+        """
+        if self._modified:
+            header = self._header
+            return CsvTable(list(header), [[o.dict.get(column) or '' for column in header] for o in self.csv_objects()])
+        if (table := self.read_table()) is None:
+            return CsvTable([], [])
+        return table
+
+    def to_frame(self, columns: Optional[Sequence[str]] = None) -> 'DataFrame':
+        """
+        pandas DataFrame with one row per row of the CSV file; built from the parsed CSV file w/o creating objects.
+        Columns with low cardinality are categorical and columns with declared types have boolean or integer dtypes;
+        see table_frame(). Requires pandas
+        :param columns: columns to include in this order; default: all columns
+        :return: frame
+        """
+        # pandas is only imported if frames are used
+        from .frames import table_frame
+        return table_frame(self.frame_table(), columns=columns, column_types=self.factory.column_types)
+
+    def csv_header(self) -> List[str]:
+        """
+        Header of the CSV file in the TAR file; only the header is read. Empty if the CSV file does not exist
+        """
+        csv_file = self.csv_file()
+        try:
+            file = self._tar.open_text(csv_file)
+        except KeyError:
+            return []
+        with file:
+            return next(read_rows(file, csv_file=csv_file, upper_header=CSV_TO_UPPER, warn_lowercase_header=False), [])
+
+    @property
+    def header(self) -> List[str]:
+        """
+        CSV header of the objects read; empty if the container has not been read yet
+        """
+        return self._header
+
+    @property
+    def schema(self) -> Optional[RowSchema]:
+        """
+        Schema shared by the rows of all objects read; None if the container has not been read yet
+        """
+        return self._schema
+
+    def row_schema(self, header: List[str]) -> RowSchema:
+        """
+        Create a schema for rows read from the CSV file of the container. Accessors for all columns are installed on the
+        class of the objects of the container
+        :param header: CSV header
+        :return: schema
+        """
+        factory = self.factory
+        schema = RowSchema(header, keep_empty=factory.keep_empty_cells, types=factory.column_types)
+        factory.install_accessors(schema.attributes)
+        return schema
+
+    @property
+    def coercion_errors(self) -> List[CoercionError]:
+        """
+        Values of typed columns which could not be coerced when the objects were read
+        """
+        if self._schema is None:
+            return []
+        return self._schema.errors
+
+    @property
+    def loaded(self) -> bool:
+        """
+        True if the objects of the container already have been read
+        """
+        return self._objects is not None
+
+    def install(self, table: Optional[CsvTable], metrics: Optional[LoadMetrics] = None):
+        """
+        Create the objects of the container from a parsed CSV file
+        :param table: parsed CSV file; None if the CSV file does not exist in the TAR file
+        :param metrics: metrics of parsing the CSV file; updated with the time needed to create the objects
+        """
+        start = perf_counter()
+        if metrics is None:
+            metrics = self.new_metrics()
+            metrics.rows = 0 if table is None else len(table)
+        if table is None:
+            self._header = []
+            self._schema = None
+            self._objects = []
+        else:
+            factory = self.__class__.factory
+            self._header = table.header
+            self._schema = self.row_schema(table.header)
+            row = self._schema.row
+            self._objects = [factory(row(values)) for values in table.rows]
+            if errors := self._schema.errors:
+                log.warning(f'{self.__class__.__name__}: {len(errors)} values could not be coerced, first: '
+                            f'{", ".join(map(str, errors[:5]))}')
+        # indexes need to be recreated based on the new objects
+        self._indexes = dict()
+        self._index_stats = dict()
+        self._persisted_indexes = None
+        self._modified = False
+        self._row_universe = None
+        self._row_sets = dict()
+        self.invalidate()
+        metrics.construct_seconds = perf_counter() - start
+        self._metrics = metrics
+        if self._progress is not None:
+            self._progress.report(metrics)
+        log.debug(f'{self.__class__.__name__}: {len(self._objects)} objects installed')
 
     @property
     def list(self) -> List[ObjBase]:
-        def progress(items):
-            print(f'reading {self.factory.__name__}s from {csv_file}', end='', flush=True)
-            i = 0
-            for i, e in enumerate(items):
-                if i % 200 == 0:
-                    print('.', end='', flush=True)
-                yield e
-            print(f', got {i + 1} {self.factory.__name__}s')
+        return self.csv_objects()
 
+    def csv_objects(self) -> List[ObjBase]:
+        """
+        Objects of the container in the order of the rows of the CSV file followed by objects added by deltas. Object
+        positions in persisted indexes and the pairing with the CSV rows in iter() refer to this order. Containers can
+        present the objects in a different order in list (see RoutePatternContainer) but must not reorder this list
+        """
         if self._objects is None:
-            # read from CSV. Determine CSV file name from class name
-            # class names are assumed to be <csv file name>Container
-            csv_file = self.__class__.__name__.lower()
-            assert csv_file.endswith('container')
-            # strip 'container'
-            csv_file = f'{csv_file[:-9]}.csv'
-            log.debug(f'{self.__class__.__name__}.list: reading {csv_file} from {self._tar}')
-
-            with TarFile(name=self._tar, mode='r') as tar:
-                try:
-                    file = TextIOWrapper(tar.extractfile(member=csv_file), encoding='utf-8')
-                except KeyError:
-                    # file not found
-                    self._objects = []
-                else:
-                    if CSV_TO_UPPER:
-                        def upper_first_line(it):
-                            first_line = next(it)
-                            first_line_upper = first_line.upper()
-                            if WARN_LOWERCASE_HEADER and first_line != first_line_upper:
-                                logging.warning(f'found lowercase header in {csv_file}')
-                            return chain([first_line_upper], it)
-                        file = upper_first_line(file)
-                    csv_reader = DictReader(file, delimiter=',', doublequote=True, escapechar=None, quotechar='"',
-                                            skipinitialspace=True, strict=True)
-                    self._objects = [self.__class__.factory(o) for o in progress(csv_reader)]
-            log.debug(f'done reading {csv_file} from {self._tar}: {len(self._objects)} objects read')
+            metrics = self.new_metrics()
+            self.install(self.read_table(metrics=metrics), metrics=metrics)
         return self._objects
 
-    def by_attribute(self, attribute: str) -> Dict[str, List[ObjBase]]:
+    def iter(self, where: Optional[Callable[[Dict], bool]] = None, **columns) -> Iterator[ObjBase]:
+        """
+        Iterate over the objects of the container.
+        If the container has not been read yet then objects are created directly from the CSV file in the TAR file
+        and are not kept: memory consumption does not depend on the size of the CSV file. Filters are applied before
+        an object is created; column filters can also use columns not selected by the projection of the container.
+        For a container already read these columns are read from the CSV file; this is not possible anymore once a
+        delta has been applied (KeyError).
+        :param where: optional predicate applied to the row dictionary
+        :param columns: column filters. Keys are column names or snail case versions of the column names; values are
+            either a value, a collection of acceptable values or a predicate for the value
+        :return: iterator of objects
+        """
+        if self._objects is not None:
+            yield from self._iter_loaded(where=where, **columns)
+            return
+        csv_file = self.csv_file()
+        try:
+            file = self._tar.open_text(csv_file)
+        except KeyError:
+            # file not found
+            return
+        with file:
+            rows = read_rows(file, csv_file=csv_file, upper_header=CSV_TO_UPPER,
+                             warn_lowercase_header=WARN_LOWERCASE_HEADER)
+            header = next(rows, [])
+            filters = [(column_index(header, column), column_filter(value)) for column, value in columns.items()]
+            if filters:
+                rows = (row for row in rows if all(i < len(row) and f(row[i]) for i, f in filters))
+            if (track := self._track(csv_file)) is not None:
+                rows = track(rows)
+            header, rows = project_rows(header=header, rows=rows, projection=self.projection)
+            factory = self.__class__.factory
+            make_row = self.row_schema(header).row
+            for row in rows:
+                o = make_row(row)
+                if where is not None and not where(o):
+                    continue
+                yield factory(o)
+
+    def _iter_loaded(self, where: Optional[Callable[[Dict], bool]] = None, **columns) -> Iterator[ObjBase]:
+        """
+        Iterate over the objects already read applying the same filters as iter()
+        """
+        header = self._header
+        filters = []
+        # filters on columns not selected by the projection
+        not_read = dict()
+        for column, value in columns.items():
+            try:
+                filters.append((header[column_index(header, column)], column_filter(value)))
+            except KeyError:
+                if self._projection is None:
+                    raise
+                not_read[column] = value
+        objects = self._objects if not not_read else self._filter_by_csv(not_read)
+        for o in objects:
+            d = o.dict
+            if filters and not all(f(d.get(column, '')) for column, f in filters):
+                continue
+            if where is not None and not where(d):
+                continue
+            yield o
+
+    def _filter_by_csv(self, columns: Dict[str, Any]) -> List[ObjBase]:
+        """
+        Objects already read for which column filters on columns not selected by the projection hold. The columns are
+        read from the CSV file; objects correspond to the rows of the CSV file by position (see csv_objects())
+        :param columns: column filters; see iter()
+        :return: objects in the order of the CSV file
+        """
+        if self._modified:
+            raise KeyError(f'{self.__class__.__name__}: column(s) {", ".join(columns)} not selected by the projection '
+                           f'can not be filtered on after a delta has been applied')
+        csv_file = self.csv_file()
+        try:
+            file = self._tar.open_text(csv_file)
+        except KeyError:
+            # file not found
+            return []
+        with file:
+            rows = read_rows(file, csv_file=csv_file, upper_header=CSV_TO_UPPER,
+                             warn_lowercase_header=WARN_LOWERCASE_HEADER)
+            header = next(rows, [])
+            filters = [(column_index(header, column), column_filter(value)) for column, value in columns.items()]
+            return [o for o, row in zip(self._objects, rows) if all(i < len(row) and f(row[i]) for i, f in filters)]
+
+    @classmethod
+    def declared_index(cls, name: str) -> Optional[Index]:
+        """
+        Declared index with the given name
+        :param name: index name
+        :return: index declaration; None if no index with that name is declared
+        """
+        return next((index for index in cls.indexes if index.name == name), None)
+
+    def build_indexes(self, *names: str) -> None:
+        """
+        Build multiple indexes in a single scan over the objects of the container. Indexes already built are skipped
+        :param names: names of declared indexes or attributes to group by; default: all declared indexes
+        """
+        names = names or [index.name for index in self.indexes]
+        to_build = [self.declared_index(name) or Index(name) for name in dict.fromkeys(names)
+                    if name not in self._indexes]
+        if not to_build:
+            return
+        # persisted indexes refer to objects by position
+        objects = self.csv_objects()
+        if persisted := self._read_persisted_indexes():
+            factory = self.factory
+            for index in to_build:
+                signature, data = persisted.get(index.name, ('', b''))
+                if signature != index.signature(factory):
+                    continue
+                start = perf_counter()
+                d = index.load(marshal.loads(data), objects)
+                stats = index.stats(d, perf_counter() - start)
+                stats.source = 'snapshot'
+                log.debug(f'build_indexes: {stats}')
+                report_duplicates(factory, index.name, d)
+                self._indexes[index.name] = d
+                self._index_stats[index.name] = stats
+            to_build = [index for index in to_build if index.name not in self._indexes]
+            if not to_build:
+                return
+        built, stats = self._scan_indexes(to_build)
+        self._indexes.update(built)
+        self._index_stats.update(stats)
+        self._persist_indexes(to_build)
+
+    def _scan_indexes(self, indexes: List[Index]) -> Tuple[Dict[str, Dict], Dict[str, IndexStats]]:
+        """
+        Build indexes from the objects of the container; called for indexes which can't be loaded from persisted
+        indexes. Containers can override this to build some indexes from data derived from the objects
+        :param indexes: indexes to build
+        :return: built indexes and statistics, both indexed by index name
+        """
+        return build_indexes(indexes, factory=self.factory, objects=self.list)
+
+    def _persisted_indexes_variant(self) -> str:
+        projection = self.projection
+        return 'indexes' if projection is None else f'indexes.{projection.signature}'
+
+    def _read_persisted_indexes(self) -> Dict[str, Tuple[str, bytes]]:
+        """
+        Persisted indexes of the container. Only valid for the objects read from the CSV file with the current
+        projection: the persisted indexes are stored in the snapshot directory of the TAR file and refer to objects by
+        position
+        :return: persisted indexes: index name -> (signature, marshalled index)
+        """
+        if self._persisted_indexes is None:
+            self._persisted_indexes = dict()
+            if PERSIST_INDEXES and self._snapshot is not None and not self._modified:
+                data = self._snapshot.load_data(self.csv_file(), variant=self._persisted_indexes_variant())
+                if data is not None:
+                    version, length, indexes = data
+                    if version == INDEX_SCHEMA_VERSION and length == len(self._objects):
+                        self._persisted_indexes = indexes
+        return self._persisted_indexes
+
+    def _persist_indexes(self, indexes: Iterable[Index]) -> None:
+        """
+        Add indexes to the persisted indexes of the container
+        :param indexes: indexes to persist; the indexes have to be built
+        """
+        if not PERSIST_INDEXES or self._snapshot is None or self._modified:
+            return
+        persisted = self._read_persisted_indexes()
+        objects = self._objects
+        positions = {id(o): i for i, o in enumerate(objects)}
+        factory = self.factory
+        for index in indexes:
+            try:
+                data = marshal.dumps(index.dump(self._indexes[index.name], positions))
+            except ValueError:
+                # keys which can't be marshalled; for example objects
+                log.debug(f'{self.__class__.__name__}: index {index.name} can not be persisted')
+                continue
+            persisted[index.name] = (index.signature(factory), data)
+        self._snapshot.store_data(self.csv_file(), data=(INDEX_SCHEMA_VERSION, len(objects), persisted),
+                                  variant=self._persisted_indexes_variant())
+
+    def has_index(self, name: str) -> bool:
+        """
+        True if an index (declared or ad-hoc) with the given name has been built
+        """
+        return name in self._indexes
+
+    @property
+    def index_stats(self) -> Dict[str, IndexStats]:
+        """
+        Build time and memory of the indexes built so far, indexed by index name
+        """
+        return self._index_stats
+
+    def by_attribute(self, attribute: str) -> Dict[Any, Any]:
         """
         get list of objects by attribute key
-        :param attribute: attribute or property name to create the grouping from
+        :param attribute: name of a declared index, or attribute or property name to create the grouping from
         :return: dictionary with attribute values as key and list of objects as values
         """
+        # _indexes is a cache of groupings
+        if (d := self._indexes.get(attribute)) is None:
+            self.build_indexes(attribute)
+            d = self._indexes[attribute]
+        return d
+
+    @property
+    def row_universe(self) -> RowUniverse:
+        """
+        Row ids of the objects of the container; row sets of the container are bitmaps over these row ids
+        """
+        if self._row_universe is None:
+            self._row_universe = RowUniverse(self.list)
+        return self._row_universe
+
+    def row_set(self, objects: Iterable = ()) -> RowSet:
+        """
+        Row set for objects of the container
+        :param objects: objects of the container
+        :return: row set
+        """
+        return self.row_universe.row_set(objects)
 
-        def attr_key(o: ObjBase) -> str:
-            """
-            get key value by accessing an attribute of an object; but respect snail mapping
-            :param o: object
-            :return: key value
-            """
-            return o.__getattr__(attribute)
-
-        def property_key(o: ObjBase) -> str:
-            """
-            get key value by evaluating a property
-            :param o: object
-            :return: key value
-            """
-            return prop.fget(o)
-
-        # _by_attribute is a cache of groupings
-        if (d := self._by_attribute.get(attribute)) is None:
-            # 1st time this grouping is requested
-            # attribute can be a name of a property or an attribute
-            if prop := self.factory.__dict__.get(attribute):
-                # get keys using fget() of the property object
-                key = property_key
+    def rows_with(self, attribute: str, keys: Iterable[Any]) -> RowSet:
+        """
+        Objects with any of the given keys in an index as row set; for example all phones with any of the DN:partitions
+        of a hunt pilot
+        :param attribute: index name; see by_attribute()
+        :param keys: keys to look up
+        :return: row set
+        """
+        if (row_sets := self._row_sets.get(attribute)) is not None:
+            get = row_sets.get
+            return RowSet(self.row_universe).union(*(rows for k in keys if (rows := get(k)) is not None))
+        get = self.by_attribute(attribute).get
+        objects = []
+        for k in keys:
+            if (entries := get(k)) is None:
+                continue
+            if isinstance(entries, (list, set, frozenset)):
+                objects.extend(entries)
             else:
-                # get keys by directly accessing the attribute: look at the dict of an object
-                key = attr_key
-            d = defaultdict(list)
-            for o in self.list:
-                d[key(o)].append(o)
-            d = dict(d)
-            self._by_attribute[attribute] = d
-        return d
+                objects.append(entries)
+        return self.row_set(objects)
+
+    def row_sets(self, attribute: str) -> Dict[Any, RowSet]:
+        """
+        Index with row sets instead of collections of objects; for example phones by DN:partition. The row sets of an
+        index are created on first use and kept until the objects change. Row sets with few objects are kept as arrays
+        of row ids (see RowSet): memory is proportional to the number of objects per key and not to the number of
+        objects in the container
+        :param attribute: index name; see by_attribute()
+        :return: dictionary with index keys as keys and row sets as values
+        """
+        if (row_sets := self._row_sets.get(attribute)) is None:
+            universe = self.row_universe
+            row_sets = {k: universe.row_set(entries if isinstance(entries, (list, set, frozenset)) else (entries,))
+                        for k, entries in self.by_attribute(attribute).items()}
+            self._row_sets[attribute] = row_sets
+        return row_sets
+
+    def dn_references(self, objects: Optional[Iterable] = None) -> Iterator[DnReference]:
+        """
+        References to DN:partitions from the objects of the container; see ReferenceIndex
+        :param objects: objects to get the references for; default: all objects of the container
+        """
+        return iter(())
+
+    def css_references(self, objects: Optional[Iterable] = None) -> Iterator[CssReference]:
+        """
+        References to CSSes from the objects of the container; see CssGraph
+        :param objects: objects to get the references for; default: all objects of the container
+        """
+        return iter(())
+
+    def invalidate(self) -> None:
+        """
+        Drop data derived from the objects of the container other than indexes; called whenever the objects change
+        """
+        pass
+
+    def apply_delta(self, added: Iterable[Dict[str, str]] = (), changed: Iterable[Dict[str, str]] = (),
+                    removed: Iterable[Any] = ()) -> Delta:
+        """
+        Apply changes to the objects of the container and update all indexes built so far incrementally. Changed and
+        removed objects are identified by their natural key (see by_key); changed objects are replaced by new objects.
+        Nothing is changed if any of the changes can't be applied; see prepare_delta()
+        :param added: rows of new objects; dictionaries with CSV column names as keys. Missing columns are empty
+        :param changed: complete rows of changed objects; the key columns identify the object to replace
+        :param removed: keys of objects to remove
+        :return: objects added, changed, and removed
+        """
+        return self.commit_delta(self.prepare_delta(added=added, changed=changed, removed=removed))
+
+    def prepare_delta(self, added: Iterable[Dict[str, str]] = (), changed: Iterable[Dict[str, str]] = (),
+                      removed: Iterable[Any] = ()) -> Delta:
+        """
+        Validate changes and create the objects for them w/o changing the container; see commit_delta(). Unknown
+        columns and unknown keys raise a ValueError resp. a KeyError; changing or removing an object with a duplicate
+        key raises a ValueError
+        :param added: rows of new objects; dictionaries with CSV column names as keys. Missing columns are empty
+        :param changed: complete rows of changed objects; the key columns identify the object to replace
+        :param removed: keys of objects to remove
+        :return: objects to add, change, and remove
+        """
+        self.csv_objects()
+        key_index = self.declared_index('key')
+        if key_index is None:
+            raise TypeError(f'{self.__class__.__name__} has no unique key')
+        added = list(added)
+        changed = list(changed)
+        header = self._header
+        schema = self._schema
+        if schema is None:
+            # CSV file did not exist: the header is given by the rows added; it is set when the delta is committed
+            header = list(dict.fromkeys(column for row in chain(added, changed) for column in row))
+            schema = self.row_schema(header)
+        columns = set(header)
+        factory = self.factory
+        make_row = schema.row
+
+        def new_object(row: Dict[str, str]) -> ObjBase:
+            if self._projection is None and (unknown := [column for column in row if column not in columns]):
+                raise ValueError(f'{self.__class__.__name__}: unknown column(s): {", ".join(unknown)}')
+            return factory(make_row([row.get(column, '') for column in header]))
+
+        by_key = self.by_key
+
+        def existing(k: Any) -> ObjBase:
+            if k in by_key.duplicates:
+                raise ValueError(f'{self.__class__.__name__}: key {k} identifies {len(by_key.duplicates[k])} objects')
+            return by_key[k]
+
+        key = key_index.key_function(factory)
+        delta = Delta(added=[new_object(row) for row in added])
+        for row in changed:
+            new = new_object(row)
+            delta.changed.append((existing(key(new)), new))
+        delta.removed = [existing(k) for k in removed]
+        return delta
+
+    def commit_delta(self, delta: Delta) -> Delta:
+        """
+        Apply changes validated by prepare_delta() and update all indexes built so far incrementally. The container must
+        not have been changed since the delta was prepared
+        :param delta: objects to add, change, and remove
+        :return: the delta
+        """
+        if not delta:
+            return delta
+        objects = self.csv_objects()
+        factory = self.factory
+        new_objects = delta.new_objects
+        if self._schema is None:
+            self._schema = new_objects[0].dict.schema
+            self._header = list(self._schema.header)
+        old_objects = delta.old_objects
+        for name, index in self._indexes.items():
+            declared = self.declared_index(name) or Index(name)
+            index_key = declared.key_function(factory)
+            declared.discard(index, old_objects, index_key)
+            declared.extend(index, new_objects, index_key)
+
+        # update the list of objects in place; changed objects keep their position
+        replace = {id(old): new for old, new in delta.changed}
+        removed_ids = {id(o) for o in delta.removed}
+        objects[:] = [replace.get(id(o), o) for o in objects if id(o) not in removed_ids]
+        objects.extend(delta.added)
+        self._modified = True
+        self._persisted_indexes = None
+        # row ids shift if objects are removed
+        self._row_universe = None
+        self._row_sets = dict()
+        self.invalidate()
+        log.debug(f'{self.__class__.__name__}: applied delta: {delta}')
+        return delta
+
+    @property
+    def by_key(self) -> UniqueDict:
+        """
+        Unique index on the natural key of the objects; duplicate keys are reported when the index is built
+        """
+        if (index := self._indexes.get('key')) is None:
+            if self.declared_index('key') is None:
+                raise TypeError(f'{self.__class__.__name__} has no unique key')
+            index = self.by_attribute('key')
+        return index
+
+    def __getitem__(self, item):
+        return self.by_key[item]
 
     def __getattr__(self, item: str):
         """
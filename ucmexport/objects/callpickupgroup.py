@@ -1,7 +1,8 @@
 from .base import *
+from .references import DnReference, ROLE_NUMBER
 
 from re import compile
-from typing import List
+from typing import List, Iterator, Optional, Iterable
 
 __all__ = ['CallPickupGroupContainer', 'CallPickupGroup']
 
@@ -41,3 +42,7 @@ class CallPickupGroupContainer(CsvBase):
     @property
     def list(self) -> List[CallPickupGroup]:
         return super(CallPickupGroupContainer, self).list
+
+    def dn_references(self, objects: Optional[Iterable] = None) -> Iterator[DnReference]:
+        return (DnReference.of(o.number_and_partition, o, ROLE_NUMBER)
+                for o in (self.list if objects is None else objects))
@@ -0,0 +1,218 @@
+import re
+from abc import ABC, abstractmethod
+from array import array
+from dataclasses import dataclass
+from typing import Optional, Iterable, Dict, Any, Sequence
+
+from .projection import group_pattern
+
+__all__ = ['ColumnType', 'Bool', 'Int', 'Enum', 'Str', 'ColumnTypes', 'CoercionError']
+
+
+@dataclass
+class CoercionError:
+    """
+    Value of a typed column which could not be coerced to the type of the column
+    """
+    # index of the row in the CSV file; 0 is the 1st row after the header
+    row: int
+    column: str
+    value: str
+    reason: str
+
+    def __str__(self):
+        return f'row {self.row}, {self.column}: {self.value!r} {self.reason}'
+
+
+class ColumnType(ABC):
+    """
+    Type of a CSV column. Values of typed columns are coerced once when rows are read and are kept in an array with one
+    entry per row.
+    """
+    # typecode of the array used to store the values; None: values are not stored separately
+    typecode: Optional[str] = None
+    # value stored for empty cells and for values which can't be coerced
+    empty = 0
+
+    def __init__(self, column: str):
+        """
+        :param column: column name or group of numbered columns like "SELECTION ORDER n"; see Projection
+        """
+        self.column = column
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.column!r})'
+
+    def storage(self) -> array:
+        """
+        Create an empty array for the values of a column
+        """
+        return array(self.typecode)
+
+    @abstractmethod
+    def encode(self, value: str) -> Any:
+        """
+        Convert a CSV value to the value stored. Raises ValueError if the value can't be coerced
+        """
+
+    @abstractmethod
+    def decode(self, stored: Any) -> Any:
+        """
+        Typed value for a stored value
+        """
+
+    @abstractmethod
+    def text(self, stored: Any) -> str:
+        """
+        CSV value for a stored value
+        """
+
+
+class Str(ColumnType):
+    """
+    String column; this is the default for all columns without declared type. Values are kept in the rows as they are
+    """
+
+    def encode(self, value: str) -> str:
+        return value
+
+    def decode(self, stored: str) -> str:
+        return stored
+
+    def text(self, stored: str) -> str:
+        return stored
+
+
+class Bool(ColumnType):
+    """
+    Boolean column: 't' and 'f'
+    """
+    typecode = 'b'
+    empty = -1
+
+    def encode(self, value: str) -> int:
+        if value == 't':
+            return 1
+        if value == 'f':
+            return 0
+        raise ValueError("is not 't' or 'f'")
+
+    def decode(self, stored: int) -> bool:
+        return stored == 1
+
+    def text(self, stored: int) -> str:
+        return 't' if stored == 1 else 'f'
+
+
+class Int(ColumnType):
+    """
+    Integer column
+    """
+    typecode = 'q'
+    empty = -2 ** 63
+
+    def encode(self, value: str) -> int:
+        try:
+            i = int(value)
+        except ValueError:
+            raise ValueError('is not an integer')
+        # only accept values which convert back to the same string
+        if str(i) != value:
+            raise ValueError('is not a canonical integer')
+        if not self.empty < i < 2 ** 63:
+            raise ValueError('is out of range')
+        return i
+
+    def decode(self, stored: int) -> int:
+        return stored
+
+    def text(self, stored: int) -> str:
+        return str(stored)
+
+
+class Enum(ColumnType):
+    """
+    Column with a limited set of values. Values are stored as small integers
+    """
+    typecode = 'H'
+    empty = 0
+
+    def __init__(self, column: str, values: Optional[Iterable[str]] = None):
+        """
+        :param column: column name or group of numbered columns
+        :param values: allowed values; if None then the values are collected when reading rows
+        """
+        super().__init__(column)
+        self.fixed = values is not None
+        self._values = ['']
+        self._codes: Dict[str, int] = {'': 0}
+        for value in values or []:
+            self._add(value)
+
+    def _add(self, value: str) -> int:
+        code = len(self._values)
+        self._values.append(value)
+        self._codes[value] = code
+        return code
+
+    @property
+    def values(self) -> Sequence[str]:
+        """
+        Values of the enum; known so far if the values are collected when reading rows
+        """
+        return self._values[1:]
+
+    def encode(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            if self.fixed:
+                raise ValueError('is not a valid value')
+            if len(self._values) >= 2 ** 16:
+                raise ValueError('exceeds the maximum number of values')
+            code = self._add(value)
+        return code
+
+    def decode(self, stored: int) -> str:
+        return self._values[stored]
+
+    def text(self, stored: int) -> str:
+        return self._values[stored]
+
+
+class ColumnTypes:
+    """
+    Declared types of the columns of a CSV file. Each declaration applies to the column with the given name and to all
+    numbered columns of that name; for example Int('SELECTION ORDER') applies to 'SELECTION ORDER 1',
+    'SELECTION ORDER 2', ...
+    """
+
+    def __init__(self, *types: ColumnType):
+        self.types = types
+        self._patterns = [(re.compile(group_pattern(t.column), re.IGNORECASE), t) for t in types]
+        self._cache: Dict[str, Optional[ColumnType]] = dict()
+
+    def __repr__(self):
+        return f'ColumnTypes({", ".join(map(repr, self.types))})'
+
+    def type_of(self, column: str) -> Optional[ColumnType]:
+        """
+        Declared type of a column
+        :param column: column name
+        :return: column type; None if no type is declared for the column
+        """
+        try:
+            return self._cache[column]
+        except KeyError:
+            pass
+        column_type = next((t for pattern, t in self._patterns if pattern.fullmatch(column)), None)
+        self._cache[column] = column_type
+        return column_type
+
+    def resolve(self, header: Sequence[str]) -> Dict[int, ColumnType]:
+        """
+        Types of the columns of a CSV header with separate storage
+        :param header: CSV header
+        :return: column types indexed by column index
+        """
+        return {i: t for i, column in enumerate(header)
+                if (t := self.type_of(column)) is not None and t.typecode is not None}
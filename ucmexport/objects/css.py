@@ -1,4 +1,5 @@
 from .base import *
+from .index import UniqueIndex
 
 from typing import Dict, List
 
@@ -42,13 +43,15 @@ class Css(ObjBase):
 
 class CssContainer(CsvBase):
     factory = Css
+    key_columns = ('NAME',)
+    indexes = (UniqueIndex('key', key='name'),)
 
     @property
     def list(self) -> List[Css]:
         return super(CssContainer, self).list
 
     def __getitem__(self, item) -> Css:
-        return self.by_name[item][0]
+        return self.by_key[item]
 
     def partition_names(self, css_name: str) -> List[str]:
         if css_name:
@@ -0,0 +1,194 @@
+import logging
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Optional, Dict, List, Set, Iterable, Tuple, FrozenSet
+
+__all__ = ['CssReference', 'CssGraph', 'ROLE_DEVICE_CSS', 'ROLE_LINE_CSS', 'ROLE_AAR_CSS', 'ROLE_PATTERN_CSS']
+
+log = logging.getLogger(__name__)
+
+# roles of a reference to a CSS
+ROLE_DEVICE_CSS = 'device'      # CSS of a phone, device profile or RDP
+ROLE_LINE_CSS = 'line'          # line CSS on a phone or device profile; index is the line index
+ROLE_AAR_CSS = 'aar'            # AAR CSS of a phone or device pool
+ROLE_PATTERN_CSS = 'pattern'    # CSS of a translation pattern
+
+
+@dataclass(frozen=True)
+class CssReference:
+    """
+    Reference to a CSS from an object
+    """
+    css: str
+    # class name of the referencing object; for example "Phone"
+    object_type: str
+    # key of the referencing object; for example the device name of a phone
+    key: str
+    role: str
+    index: Optional[int] = None
+    # DN:partition of the line for line CSS references
+    dn_and_partition: str = ''
+    obj: Any = field(default=None, compare=False, repr=False)
+
+    @staticmethod
+    def of(css: str, obj: Any, role: str, index: Optional[int] = None, dn_and_partition: str = '') -> 'CssReference':
+        """
+        Create a reference from an object; the key of the object is its string representation
+        """
+        return CssReference(css=css, object_type=obj.__class__.__name__, key=str(obj), role=role, index=index,
+                            dn_and_partition=dn_and_partition, obj=obj)
+
+    def __str__(self):
+        index = '' if self.index is None else f' {self.index}'
+        return f'{self.css} <- {self.object_type} {self.key} ({self.role}{index})'
+
+
+class CssGraph:
+    """
+    Bidirectional index between CSSes, partitions and the objects using CSSes:
+        * partitions of a CSS and CSSes containing a partition
+        * references to a CSS (devices, lines, patterns) and CSSes used by an object
+        * partitions reachable from an object through all CSSes it uses
+    Built in a single pass over the CSSes and over the objects of the containers referencing CSSes; see
+    CsvBase.css_references()
+    """
+
+    def __init__(self, css_container: Any, containers: Iterable[Any]):
+        """
+        :param css_container: container of the CSSes
+        :param containers: containers to collect CSS references from
+        """
+        start = perf_counter()
+        self._partitions: Dict[str, Tuple[str, ...]] = dict()
+        self._css_by_partition: Dict[str, Set[str]] = dict()
+        self._combined: Dict[Tuple[str, ...], Tuple[str, ...]] = dict()
+        self.update_css(css_container)
+
+        self._references: Dict[str, List[CssReference]] = dict()
+        # references from an object indexed by (object type, object key)
+        self._by_object: Dict[Tuple[str, str], List[CssReference]] = dict()
+        self._reachable: Dict[Tuple[str, str], FrozenSet[str]] = dict()
+        for container in containers:
+            self.add(container.css_references())
+        log.debug(f'CssGraph: {len(self._partitions)} CSSes, {len(self._css_by_partition)} partitions, '
+                  f'{sum(map(len, self._references.values()))} references, {(perf_counter() - start) * 1000:.2f}ms')
+
+    def update_css(self, css_container: Any) -> None:
+        """
+        Re-read the partitions of all CSSes; for example after CSSes have changed
+        :param css_container: container of the CSSes
+        """
+        self._partitions = {css.name: tuple(css.partitions) for css in css_container.list}
+        css_by_partition: Dict[str, Set[str]] = dict()
+        for css, partitions in self._partitions.items():
+            for partition in partitions:
+                css_by_partition.setdefault(partition, set()).add(css)
+        self._css_by_partition = css_by_partition
+        self._combined = dict()
+        self._reachable = dict()
+
+    def add(self, references: Iterable[CssReference]) -> None:
+        """
+        Add references to CSSes
+        :param references: references to add
+        """
+        for reference in references:
+            self._references.setdefault(reference.css, []).append(reference)
+            key = (reference.object_type, reference.key)
+            self._by_object.setdefault(key, []).append(reference)
+            self._reachable.pop(key, None)
+
+    def discard(self, references: Iterable[CssReference]) -> None:
+        """
+        Remove references to CSSes; references are identified by value and by the identity of the referencing object
+        :param references: references to remove
+        """
+        for reference in references:
+            key = (reference.object_type, reference.key)
+            for index, k in ((self._references, reference.css), (self._by_object, key)):
+                if (entries := index.get(k)) is None:
+                    continue
+                entries = [r for r in entries if r.obj is not reference.obj or r != reference]
+                if entries:
+                    index[k] = entries
+                else:
+                    del index[k]
+            self._reachable.pop(key, None)
+
+    def partitions(self, css: str) -> Tuple[str, ...]:
+        """
+        Partitions of a CSS in order
+        :param css: CSS name
+        :return: partitions; empty for an empty or unknown CSS
+        """
+        return self._partitions.get(css, ())
+
+    def combined_partitions(self, *css: str, strict: bool = False) -> Tuple[str, ...]:
+        """
+        Partitions of multiple CSSes in order; for example line CSS followed by device CSS. Results are cached
+        :param css: CSS names; empty names stand for no CSS
+        :param strict: raise a KeyError for a CSS name which is not defined instead of treating it as an empty CSS
+        :return: concatenated partitions of all CSSes
+        """
+        if strict and (undefined := next((name for name in css if name and name not in self._partitions), None)):
+            raise KeyError(f'CSS not defined: {undefined}')
+        if (combined := self._combined.get(css)) is None:
+            combined = tuple(p for name in css for p in self.partitions(name))
+            self._combined[css] = combined
+        return combined
+
+    def css_with_partition(self, partition: str) -> Set[str]:
+        """
+        CSSes containing a partition
+        :param partition: partition name
+        :return: set of CSS names
+        """
+        return self._css_by_partition.get(partition, set())
+
+    def references(self, css: str, role: Optional[str] = None) -> List[CssReference]:
+        """
+        References to a CSS
+        :param css: CSS name
+        :param role: only references with this role; for example ROLE_LINE_CSS
+        :return: list of references
+        """
+        references = self._references.get(css, [])
+        if role is not None:
+            references = [r for r in references if r.role == role]
+        return references
+
+    def users(self, css: str, role: Optional[str] = None) -> List[Any]:
+        """
+        Distinct objects using a CSS; see references()
+        """
+        return list({id(r.obj): r.obj for r in self.references(css, role=role)}.values())
+
+    def css_of(self, obj: Any) -> Set[str]:
+        """
+        CSSes used by an object
+        :param obj: object; for example a phone
+        :return: set of CSS names
+        """
+        return {r.css for r in self._by_object.get((obj.__class__.__name__, str(obj)), ())}
+
+    def reachable_partitions(self, obj: Any) -> FrozenSet[str]:
+        """
+        Partitions reachable from an object through any of the CSSes it uses; for a phone this includes the device
+        CSS, the AAR CSS and all line CSSes
+        :param obj: object; for example a phone
+        :return: set of partition names
+        """
+        key = (obj.__class__.__name__, str(obj))
+        if (reachable := self._reachable.get(key)) is None:
+            reachable = frozenset(p for r in self._by_object.get(key, ()) for p in self.partitions(r.css))
+            self._reachable[key] = reachable
+        return reachable
+
+    def impacted_by_partition(self, partition: str, role: Optional[str] = None) -> List[CssReference]:
+        """
+        All references to CSSes containing a partition: everything impacted by a change of the partition
+        :param partition: partition name
+        :param role: only references with this role
+        :return: list of references
+        """
+        return [r for css in sorted(self.css_with_partition(partition)) for r in self.references(css, role=role)]
@@ -0,0 +1,37 @@
+from dataclasses import dataclass, field
+from typing import Any, List, Tuple
+
+__all__ = ['Delta']
+
+
+@dataclass
+class Delta:
+    """
+    Changes applied to the objects of a container; see CsvBase.apply_delta()
+    """
+    # objects added
+    added: List[Any] = field(default_factory=list)
+    # (old object, new object) for each changed object
+    changed: List[Tuple[Any, Any]] = field(default_factory=list)
+    # objects removed
+    removed: List[Any] = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+    def __str__(self):
+        return f'{len(self.added)} added, {len(self.changed)} changed, {len(self.removed)} removed'
+
+    @property
+    def old_objects(self) -> List[Any]:
+        """
+        Objects not part of the container anymore: removed objects and old versions of changed objects
+        """
+        return self.removed + [old for old, _ in self.changed]
+
+    @property
+    def new_objects(self) -> List[Any]:
+        """
+        Objects new in the container: added objects and new versions of changed objects
+        """
+        return [new for _, new in self.changed] + self.added
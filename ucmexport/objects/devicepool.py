@@ -1,6 +1,8 @@
 from .base import *
+from .index import UniqueIndex
+from .cssgraph import CssReference, ROLE_AAR_CSS
 
-from typing import Dict, List
+from typing import Dict, List, Iterator, Optional, Iterable
 
 __all__ = ['DevicePool', 'DevicePoolContainer']
 
@@ -37,6 +39,8 @@ class DevicePool(ObjBase):
 
 class DevicePoolContainer(CsvBase):
     factory = DevicePool
+    key_columns = ('DEVICE POOL NAME',)
+    indexes = (UniqueIndex('key', key='name'),)
 
     @property
     def list(self) -> List[DevicePool]:
@@ -44,7 +48,11 @@ class DevicePoolContainer(CsvBase):
 
     @property
     def by_name(self) -> Dict[str, List[DevicePool]]:
-        return self.by_attribute('device_name')
+        return self.by_attribute('name')
+
+    def css_references(self, objects: Optional[Iterable] = None) -> Iterator[CssReference]:
+        return (CssReference.of(dp.aar_css, dp, ROLE_AAR_CSS)
+                for dp in (self.list if objects is None else objects) if dp.aar_css)
 
     def __getitem__(self, item)->DevicePool:
-        return self.by_name[item][0]
+        return self.by_key[item]
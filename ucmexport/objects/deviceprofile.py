@@ -1,7 +1,7 @@
 from .base import *
+from .index import Index, UniqueIndex
 
 from re import compile
-import itertools
 from .phone import CommonPhoneAndDeviceProfile, CommonPhoneAndDeviceProfileContainer
 from typing import List, Dict, Iterable
 
@@ -25,13 +25,16 @@ DPDict = Dict[str, List[DeviceProfile]]
 
 class DeviceProfileContainer(CommonPhoneAndDeviceProfileContainer):
     factory = DeviceProfile
+    key_columns = ('DEVICE PROFILE NAME',)
+    indexes = CommonPhoneAndDeviceProfileContainer.indexes + (UniqueIndex('key', key='device_profile_name'),
+                                                              Index('device_profile_name'), Index('login_user_id'))
 
     @property
     def by_dp_name(self) -> DPDict:
         return self.by_attribute('device_profile_name')
 
     def __getitem__(self, item) -> DeviceProfile:
-        return self.by_dp_name[item][0]
+        return self.by_key[item]
 
     @property
     def list(self) -> List[DeviceProfile]:
@@ -59,14 +62,3 @@ class DeviceProfileContainer(CommonPhoneAndDeviceProfileContainer):
 
     def with_uri(self) -> Iterable[DeviceProfile]:
         return (p for p in self.list if p.has_uri)
-
-    def related_lines(self) -> DNAandPartitionRelated:
-        """
-        Determine which DN:partitions are related b/c they exist on the same device
-        :return: dictionary, key is DN:partition, values are set of DN:partition.
-        Only contains DN:partition keys where there are actually related DN:partition values
-        """
-        return {dnp: others for dnp, phone_set in self.by_dn_and_partition.items()
-                if (others := set(itertools.chain.from_iterable((line.dn_and_partition
-                                                                 for line in p.lines.values()
-                                                                 ) for p in phone_set)) - {dnp})}
@@ -1,6 +1,7 @@
 from .base import *
+from .references import DnReference, ROLE_NUMBER
 
-from typing import List
+from typing import List, Iterator, Optional, Iterable
 
 __all__ = ['DirectedCallParkContainer', 'DirectedCallPark']
 
@@ -32,3 +33,7 @@ class DirectedCallParkContainer(CsvBase):
     @property
     def list(self) -> List[DirectedCallPark]:
         return super(DirectedCallParkContainer, self).list
+
+    def dn_references(self, objects: Optional[Iterable] = None) -> Iterator[DnReference]:
+        return (DnReference.of(o.number_and_partition, o, ROLE_NUMBER)
+                for o in (self.list if objects is None else objects))
@@ -1,6 +1,9 @@
 from .base import *
+from .index import Index, UniqueIndex
+from .references import DnReference, ROLE_NUMBER
+from .dntrie import DnTrie, build_dn_tries
 
-from typing import Dict, List
+from typing import Dict, List, Iterator, Optional, Iterable
 
 __all__ = ['DirectoryNumber', 'DirectoryNumberContainer']
 
@@ -28,6 +31,33 @@ class DirectoryNumber(ObjBase):
 
 class DirectoryNumberContainer(CsvBase):
     factory = DirectoryNumber
+    key_columns = ('DIRECTORY NUMBER', 'ROUTE PARTITION')
+    indexes = (UniqueIndex('key', key='number_and_partition'), Index('number_and_partition'),
+               Index('call_pickup_group'))
+
+    def __init__(self, tar: TarSource):
+        super(DirectoryNumberContainer, self).__init__(tar)
+        self._dn_tries: Optional[Dict[Optional[str], DnTrie]] = None
+
+    def invalidate(self) -> None:
+        self._dn_tries = None
+
+    def dn_tries(self) -> Dict[Optional[str], DnTrie]:
+        """
+        Prefix tries over all directory numbers; all tries are built in a single pass on first use
+        :return: tries indexed by partition; the trie for all DNs has the key None
+        """
+        if self._dn_tries is None:
+            self._dn_tries = build_dn_tries((dn.number, dn.partition) for dn in self.list)
+        return self._dn_tries
+
+    def dn_trie(self, partition: Optional[str] = None) -> DnTrie:
+        """
+        Prefix trie over the directory numbers; see dn_tries()
+        :param partition: only DNs in this partition; default: DNs in all partitions
+        :return: trie; empty if there are no DNs in the partition
+        """
+        return self.dn_tries().get(partition) or DnTrie()
 
     @property
     def by_number_partition(self) -> Dict[str, List[DirectoryNumber]]:
@@ -42,4 +72,8 @@ class DirectoryNumberContainer(CsvBase):
         return super(DirectoryNumberContainer, self).list
 
     def __getitem__(self, item) -> DirectoryNumber:
-        return self.by_number_partition[item][0]
+        return self.by_key[item]
+
+    def dn_references(self, objects: Optional[Iterable] = None) -> Iterator[DnReference]:
+        return (DnReference.of(o.number_and_partition, o, ROLE_NUMBER)
+                for o in (self.list if objects is None else objects))
@@ -0,0 +1,251 @@
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+__all__ = ['DnTrie', 'build_dn_tries']
+
+
+class TrieNode:
+    """
+    Node of a DnTrie; represents a prefix
+    """
+    __slots__ = ['children', 'count', 'distinct']
+
+    def __init__(self):
+        self.children: Dict[str, 'TrieNode'] = dict()
+        # number of digit strings with this prefix; counting duplicates
+        self.count = 0
+        # number of distinct digit strings with this prefix
+        self.distinct = 0
+
+
+class DnTrie:
+    """
+    Counted prefix trie over digit strings; for example directory numbers. Digit strings are grouped by length: each
+    length has a separate trie so that counts for digit strings of a given length are available w/o traversal.
+    Answers prefix counts, distinct prefixes of a given length, digit strings in a range, and the density of a prefix
+    """
+
+    def __init__(self, numbers: Iterable[str] = ()):
+        """
+        :param numbers: digit strings to add
+        """
+        # root nodes indexed by length of the digit strings in the order lengths were first seen
+        self._roots: Dict[int, TrieNode] = dict()
+        for number in numbers:
+            self.add(number)
+
+    def __len__(self):
+        return sum(root.count for root in self._roots.values())
+
+    def __contains__(self, number: str) -> bool:
+        return (node := self._node(number, len(number))) is not None and node.count > 0
+
+    def __repr__(self):
+        return f'DnTrie({len(self)} numbers, {self.distinct} distinct)'
+
+    @property
+    def distinct(self) -> int:
+        """
+        Number of distinct digit strings
+        """
+        return sum(root.distinct for root in self._roots.values())
+
+    def add(self, number: str, count: int = 1) -> None:
+        """
+        Add a digit string
+        :param number: digit string
+        :param count: number of occurrences to add
+        """
+        if (node := self._roots.get(len(number))) is None:
+            node = self._roots[len(number)] = TrieNode()
+        path = [node]
+        append = path.append
+        for digit in number:
+            children = node.children
+            if (node := children.get(digit)) is None:
+                node = children[digit] = TrieNode()
+            append(node)
+        if node.count:
+            for node in path:
+                node.count += count
+        else:
+            for node in path:
+                node.count += count
+                node.distinct += 1
+
+    def discard(self, number: str) -> None:
+        """
+        Remove one occurrence of a digit string; nothing happens if the digit string is not in the trie
+        :param number: digit string
+        """
+        if number not in self:
+            return
+        node = self._roots[len(number)]
+        path = [node]
+        for digit in number:
+            node = node.children[digit]
+            path.append(node)
+        gone = node.count == 1
+        for parent, digit, node in zip(path, number, path[1:]):
+            node.count -= 1
+            if gone:
+                node.distinct -= 1
+            if not node.count:
+                del parent.children[digit]
+                break
+        root = path[0]
+        root.count -= 1
+        if gone:
+            root.distinct -= 1
+        if not root.count:
+            del self._roots[len(number)]
+
+    def _node(self, prefix: str, length: int) -> Optional[TrieNode]:
+        """
+        Node for a prefix in the trie for digit strings of a given length
+        """
+        node = self._roots.get(length)
+        for digit in prefix:
+            if node is None:
+                return None
+            node = node.children.get(digit)
+        return node
+
+    def _nodes(self, prefix: str, length: Optional[int]) -> Iterator[Tuple[int, TrieNode]]:
+        """
+        Nodes for a prefix in the tries of all lengths or of a given length
+        """
+        lengths = self._roots if length is None else (length,)
+        for length in lengths:
+            if length >= len(prefix) and (node := self._node(prefix, length)) is not None:
+                yield length, node
+
+    def lengths(self, prefix: str = '') -> List[int]:
+        """
+        Lengths of the digit strings with a given prefix
+        :param prefix: prefix
+        :return: lengths in the order they were first seen
+        """
+        return [length for length, _ in self._nodes(prefix, None)]
+
+    def count(self, prefix: str = '', length: Optional[int] = None, distinct: bool = False) -> int:
+        """
+        Number of digit strings with a given prefix
+        :param prefix: prefix
+        :param length: only count digit strings of this length
+        :param distinct: count distinct digit strings; else duplicates are counted
+        :return: number of digit strings
+        """
+        if distinct:
+            return sum(node.distinct for _, node in self._nodes(prefix, length))
+        return sum(node.count for _, node in self._nodes(prefix, length))
+
+    def children(self, prefix: str = '', length: Optional[int] = None, distinct: bool = False) -> Dict[str, int]:
+        """
+        Next digits after a prefix
+        :param prefix: prefix
+        :param length: only consider digit strings of this length
+        :param distinct: count distinct digit strings; else duplicates are counted
+        :return: number of digit strings for each next digit; sorted by digit
+        """
+        result: Dict[str, int] = dict()
+        for _, node in self._nodes(prefix, length):
+            for digit, child in node.children.items():
+                result[digit] = result.get(digit, 0) + (child.distinct if distinct else child.count)
+        return dict(sorted(result.items()))
+
+    def numbers(self, prefix: str = '', length: Optional[int] = None) -> Iterator[str]:
+        """
+        Distinct digit strings with a given prefix
+        :param prefix: prefix
+        :param length: only digit strings of this length
+        :return: digit strings; for each length in sort order
+        """
+        def walk(node: TrieNode, digits: str) -> Iterator[str]:
+            if not node.children:
+                yield digits
+                return
+            for digit in sorted(node.children):
+                yield from walk(node.children[digit], digits + digit)
+
+        for _, node in self._nodes(prefix, length):
+            yield from walk(node, prefix)
+
+    def prefixes(self, prefix_length: int, length: Optional[int] = None) -> List[str]:
+        """
+        Distinct prefixes of a given length
+        :param prefix_length: length of the prefixes
+        :param length: only consider digit strings of this length
+        :return: sorted list of prefixes
+        """
+        result = set()
+
+        def walk(node: TrieNode, digits: str):
+            if len(digits) == prefix_length:
+                result.add(digits)
+                return
+            for digit, child in node.children.items():
+                walk(child, digits + digit)
+
+        for trie_length, node in self._nodes('', length):
+            if trie_length >= prefix_length:
+                walk(node, '')
+        return sorted(result)
+
+    def in_range(self, low: str, high: str) -> Iterator[str]:
+        """
+        Distinct digit strings in a range; the range is given by the first and last digit string (inclusive) which need
+        to have the same length. For example in_range('1000', '1999')
+        :param low: first digit string of the range
+        :param high: last digit string of the range
+        :return: digit strings in the range in sort order
+        """
+        if len(low) != len(high):
+            raise ValueError(f'range bounds need to have the same length: {low}, {high}')
+        if (root := self._roots.get(len(low))) is None:
+            return
+
+        def walk(node: TrieNode, depth: int, digits: str, low_bound: bool, high_bound: bool) -> Iterator[str]:
+            if depth == len(low):
+                yield digits
+                return
+            for digit in sorted(node.children):
+                if low_bound and digit < low[depth] or high_bound and digit > high[depth]:
+                    continue
+                yield from walk(node.children[digit], depth + 1, digits + digit,
+                                low_bound and digit == low[depth], high_bound and digit == high[depth])
+
+        yield from walk(root, 0, '', True, True)
+
+    def range_count(self, low: str, high: str) -> int:
+        """
+        Number of distinct digit strings in a range; see in_range()
+        """
+        return sum(1 for _ in self.in_range(low, high))
+
+    def density(self, prefix: str, length: int) -> float:
+        """
+        Share of the possible digit strings of a given length with a given prefix which exist in the trie; a cluster of
+        numbers has a high density
+        :param prefix: prefix
+        :param length: length of the digit strings
+        :return: number of distinct digit strings divided by 10 ** (number of remaining digits)
+        """
+        return self.count(prefix, length=length, distinct=True) / 10 ** (length - len(prefix))
+
+
+def build_dn_tries(dn_and_partitions: Iterable[Tuple[str, str]]) -> Dict[Optional[str], DnTrie]:
+    """
+    Build prefix tries over all directory numbers and per partition in a single pass
+    :param dn_and_partitions: (directory number, partition) tuples
+    :return: tries indexed by partition; the trie for all directory numbers has the key None
+    """
+    tries: Dict[Optional[str], DnTrie] = {None: DnTrie()}
+    all_dns = tries[None]
+    # shared lines: each distinct DN only needs to be added once
+    for (dn, partition), count in Counter(dn_and_partitions).items():
+        all_dns.add(dn, count)
+        if (trie := tries.get(partition)) is None:
+            trie = tries[partition] = DnTrie()
+        trie.add(dn, count)
+    return tries
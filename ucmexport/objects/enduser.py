@@ -1,5 +1,7 @@
 from .base import *
-from typing import List, Dict, Optional
+from .index import UniqueIndex
+from .references import DnReference, ROLE_PRIMARY_EXTENSION
+from typing import List, Dict, Optional, Iterator, Iterable
 import re
 
 __all__ = ['EndUser', 'EndUserContainer']
@@ -37,9 +39,10 @@ class DeviceAssociation:
 
 
 class EndUser(ObjBase):
+    # empty columns are not part of end user objects
+    keep_empty_cells = False
+
     def __init__(self, o: Dict):
-        # remove empty columns
-        o = {k: v for k, v in o.items() if v}
         super(EndUser, self).__init__(o)
         self._primary_extensions = None
         self._device_associations = None
@@ -88,8 +91,8 @@ class EndUser(ObjBase):
             while True:
                 i += 1
                 try:
-                    pe = self._obj.pop(f'PRIMARY EXTENSION {i}')
-                    tpe = self._obj.pop(f'TYPE PATTERN USAGE {i}')
+                    pe = self._obj[f'PRIMARY EXTENSION {i}']
+                    tpe = self._obj[f'TYPE PATTERN USAGE {i}']
                 except KeyError:
                     break
                 if not pe:
@@ -111,10 +114,10 @@ class EndUser(ObjBase):
             while True:
                 i += 1
                 try:
-                    dn = self._obj.pop(f'DEVICE NAME {i}')
-                    dp = self._obj.pop(f'DEFAULT PROFILE {i}')
-                    desc = self._obj.pop(f'DESCRIPTION {i}')
-                    tua = self._obj.pop(f'TYPE USER ASSOCIATION {i}')
+                    dn = self._obj[f'DEVICE NAME {i}']
+                    dp = self._obj[f'DEFAULT PROFILE {i}']
+                    desc = self._obj[f'DESCRIPTION {i}']
+                    tua = self._obj[f'TYPE USER ASSOCIATION {i}']
                 except KeyError:
                     break
                 if not dn:
@@ -132,6 +135,8 @@ class EndUser(ObjBase):
 
 class EndUserContainer(CsvBase):
     factory = EndUser
+    key_columns = ('USER ID',)
+    indexes = (UniqueIndex('key', key='user_id'),)
 
     @property
     def list(self) -> List[EndUser]:
@@ -142,4 +147,8 @@ class EndUserContainer(CsvBase):
         return self.by_attribute('em_profile_name')
 
     def __getitem__(self, item) -> EndUser:
-        return self.by_user_id[item][0]
+        return self.by_key[item]
+
+    def dn_references(self, objects: Optional[Iterable] = None) -> Iterator[DnReference]:
+        return (DnReference.of(str(pe), user, ROLE_PRIMARY_EXTENSION)
+                for user in (self.list if objects is None else objects) if (pe := user.primary_extension) is not None)
@@ -0,0 +1,123 @@
+"""
+pandas DataFrames built from the parsed CSV files of a TAR file. pandas is only needed if frames are used; the module
+is not imported by ucmexport.objects
+"""
+import logging
+from time import perf_counter
+from typing import Any, List, Optional, Sequence
+
+import pandas as pd
+
+from .coltypes import Bool, ColumnType, ColumnTypes, Enum, Int
+from .phone import column_plan
+from .symbols import SymbolTable
+from .table import CsvTable
+
+__all__ = ['table_frame', 'lines_frame', 'LINE_INDEX']
+
+log = logging.getLogger(__name__)
+
+# column with the line index in frames of line appearances
+LINE_INDEX = 'LINE INDEX'
+
+
+def column_values(table: CsvTable, columns: Sequence[int]) -> List[Sequence[str]]:
+    """
+    Values of columns of a table; missing values of short rows are empty
+    :param table: parsed CSV file
+    :param columns: column indices
+    :return: values of each column
+    """
+    rows = table.rows
+    width = len(table.header)
+    if all(len(row) == width for row in rows):
+        # transposing all rows at once is considerably faster than collecting the values column by column
+        transposed = list(zip(*rows)) if rows else [()] * width
+        return [transposed[i] for i in columns]
+    return [[row[i] if i < len(row) else '' for row in rows] for i in columns]
+
+
+def typed_array(column_type: ColumnType, values: Sequence[str]) -> Any:
+    """
+    Array for the values of a typed column: booleans and integers are nullable; empty values and values which can't be
+    coerced are missing
+    """
+    if isinstance(column_type, Bool):
+        return pd.array([True if v == 't' else False if v == 'f' else None for v in values], dtype='boolean')
+    if isinstance(column_type, Int):
+        ints = []
+        for v in values:
+            try:
+                ints.append(column_type.encode(v))
+            except ValueError:
+                ints.append(None)
+        return pd.array(ints, dtype='Int64')
+    if isinstance(column_type, Enum):
+        return pd.Categorical(values)
+    return list(values)
+
+
+def table_frame(table: CsvTable, columns: Optional[Sequence[str]] = None,
+                column_types: Optional[ColumnTypes] = None) -> pd.DataFrame:
+    """
+    DataFrame with the rows of a parsed CSV file. Columns with low cardinality (see SymbolTable) are categorical,
+    columns with declared types are boolean, integer, or categorical; all other columns are strings with '' for empty
+    values
+    :param table: parsed CSV file
+    :param columns: columns to include in this order; default: all columns
+    :param column_types: declared column types
+    :return: frame
+    """
+    header = table.header
+    if columns is None:
+        columns = header
+    position = {column: i for i, column in enumerate(header)}
+    if unknown := [column for column in columns if column not in position]:
+        raise KeyError(f'unknown column(s): {", ".join(unknown)}')
+    indices = [position[column] for column in columns]
+    low_cardinality = set(SymbolTable.low_cardinality_columns(header, table.rows))
+    data = dict()
+    for column, i, values in zip(columns, indices, column_values(table, indices)):
+        if column_types is not None and (column_type := column_types.type_of(column)) is not None:
+            data[column] = typed_array(column_type, values)
+        elif i in low_cardinality:
+            data[column] = pd.Categorical(values)
+        else:
+            data[column] = list(values)
+    return pd.DataFrame(data, columns=list(columns))
+
+
+def lines_frame(table: CsvTable, key_columns: Sequence[str], columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    DataFrame with the line appearances in a parsed CSV file of phones or device profiles: one row per line with a
+    directory number. The line columns are sliced from the rows using the column plan of the header
+    :param table: parsed CSV file of phones or device profiles
+    :param key_columns: columns of the device to include for each line; for example ('DEVICE NAME',)
+    :param columns: line columns to include w/o the line index; for example ('DIRECTORY NUMBER', 'LINE CSS').
+        Default: all line columns
+    :return: frame with the key columns, LINE_INDEX, and the line columns
+    """
+    start = perf_counter()
+    header = table.header
+    plan = column_plan(tuple(header))
+    if columns is None:
+        columns = list(dict.fromkeys(attribute for *_, attributes in plan.lines for attribute in attributes))
+    keys = [header.index(column) for column in key_columns]
+    # columns of each line in the order of the line columns of the frame; None: the line does not have the column
+    lines = []
+    for line_index, line_start, _, attributes in plan.lines:
+        position = {attribute: line_start + i for i, attribute in enumerate(attributes)}
+        lines.append((line_index, line_start, [position.get(column) for column in columns]))
+    rows = []
+    append = rows.append
+    for row in table.rows:
+        width = len(row)
+        device = [row[i] if i < width else '' for i in keys]
+        for line_index, line_start, line_columns in lines:
+            if line_start < width and row[line_start]:
+                append(device + [line_index] + [row[i] if i is not None and i < width else '' for i in line_columns])
+    line_table = CsvTable(list(key_columns) + [LINE_INDEX] + list(columns), rows)
+    frame = table_frame(line_table)
+    frame[LINE_INDEX] = frame[LINE_INDEX].astype('int64')
+    log.debug(f'lines_frame: {len(frame)} lines in {(perf_counter() - start) * 1000:.2f}ms')
+    return frame
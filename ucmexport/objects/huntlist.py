@@ -1,8 +1,11 @@
 from .base import *
+from .index import UniqueIndex
+from .coltypes import ColumnTypes, Bool, Int
 from .linegroup import LineGroupContainer
+from .rowset import RowSet
 
 from re import compile
-from typing import Dict, List, Set
+from typing import Dict, List, Set, Union
 from itertools import chain
 
 from .phone import CommonPhoneAndDeviceProfile, CommonPhoneAndDeviceProfileContainer
@@ -11,10 +14,11 @@ __all__ = ['HuntList', 'HuntListContainer', 'HuntListMember']
 
 
 class HuntListMember(ObjBase):
+    column_types = ColumnTypes(Int('SELECTION ORDER'))
 
     @property
     def selection_order(self) -> int:
-        return int(self.dict['SELECTION ORDER'])
+        return self.value('SELECTION ORDER')
 
     @property
     def line_group(self) -> str:
@@ -26,6 +30,7 @@ class HuntListMember(ObjBase):
 
 class HuntList(ObjBase):
     attribute_pattern = compile(r'(.+) (\d+)')
+    column_types = ColumnTypes(Bool('ROUTE LIST ENABLED'), Bool('HUNTLIST FOR VM'), Int('SELECTION ORDER n'))
 
     def __init__(self, o: Dict):
         super(HuntList, self).__init__(o)
@@ -56,7 +61,7 @@ class HuntList(ObjBase):
         members = []
         keys_to_remove = []
         if self._members is None:
-            for k, v in self.dict.items():
+            for k, v in self.typed_items():
                 if m := self.attribute_pattern.match(k):
                     if REMOVE_ATTR_FROM_PARENT:
                         keys_to_remove.append(k)
@@ -67,7 +72,7 @@ class HuntList(ObjBase):
                         member_index = index
                     else:
                         members[-1][attribute] = v
-            self._members = [HuntListMember(m) for m in members if m['SELECTION ORDER']]
+            self._members = [HuntListMember(m) for m in members if m['SELECTION ORDER'] != '']
             d = self.dict
             for k in keys_to_remove:
                 d.pop(k)
@@ -89,23 +94,29 @@ class HuntList(ObjBase):
         return r
 
     def phones_or_device_profiles(self, hunt_list_container: 'HuntListContainer',
-                                  container: CommonPhoneAndDeviceProfileContainer) -> Set[CommonPhoneAndDeviceProfile]:
+                                  container: CommonPhoneAndDeviceProfileContainer,
+                                  as_row_set: bool = False) -> Union[Set[CommonPhoneAndDeviceProfile], RowSet]:
         """
         All phones on which one of the DNPs is present
+        :param container: phones or device profiles
+        :param as_row_set: return a row set of the container instead of a set
         """
         members = self.pattern_and_partition_set(hunt_list_container=hunt_list_container)
-        return set(chain.from_iterable(container.by_dn_and_partition.get(dnp, []) for dnp in members))
+        rows = container.rows_with('dn_and_partition', members)
+        return rows if as_row_set else set(rows)
 
 
 class HuntListContainer(CsvBase):
     factory = HuntList
+    key_columns = ('NAME',)
+    indexes = (UniqueIndex('key', key='name'),)
 
-    def __init__(self, tar: str, line_group_container: LineGroupContainer):
+    def __init__(self, tar: TarSource, line_group_container: LineGroupContainer):
         super(HuntListContainer, self).__init__(tar)
         self.line_group_container = line_group_container
 
     def __getitem__(self, item) -> HuntList:
-        return self.by_name[item][0]
+        return self.by_key[item]
 
     @property
     def list(self) -> List[HuntList]:
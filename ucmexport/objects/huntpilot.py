@@ -1,9 +1,13 @@
 from collections import defaultdict
 from itertools import chain
 from re import compile
-from typing import List, Dict, Set
+from typing import List, Dict, Set, Iterator, Optional, Iterable, Union
 
 from .base import *
+from .index import UniqueIndex
+from .references import DnReference, ROLE_PILOT
+from .rowset import RowSet
+from .coltypes import ColumnTypes, Bool
 from .huntlist import HuntListContainer
 from .phone import CommonPhoneAndDeviceProfileContainer, CommonPhoneAndDeviceProfile
 
@@ -39,6 +43,8 @@ HUNT_LIST_PATTERN = compile(r'(.+) (\d+)')
 
 
 class HuntPilot(ObjBase):
+    column_types = ColumnTypes(Bool('ROUTETHIS PATTERN'))
+
     def __init__(self, o: Dict):
         super(HuntPilot, self).__init__(o)
         self._hunt_lists = None
@@ -61,7 +67,7 @@ class HuntPilot(ObjBase):
 
     @property
     def routethis_pattern(self) -> bool:
-        return self.dict['ROUTETHIS PATTERN'] == 't'
+        return self.value('ROUTETHIS PATTERN') is True
 
     def __str__(self):
         return self.pilot_and_partition
@@ -98,33 +104,43 @@ class HuntPilot(ObjBase):
         return r
 
     def phones_or_device_profiles(self, hunt_pilot_container: 'HuntPilotContainer',
-                                  container: CommonPhoneAndDeviceProfileContainer) -> Set[CommonPhoneAndDeviceProfile]:
+                                  container: CommonPhoneAndDeviceProfileContainer,
+                                  as_row_set: bool = False) -> Union[Set[CommonPhoneAndDeviceProfile], RowSet]:
         """
         All phones or device profiles on which one of the DNPs is present
+        :param container: phones or device profiles
+        :param as_row_set: return a row set of the container instead of a set
         """
         members = self.pattern_and_partition_set(hunt_pilot_container=hunt_pilot_container)
-        return set(chain.from_iterable(container.by_dn_and_partition.get(dnp, []) for dnp in members))
+        rows = container.rows_with('dn_and_partition', members)
+        return rows if as_row_set else set(rows)
 
 
 class HuntPilotContainer(CsvBase):
     factory = HuntPilot
+    key_columns = ('HUNT PILOT', 'ROUTE PARTITION')
+    indexes = (UniqueIndex('key', key='pilot_and_partition'),)
 
-    def __init__(self, tar: str, hunt_list_container: HuntListContainer):
+    def __init__(self, tar: TarSource, hunt_list_container: HuntListContainer):
         super(HuntPilotContainer, self).__init__(tar)
         self.hunt_list_container = hunt_list_container
 
     def __getitem__(self, item) -> HuntPilot:
         """
-        Get HuntPilot by hunt pilot name
-        :param item: hunt pilot name
+        Get HuntPilot by hunt pilot and partition
+        :param item: hunt pilot:partition
         :return: selected hunt Pilot
         """
-        return self.by_hunt_pilot[item][0]
+        return self.by_key[item]
 
     @property
     def list(self) -> List[HuntPilot]:
         return super(HuntPilotContainer, self).list
 
+    def dn_references(self, objects: Optional[Iterable] = None) -> Iterator[DnReference]:
+        return (DnReference.of(hp.pilot_and_partition, hp, ROLE_PILOT)
+                for hp in (self.list if objects is None else objects))
+
     def pattern_and_partition_sets(self) -> Dict[str, Set[str]]:
         """
         pattern:partition sets for each huntpilot indexed by hunt pilot name
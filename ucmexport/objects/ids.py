@@ -0,0 +1,369 @@
+import logging
+from array import array
+from time import perf_counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+__all__ = ['IdSpace', 'IdRelation', 'IdRegistry', 'build_id_registry', 'ID_PHONE', 'ID_DEVICE_PROFILE', 'ID_USER',
+           'ID_DN_AND_PARTITION', 'ID_PARTITION', 'ID_LINE_GROUP']
+
+log = logging.getLogger(__name__)
+
+# entity types of the ID registry built for a Proxy
+ID_PHONE = 'phone'                              # device name of a phone
+ID_DEVICE_PROFILE = 'device_profile'            # device profile name
+ID_USER = 'user'                                # user id; end users and user ids referenced on phones
+ID_DN_AND_PARTITION = 'dn_and_partition'        # DN:partition of lines and of line group members
+ID_PARTITION = 'partition'                      # partition of a DN:partition
+ID_LINE_GROUP = 'line_group'                    # line group name
+
+# type code of the arrays holding IDs
+ID_TYPECODE = 'l'
+
+
+class IdSpace:
+    """
+    Dense integer IDs for the keys of an entity type; IDs are assigned in the order keys are added, starting with 0
+    """
+    __slots__ = ['name', '_ids', '_keys']
+
+    def __init__(self, name: str):
+        """
+        :param name: entity type; for example ID_PHONE
+        """
+        self.name = name
+        self._ids: Dict[str, int] = dict()
+        self._keys: List[str] = []
+
+    @staticmethod
+    def from_ids(name: str, ids: Dict[str, int]) -> 'IdSpace':
+        """
+        Create an ID space from keys with already assigned IDs
+        :param name: entity type
+        :param ids: key -> ID; the IDs have to be 0, 1, 2, ... in the order of the keys. Is used by the ID space
+        :return: ID space
+        """
+        space = IdSpace(name)
+        space._ids = ids
+        space._keys = list(ids)
+        return space
+
+    def __repr__(self):
+        return f'IdSpace({self.name!r}, {len(self)} ids)'
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._ids
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Keys in the order of their IDs
+        """
+        return iter(self._keys)
+
+    def id(self, key: str) -> int:
+        """
+        ID of a key; a new ID is assigned if the key is not known yet
+        :param key: key
+        :return: ID
+        """
+        if (i := self._ids.get(key)) is None:
+            i = self._ids[key] = len(self._keys)
+            self._keys.append(key)
+        return i
+
+    def get(self, key: str, default: Optional[int] = None) -> Optional[int]:
+        """
+        ID of a key w/o assigning a new ID
+        """
+        return self._ids.get(key, default)
+
+    def ids(self, keys: Iterable[str]) -> List[int]:
+        """
+        IDs of keys; unknown keys are skipped
+        """
+        get = self._ids.get
+        return [i for key in keys if (i := get(key)) is not None]
+
+    def key(self, i: int) -> str:
+        """
+        Key for an ID
+        """
+        return self._keys[i]
+
+    def keys(self, ids: Iterable[int]) -> List[str]:
+        """
+        Keys for IDs
+        """
+        keys = self._keys
+        return [keys[i] for i in ids]
+
+
+class IdRelation:
+    """
+    Relation between the IDs of two entity types; for example phone -> DN:partitions on the lines of the phone.
+    The targets of all sources are held in a single array; the targets of source i are
+    targets[offsets[i]:offsets[i + 1]] (compressed sparse rows)
+    """
+    __slots__ = ['source', 'target', 'offsets', 'targets']
+
+    def __init__(self, source: str, target: str, offsets: array, targets: array):
+        """
+        :param source: entity type of the sources
+        :param target: entity type of the targets
+        :param offsets: start of the targets of each source in targets; one more entry than there are sources
+        :param targets: target IDs
+        """
+        self.source = source
+        self.target = target
+        self.offsets = offsets
+        self.targets = targets
+
+    @staticmethod
+    def from_rows(source: str, target: str, rows: Iterable[Iterable[int]]) -> 'IdRelation':
+        """
+        Create a relation from the targets of each source
+        :param source: entity type of the sources
+        :param target: entity type of the targets
+        :param rows: target IDs for each source ID in the order of the source IDs
+        :return: relation
+        """
+        offsets = array(ID_TYPECODE, [0])
+        targets = array(ID_TYPECODE)
+        append = offsets.append
+        extend = targets.extend
+        for row in rows:
+            extend(row)
+            append(len(targets))
+        return IdRelation(source, target, offsets, targets)
+
+    def __repr__(self):
+        return f'IdRelation({self.source!r} -> {self.target!r}, {len(self)} sources, {len(self.targets)} pairs)'
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, source: int) -> array:
+        """
+        Targets of a source
+        """
+        offsets = self.offsets
+        return self.targets[offsets[source]:offsets[source + 1]]
+
+    def degree(self, source: int) -> int:
+        """
+        Number of targets of a source
+        """
+        return self.offsets[source + 1] - self.offsets[source]
+
+    def pairs(self) -> Iterator[Tuple[int, int]]:
+        """
+        (source, target) pairs
+        """
+        offsets = self.offsets
+        targets = self.targets
+        for source in range(len(self)):
+            for j in range(offsets[source], offsets[source + 1]):
+                yield source, targets[j]
+
+    def targets_of(self, sources: Iterable[int]) -> Set[int]:
+        """
+        Distinct targets of multiple sources
+        """
+        offsets = self.offsets
+        targets = self.targets
+        result = set()
+        update = result.update
+        for source in sources:
+            update(targets[offsets[source]:offsets[source + 1]])
+        return result
+
+    def inverse(self, size: int = 0) -> 'IdRelation':
+        """
+        Inverse relation; the sources of each target are in ascending order
+        :param size: number of target IDs; targets w/o sources at the end of the ID range are only included if size is
+            given
+        :return: relation target -> sources
+        """
+        targets = self.targets
+        size = max(size, max(targets, default=-1) + 1)
+        # counting sort of the pairs by target
+        offsets = array(ID_TYPECODE, [0]) * (size + 1)
+        for t in targets:
+            offsets[t + 1] += 1
+        for i in range(size):
+            offsets[i + 1] += offsets[i]
+        position = offsets[:-1]
+        sources = array(ID_TYPECODE, [0]) * len(targets)
+        own_offsets = self.offsets
+        for source in range(len(self)):
+            for j in range(own_offsets[source], own_offsets[source + 1]):
+                t = targets[j]
+                sources[position[t]] = source
+                position[t] += 1
+        return IdRelation(self.target, self.source, offsets, sources)
+
+    def compose(self, other: 'IdRelation') -> 'IdRelation':
+        """
+        Join two relations; for example phone -> DN:partition and DN:partition -> phone gives the phones sharing a line
+        :param other: relation from the targets of this relation
+        :return: relation source -> distinct targets of other reached via the targets of this relation
+        """
+        if other.source != self.target:
+            raise ValueError(f'can not join {self.source} -> {self.target} with {other.source} -> {other.target}')
+        targets_of = other.targets_of
+        return IdRelation.from_rows(self.source, other.target, (sorted(targets_of(self[source]))
+                                                                for source in range(len(self))))
+
+
+class IdRegistry:
+    """
+    Dense integer IDs for the entities of a Proxy and relations between them keyed by these IDs. Relations can be
+    joined and used for graph building w/o hashing the formatted strings (DN:partition, user ids, ...) the relations
+    are based on
+    """
+
+    def __init__(self):
+        self._spaces: Dict[str, IdSpace] = dict()
+        self._relations: Dict[Tuple[str, str], IdRelation] = dict()
+
+    def __repr__(self):
+        spaces = ', '.join(f'{name}: {len(space)}' for name, space in self._spaces.items())
+        return f'IdRegistry({spaces})'
+
+    def __getitem__(self, name: str) -> IdSpace:
+        return self._spaces[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._spaces
+
+    def space(self, name: str) -> IdSpace:
+        """
+        ID space of an entity type; created if it doesn't exist
+        """
+        if (space := self._spaces.get(name)) is None:
+            space = self._spaces[name] = IdSpace(name)
+        return space
+
+    def spaces(self) -> List[str]:
+        """
+        Entity types in the registry
+        """
+        return list(self._spaces)
+
+    def add_relation(self, relation: IdRelation) -> None:
+        """
+        Add a relation; replaces an existing relation between the same entity types and its inverse
+        """
+        self._relations[(relation.source, relation.target)] = relation
+        self._relations.pop((relation.target, relation.source), None)
+
+    def relations(self) -> List[Tuple[str, str]]:
+        """
+        (source, target) entity types of the relations in the registry; inverse relations are created on demand
+        """
+        return list(self._relations)
+
+    def relation(self, source: str, target: str) -> IdRelation:
+        """
+        Relation between two entity types; inverse relations are created on first use
+        :param source: source entity type; for example ID_DN_AND_PARTITION
+        :param target: target entity type; for example ID_PHONE
+        :return: relation
+        """
+        if (relation := self._relations.get((source, target))) is None:
+            if (inverse := self._relations.get((target, source))) is None:
+                raise KeyError(f'no relation {source} -> {target}')
+            relation = self._relations[(source, target)] = inverse.inverse(size=len(self.space(source)))
+        return relation
+
+    def related(self, source: str, target: str, keys: Iterable[str]) -> List[str]:
+        """
+        Keys of the targets related to any of the given source keys
+        :param source: source entity type
+        :param target: target entity type
+        :param keys: source keys; unknown keys are ignored
+        :return: distinct target keys in the order of their IDs
+        """
+        relation = self.relation(source, target)
+        return self._spaces[target].keys(sorted(relation.targets_of(self._spaces[source].ids(keys))))
+
+
+def build_id_registry(phones: Any, device_profiles: Any, end_users: Any, line_groups: Any) -> IdRegistry:
+    """
+    Build the ID registry of a Proxy: IDs for phones, device profiles, users, DN:partitions, partitions and line groups
+    and the relations phone -> DN:partition, phone -> user, device profile -> DN:partition, device profile -> user,
+    line group -> DN:partition and DN:partition -> partition. The relations of phones and device profiles are taken
+    from the device relations of the containers (see CommonPhoneAndDeviceProfileContainer.relations) and only need to
+    be mapped to the IDs of the registry
+    :param phones: phone container
+    :param device_profiles: device profile container
+    :param end_users: end user container
+    :param line_groups: line group container
+    :return: registry
+    """
+    start = perf_counter()
+    registry = IdRegistry()
+    users = registry.space(ID_USER)
+    for user in end_users.list:
+        users.id(user.user_id)
+    dnps = registry.space(ID_DN_AND_PARTITION)
+    partitions = registry.space(ID_PARTITION)
+    # partition ID for each DN:partition ID
+    partition_of = []
+
+    def dnp_id(dn_and_partition: str, partition: str) -> int:
+        i = dnps.id(dn_and_partition)
+        if i == len(partition_of):
+            partition_of.append(partitions.id(partition))
+        return i
+
+    def register_devices(name: str, container: Any) -> None:
+        space = registry.space(name)
+        relations = container.relations
+        dnp_key = relations.dn_and_partitions.key
+        partition_key = relations.partitions.key
+        device_partition_of = relations.partition_of
+        user_key = relations.users.key
+        # registry IDs of the DN:partitions and users of the device relations; -1: not mapped yet. IDs are mapped in
+        # the order DN:partitions and users are visited so that they are assigned in the same order as when visiting
+        # the lines of the devices
+        dnp_map = array(ID_TYPECODE, [-1]) * len(relations.dn_and_partitions)
+        user_map = array(ID_TYPECODE, [-1]) * len(relations.users)
+        lines = relations.lines
+        user_ids = relations.user_ids
+        dnp_rows: List[Sequence[int]] = []
+        user_rows: List[Sequence[int]] = []
+        for position, o in enumerate(relations.objects):
+            # objects with duplicate keys share the ID of the first object
+            if space.id(str(o)) < len(dnp_rows):
+                continue
+            dnp_row = []
+            for i in lines[position]:
+                if (j := dnp_map[i]) < 0:
+                    j = dnp_map[i] = dnp_id(dnp_key(i), partition_key(device_partition_of[i]))
+                dnp_row.append(j)
+            dnp_rows.append(dnp_row)
+            user_row = []
+            for i in user_ids[position]:
+                if (j := user_map[i]) < 0:
+                    j = user_map[i] = users.id(user_key(i))
+                user_row.append(j)
+            user_rows.append(sorted(user_row))
+        registry.add_relation(IdRelation.from_rows(name, ID_DN_AND_PARTITION, dnp_rows))
+        registry.add_relation(IdRelation.from_rows(name, ID_USER, user_rows))
+
+    register_devices(ID_PHONE, phones)
+    register_devices(ID_DEVICE_PROFILE, device_profiles)
+    space = registry.space(ID_LINE_GROUP)
+    dnp_rows = []
+    for lg in line_groups.list:
+        if space.id(str(lg)) < len(dnp_rows):
+            continue
+        dnp_rows.append(list(dict.fromkeys(dnp_id(member.pattern_and_partition, member.partition)
+                                           for member in lg.members)))
+    registry.add_relation(IdRelation.from_rows(ID_LINE_GROUP, ID_DN_AND_PARTITION, dnp_rows))
+    registry.add_relation(IdRelation.from_rows(ID_DN_AND_PARTITION, ID_PARTITION, ((p,) for p in partition_of)))
+    log.debug(f'build_id_registry: {registry} in {(perf_counter() - start) * 1000:.2f}ms')
+    return registry
@@ -0,0 +1,369 @@
+import hashlib
+import logging
+import marshal
+import sys
+from dataclasses import dataclass
+from operator import attrgetter
+from time import perf_counter
+from typing import Callable, Union, Tuple, Optional, Any, Dict, Sequence, Iterable, List
+
+__all__ = ['Index', 'MultiIndex', 'UniqueIndex', 'UniqueDict', 'IndexStats', 'build_indexes', 'INDEX_SCHEMA_VERSION']
+
+log = logging.getLogger(__name__)
+
+# key of an index: attribute name, tuple of attribute names (composite key), or function of an object
+KeySpec = Union[str, Tuple[str, ...], Callable[[Any], Any]]
+
+# objects are indexed in chunks: each chunk is visited by all indexes before moving to the next chunk. This allows to
+# time each index w/o timing each single object
+CHUNK_SIZE = 1024
+
+# version of the representation of persisted indexes. Needs to be incremented whenever the representation changes, or
+# whenever key computations change in ways not covered by Index.signature() (for example parsing of phone lines), so
+# that existing persisted indexes are not used anymore
+INDEX_SCHEMA_VERSION = 2
+
+
+def code_digest(f: Any) -> str:
+    """
+    Digest of the code of a function; used to detect changes of key functions of persisted indexes
+    :param f: function
+    :return: digest; empty for objects w/o code (for example builtins)
+    """
+    if (code := getattr(f, '__code__', None)) is None:
+        return ''
+    return hashlib.sha1(marshal.dumps(code)).hexdigest()[:12]
+
+
+def attribute_getter(factory: type, attribute: str) -> Callable[[Any], Any]:
+    """
+    Function to get an attribute of an object
+    :param factory: class of the objects
+    :param attribute: name of a property or snail case version of a column name
+    :return: function
+    """
+    if isinstance(prop := getattr(factory, attribute, None), property):
+        return prop.fget
+    if hasattr(factory, '__getattr__'):
+        # attributes (columns) are resolved by ObjBase.__getattr__; this also works if a method of the same name exists
+        return lambda o: o.__getattr__(attribute)
+    return attrgetter(attribute)
+
+
+@dataclass
+class IndexStats:
+    """
+    Statistics for an index built
+    """
+    name: str
+    # number of distinct keys
+    keys: int
+    # number of objects referenced by the index
+    entries: int
+    seconds: float
+    # size of the dictionary and of the collections of objects; keys and objects are shared and not counted
+    bytes: int
+    # number of keys with more than one object in a unique index
+    duplicates: int = 0
+    # 'scan': built from the objects, 'snapshot': loaded from a persisted index
+    source: str = 'scan'
+
+    def __str__(self):
+        duplicates = f', {self.duplicates} duplicate keys' if self.duplicates else ''
+        source = f', from {self.source}' if self.source != 'scan' else ''
+        return (f'{self.name}: {self.keys} keys, {self.entries} entries, {self.seconds * 1000:.1f}ms, '
+                f'{self.bytes / 1024:.0f}kB{duplicates}{source}')
+
+
+class Index:
+    """
+    Declaration of an index of a container: objects grouped by a key. Indexes are available as by_<name> attributes of
+    the container.
+    """
+
+    def __init__(self, name: str, key: Optional[KeySpec] = None, separator: Optional[str] = None,
+                 collection: type = list, skip_empty: bool = False):
+        """
+        :param name: name of the index
+        :param key: attribute name, tuple of attribute names for a composite key, or function returning the key for an
+            object. Default: name of the index
+        :param separator: if set then the values of a composite key are joined to a string using this separator; else
+            composite keys are tuples
+        :param collection: list or set; collection type for the objects with the same key
+        :param skip_empty: don't index objects with empty keys
+        """
+        self.name = name
+        self.key = name if key is None else key
+        self.separator = separator
+        self.collection = collection
+        self.skip_empty = skip_empty
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.name!r})'
+
+    def key_function(self, factory: type) -> Callable[[Any], Any]:
+        """
+        Function to get the key of an object
+        :param factory: class of the objects
+        :return: function
+        """
+        key = self.key
+        if callable(key):
+            return key
+        if isinstance(key, str):
+            return attribute_getter(factory, key)
+        getters = [attribute_getter(factory, attribute) for attribute in key]
+        if self.separator is None:
+            return lambda o: tuple(getter(o) for getter in getters)
+        separator = self.separator
+        return lambda o: separator.join(getter(o) for getter in getters)
+
+    def signature(self, factory: type) -> str:
+        """
+        Identifier of the index definition; a persisted index is only used if the signature has not changed. Includes
+        the code of key functions and of properties used as keys
+        :param factory: class of the objects
+        :return: signature
+        """
+        key = self.key
+        if callable(key):
+            spec = ('', code_digest(key))
+        else:
+            attributes = (key,) if isinstance(key, str) else key
+            spec = tuple((attribute, code_digest(getattr(getattr(factory, attribute, None), 'fget', None)))
+                         for attribute in attributes)
+        return repr((self.__class__.__name__, self.name, spec, self.separator, self.collection.__name__,
+                     self.skip_empty))
+
+    def new(self) -> Dict:
+        """
+        Create an empty index
+        """
+        return dict()
+
+    def dump(self, index: Dict, positions: Dict[int, int]) -> Any:
+        """
+        Representation of an index which can be persisted: objects are replaced by their positions
+        :param index: index to dump
+        :param positions: positions of the objects in the container indexed by id of the object
+        :return: data which can be serialized by marshal
+        """
+        return {k: [positions[id(o)] for o in entries] for k, entries in index.items()}
+
+    def load(self, data: Any, objects: Sequence) -> Dict:
+        """
+        Recreate an index from a persisted representation; see dump()
+        :param data: persisted representation
+        :param objects: objects of the container
+        :return: index
+        """
+        collection = self.collection
+        if collection is list:
+            return {k: [objects[i] for i in entries] for k, entries in data.items()}
+        return {k: collection(objects[i] for i in entries) for k, entries in data.items()}
+
+    def extend(self, index: Dict, objects: Iterable, key: Callable[[Any], Any]) -> None:
+        """
+        Add objects to an index
+        :param index: index to add to
+        :param objects: objects to add
+        :param key: key function; see key_function()
+        """
+        skip_empty = self.skip_empty
+        get = index.get
+        if self.collection is list:
+            for o in objects:
+                k = key(o)
+                if skip_empty and not k:
+                    continue
+                if (entries := get(k)) is None:
+                    index[k] = [o]
+                else:
+                    entries.append(o)
+        else:
+            collection = self.collection
+            for o in objects:
+                k = key(o)
+                if skip_empty and not k:
+                    continue
+                if (entries := get(k)) is None:
+                    index[k] = entries = collection()
+                entries.add(o)
+
+    def discard(self, index: Dict, objects: Iterable, key: Callable[[Any], Any]) -> None:
+        """
+        Remove objects from an index; objects are identified by identity. Keys w/o objects are removed
+        :param index: index to remove from
+        :param objects: objects to remove; the key of each object has to be the same as when the object was added
+        :param key: key function; see key_function()
+        """
+        skip_empty = self.skip_empty
+        for o in objects:
+            k = key(o)
+            if skip_empty and not k:
+                continue
+            discard_entry(index, k, o)
+
+    def stats(self, index: Dict, seconds: float) -> IndexStats:
+        """
+        Statistics of an index built
+        """
+        getsizeof = sys.getsizeof
+        return IndexStats(name=self.name, keys=len(index), entries=sum(map(len, index.values())), seconds=seconds,
+                          bytes=getsizeof(index) + sum(map(getsizeof, index.values())))
+
+
+class MultiIndex(Index):
+    """
+    Index where each object can have multiple keys; for example the directory numbers on the lines of a phone. The key
+    function (or attribute) returns an iterable of keys
+    """
+
+    def extend(self, index: Dict, objects: Iterable, key: Callable[[Any], Any]) -> None:
+        skip_empty = self.skip_empty
+        get = index.get
+        collection = self.collection
+        for o in objects:
+            # each object is only added once per key
+            for k in dict.fromkeys(key(o)):
+                if skip_empty and not k:
+                    continue
+                if (entries := get(k)) is None:
+                    index[k] = entries = collection()
+                if collection is list:
+                    entries.append(o)
+                else:
+                    entries.add(o)
+
+    def discard(self, index: Dict, objects: Iterable, key: Callable[[Any], Any]) -> None:
+        skip_empty = self.skip_empty
+        for o in objects:
+            for k in dict.fromkeys(key(o)):
+                if skip_empty and not k:
+                    continue
+                discard_entry(index, k, o)
+
+
+def discard_entry(index: Dict, k: Any, o: Any) -> None:
+    """
+    Remove an object from the collection of objects with a given key
+    """
+    if (entries := index.get(k)) is None:
+        return
+    if isinstance(entries, list):
+        for i, e in enumerate(entries):
+            if e is o:
+                del entries[i]
+                break
+    else:
+        entries.discard(o)
+    if not entries:
+        del index[k]
+
+
+class UniqueDict(dict):
+    """
+    Unique index: key -> object. Objects with a key already in the index are kept separately as duplicates
+    """
+    __slots__ = ['duplicates']
+
+    def __init__(self):
+        super().__init__()
+        # key -> all objects with that key; only for keys with more than one object
+        self.duplicates: Dict[Any, List[Any]] = dict()
+
+
+class UniqueIndex(Index):
+    """
+    Index on a key identifying an object; for example the device name of a phone. The index maps each key to a single
+    object; if multiple objects have the same key then the first object is indexed and the duplicates are reported
+    when the index is built
+    """
+
+    def new(self) -> UniqueDict:
+        return UniqueDict()
+
+    def extend(self, index: UniqueDict, objects: Iterable, key: Callable[[Any], Any]) -> None:
+        skip_empty = self.skip_empty
+        setdefault = index.setdefault
+        for o in objects:
+            k = key(o)
+            if skip_empty and not k:
+                continue
+            if (first := setdefault(k, o)) is not o:
+                if (duplicates := index.duplicates.get(k)) is None:
+                    index.duplicates[k] = [first, o]
+                else:
+                    duplicates.append(o)
+
+    def dump(self, index: UniqueDict, positions: Dict[int, int]) -> Any:
+        return ({k: positions[id(o)] for k, o in index.items()},
+                {k: [positions[id(o)] for o in entries] for k, entries in index.duplicates.items()})
+
+    def load(self, data: Any, objects: Sequence) -> UniqueDict:
+        unique, duplicates = data
+        index = UniqueDict()
+        index.update((k, objects[i]) for k, i in unique.items())
+        index.duplicates.update((k, [objects[i] for i in entries]) for k, entries in duplicates.items())
+        return index
+
+    def discard(self, index: UniqueDict, objects: Iterable, key: Callable[[Any], Any]) -> None:
+        skip_empty = self.skip_empty
+        duplicates = index.duplicates
+        for o in objects:
+            k = key(o)
+            if skip_empty and not k:
+                continue
+            if (entries := duplicates.get(k)) is not None:
+                entries = [e for e in entries if e is not o]
+                if index.get(k) is o:
+                    # the next duplicate becomes the indexed object
+                    index[k] = entries[0]
+                if len(entries) > 1:
+                    duplicates[k] = entries
+                else:
+                    del duplicates[k]
+            elif index.get(k) is o:
+                del index[k]
+
+    def stats(self, index: UniqueDict, seconds: float) -> IndexStats:
+        return IndexStats(name=self.name, keys=len(index), entries=len(index), seconds=seconds,
+                          bytes=sys.getsizeof(index), duplicates=len(index.duplicates))
+
+
+def build_indexes(indexes: Sequence[Index], factory: type,
+                  objects: Sequence) -> Tuple[Dict[str, Dict], Dict[str, IndexStats]]:
+    """
+    Build multiple indexes in a single scan over the objects
+    :param indexes: indexes to build
+    :param factory: class of the objects
+    :param objects: objects to index
+    :return: built indexes and statistics, both indexed by index name
+    """
+    keys = [index.key_function(factory) for index in indexes]
+    built: List[Dict] = [index.new() for index in indexes]
+    seconds = [0.0] * len(indexes)
+    for start in range(0, len(objects), CHUNK_SIZE):
+        chunk = objects[start:start + CHUNK_SIZE]
+        for i, index in enumerate(indexes):
+            index_start = perf_counter()
+            index.extend(built[i], chunk, keys[i])
+            seconds[i] += perf_counter() - index_start
+    result = {index.name: d for index, d in zip(indexes, built)}
+    stats = {index.name: index.stats(d, s) for index, d, s in zip(indexes, built, seconds)}
+    for index, s in zip(indexes, stats.values()):
+        log.debug(f'build_indexes: {s}')
+        report_duplicates(factory, index.name, result[index.name])
+    return result, stats
+
+
+def report_duplicates(factory: type, name: str, index: Dict) -> None:
+    """
+    Log a warning if a unique index has duplicate keys
+    :param factory: class of the objects
+    :param name: name of the index
+    :param index: built index
+    """
+    if duplicates := getattr(index, 'duplicates', None):
+        log.warning(f'build_indexes: {factory.__name__}, {len(duplicates)} duplicate keys in unique index '
+                    f'{name}: {", ".join(map(str, list(duplicates)[:5]))}')
@@ -1,20 +1,25 @@
 from .base import *
+from .index import UniqueIndex
+from .references import DnReference, ROLE_MEMBER
+from .rowset import RowSet
+from .coltypes import ColumnTypes, Enum, Int
 
 from re import compile
 from collections import defaultdict
-from itertools import chain
 
 from .phone import CommonPhoneAndDeviceProfileContainer, CommonPhoneAndDeviceProfile
 
-from typing import Dict, List, Set
+from typing import Dict, List, Set, Iterator, Optional, Iterable, Union
 
 __all__ = ['LineGroup', 'LineGroupMember', 'LineGroupContainer']
 
 
 class LineGroupMember(ObjBase):
+    column_types = ColumnTypes(Int('LINE SELECTION ORDER'))
+
     @property
     def selection_order(self) -> int:
-        return int(self.line_selection_order)
+        return self.value('LINE SELECTION ORDER')
 
     @property
     def dn_or_pattern(self) -> str:
@@ -36,6 +41,7 @@ ATTRIBUTE_PATTERN = compile(r'(.+) (\d+)')
 
 
 class LineGroup(ObjBase):
+    column_types = ColumnTypes(Enum('TYPE DISTRIBUTION ALGORITHM'), Int('LINE SELECTION ORDER n'))
 
     def __init__(self, o: Dict):
         super(LineGroup, self).__init__(o)
@@ -58,7 +64,7 @@ class LineGroup(ObjBase):
             member_index = None
             keys_to_remove = []
             members = []
-            for k, v in self.dict.items():
+            for k, v in self.typed_items():
                 if m := ATTRIBUTE_PATTERN.match(k):
                     if REMOVE_ATTR_FROM_PARENT:
                         keys_to_remove.append(k)
@@ -83,18 +89,24 @@ class LineGroup(ObjBase):
         return set([m.pattern_and_partition for m in self.members])
 
     def phones_or_device_profiles(self,
-                                  container: CommonPhoneAndDeviceProfileContainer) -> Set[CommonPhoneAndDeviceProfile]:
+                                  container: CommonPhoneAndDeviceProfileContainer,
+                                  as_row_set: bool = False) -> Union[Set[CommonPhoneAndDeviceProfile], RowSet]:
         """
         All phones on which one of the DNPs is present
+        :param container: phones or device profiles
+        :param as_row_set: return a row set of the container instead of a set
         """
         members = self.pattern_and_partition_set()
-        return set(chain.from_iterable(container.by_dn_and_partition.get(dnp, []) for dnp in members))
+        rows = container.rows_with('dn_and_partition', members)
+        return rows if as_row_set else set(rows)
 
 
 class LineGroupContainer(CsvBase):
     factory = LineGroup
+    key_columns = ('NAME',)
+    indexes = (UniqueIndex('key', key='name'),)
 
-    def __init__(self, tar: str):
+    def __init__(self, tar: TarSource):
         super(LineGroupContainer, self).__init__(tar)
         self._related_patterns_and_partitions = None
 
@@ -103,7 +115,15 @@ class LineGroupContainer(CsvBase):
         return super(LineGroupContainer, self).list
 
     def __getitem__(self, item) -> LineGroup:
-        return self.by_name[item][0]
+        return self.by_key[item]
+
+    def invalidate(self) -> None:
+        self._related_patterns_and_partitions = None
+
+    def dn_references(self, objects: Optional[Iterable] = None) -> Iterator[DnReference]:
+        for line_group in (self.list if objects is None else objects):
+            for member in line_group.members:
+                yield DnReference.of(member.pattern_and_partition, line_group, ROLE_MEMBER, member.selection_order)
 
     def related_patterns_and_partitions(self) -> DNAandPartitionRelated:
         """
@@ -0,0 +1,285 @@
+"""
+Line appearances of phones and device profiles as NumPy arrays. NumPy is only needed if the line table is used; the
+module is not imported by ucmexport.objects
+"""
+import logging
+from array import array
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+__all__ = ['LineTable', 'build_line_table', 'KIND_PHONE', 'KIND_DEVICE_PROFILE', 'LINE_COLUMNS', 'DEVICE_COLUMNS']
+
+log = logging.getLogger(__name__)
+
+# values of the kind column
+KIND_PHONE = 'phone'
+KIND_DEVICE_PROFILE = 'device_profile'
+
+# categorical columns of each line appearance: column name -> column of the line in the CSV file. dn_and_partition is
+# derived from directory number and partition
+LINE_COLUMNS = {'dn': 'DIRECTORY NUMBER',
+                'partition': 'ROUTE PARTITION',
+                'dn_and_partition': None,
+                'css': 'LINE CSS',
+                'call_pickup_group': 'CALL PICKUP GROUP',
+                'external_phone_number_mask': 'EXTERNAL PHONE NUMBER MASK'}
+
+# categorical columns of each device
+DEVICE_COLUMNS = ('kind', 'device_css')
+
+
+class LineTable:
+    """
+    Normalized table of the line appearances of phones and device profiles: one row per line of a device. Values are
+    integer codes into the categories of each column; categories are in the order they were first seen. Device
+    columns are stored once per device and are joined to the lines via the device column. Rows are ordered by device
+    and line index.
+    Group-bys, counts and joins run vectorized on the code arrays; for example counting combinations of line CSS and
+    device CSS on the first lines of all phones:
+        table.group_counts(('css', 'device_css'), rows=table.first_lines() & table.rows(kind=KIND_PHONE))
+    """
+
+    def __init__(self, devices: List[Any], device: np.ndarray, line_index: np.ndarray,
+                 codes: Dict[str, np.ndarray], device_codes: Dict[str, np.ndarray], categories: Dict[str, List[str]]):
+        """
+        :param devices: phones and device profiles; position in this list is the device id
+        :param device: device id for each line appearance
+        :param line_index: line index for each line appearance; for example 1 for the first line
+        :param codes: codes of the line columns
+        :param device_codes: codes of the device columns for each device
+        :param categories: categories of all columns
+        """
+        self.devices = devices
+        self.device = device
+        self.line_index = line_index
+        self._codes = codes
+        self._device_codes = device_codes
+        self._categories = categories
+        # code for each category for each column; created on demand
+        self._code_of: Dict[str, Dict[str, int]] = dict()
+
+    def __repr__(self):
+        return f'LineTable({len(self)} line appearances, {len(self.devices)} devices)'
+
+    def __len__(self):
+        return len(self.device)
+
+    def columns(self) -> List[str]:
+        """
+        Names of the categorical columns; line columns followed by device columns
+        """
+        return list(self._codes) + list(self._device_codes)
+
+    def categories(self, name: str) -> List[str]:
+        """
+        Values of a column in the order of their codes
+        """
+        return self._categories[name]
+
+    def code(self, name: str, value: str) -> int:
+        """
+        Code of a value of a column
+        :param name: column name
+        :param value: value
+        :return: code; -1 if the value does not exist in the column
+        """
+        if (code_of := self._code_of.get(name)) is None:
+            code_of = self._code_of[name] = {v: i for i, v in enumerate(self._categories[name])}
+        return code_of.get(value, -1)
+
+    def codes(self, name: str) -> np.ndarray:
+        """
+        Codes of a column for each line appearance; device columns are joined to the lines
+        :param name: column name; see columns()
+        :return: array of codes
+        """
+        if (codes := self._codes.get(name)) is not None:
+            return codes
+        if (device_codes := self._device_codes.get(name)) is None:
+            raise KeyError(f'no column {name}')
+        return device_codes[self.device]
+
+    def values(self, name: str, rows: Optional[np.ndarray] = None) -> List[str]:
+        """
+        Values of a column
+        :param name: column name
+        :param rows: boolean mask or indices of the rows; default: all rows
+        :return: values for each selected row
+        """
+        codes = self.codes(name)
+        if rows is not None:
+            codes = codes[rows]
+        categories = self._categories[name]
+        return [categories[c] for c in codes.tolist()]
+
+    def rows(self, **values: str) -> np.ndarray:
+        """
+        Rows where columns have given values; for example rows(partition='PT_INTERNAL', kind=KIND_PHONE)
+        :param values: value for each column
+        :return: boolean mask
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for name, value in values.items():
+            mask &= self.codes(name) == self.code(name, value)
+        return mask
+
+    def first_lines(self) -> np.ndarray:
+        """
+        Rows of the first line of each device: the line with the lowest line index
+        :return: boolean mask
+        """
+        device = self.device
+        mask = np.ones(len(device), dtype=bool)
+        mask[1:] = device[1:] != device[:-1]
+        return mask
+
+    def devices_of(self, rows: Optional[np.ndarray] = None) -> List[Any]:
+        """
+        Distinct devices of rows
+        :param rows: boolean mask or indices of the rows; default: all rows
+        :return: devices in the order of the devices
+        """
+        device = self.device if rows is None else self.device[rows]
+        devices = self.devices
+        return [devices[d] for d in np.unique(device).tolist()]
+
+    def value_counts(self, name: str, rows: Optional[np.ndarray] = None) -> Dict[str, int]:
+        """
+        Number of rows for each value of a column
+        :param name: column name
+        :param rows: boolean mask or indices of the rows; default: all rows
+        :return: counts of the values which exist in the rows, in the order of the categories
+        """
+        codes = self.codes(name)
+        if rows is not None:
+            codes = codes[rows]
+        counts = np.bincount(codes, minlength=len(self._categories[name]))
+        categories = self._categories[name]
+        return {categories[c]: int(counts[c]) for c in np.flatnonzero(counts).tolist()}
+
+    def group_counts(self, names: Sequence[str], rows: Optional[np.ndarray] = None) -> Dict[Tuple[str, ...], int]:
+        """
+        Number of rows for each combination of values of multiple columns
+        :param names: column names
+        :param rows: boolean mask or indices of the rows; default: all rows
+        :return: counts of the combinations which exist in the rows, in the order the combinations first appear
+        """
+        keys = np.stack([self.codes(name) for name in names], axis=1)
+        if rows is not None:
+            keys = keys[rows]
+        if not len(keys):
+            return dict()
+        unique, first, counts = np.unique(keys, axis=0, return_index=True, return_counts=True)
+        categories = [self._categories[name] for name in names]
+        result = dict()
+        for i in np.argsort(first, kind='stable').tolist():
+            key = tuple(c[code] for c, code in zip(categories, unique[i].tolist()))
+            result[key] = int(counts[i])
+        return result
+
+    def group_devices(self, name: str, rows: Optional[np.ndarray] = None) -> Dict[str, List[Any]]:
+        """
+        Devices for each value of a column
+        :param name: column name
+        :param rows: boolean mask or indices of the rows; default: all rows
+        :return: distinct devices in the order of the devices for each value which exists in the rows; values in the
+            order of the categories
+        """
+        codes = self.codes(name)
+        device = self.device
+        if rows is not None:
+            codes = codes[rows]
+            device = device[rows]
+        # distinct (code, device) pairs sorted by code and device
+        n = max(len(self.devices), 1)
+        pairs = np.unique(codes.astype(np.int64) * n + device)
+        pair_codes = (pairs // n).tolist()
+        pair_devices = (pairs % n).tolist()
+        categories = self._categories[name]
+        devices = self.devices
+        result: Dict[str, List[Any]] = dict()
+        for code, d in zip(pair_codes, pair_devices):
+            if (entries := result.get(value := categories[code])) is None:
+                result[value] = entries = []
+            entries.append(devices[d])
+        return result
+
+    def shared(self, name: str = 'dn_and_partition', min_devices: int = 2,
+               rows: Optional[np.ndarray] = None) -> Dict[str, int]:
+        """
+        Values of a column on the lines of multiple devices; for example DN:partitions shared by multiple devices
+        :param name: column name
+        :param min_devices: minimum number of distinct devices
+        :param rows: boolean mask or indices of the rows; default: all rows
+        :return: number of distinct devices for each value on at least min_devices devices, in the order of the
+            categories
+        """
+        codes = self.codes(name)
+        device = self.device
+        if rows is not None:
+            codes = codes[rows]
+            device = device[rows]
+        n = max(len(self.devices), 1)
+        # distinct (code, device) pairs
+        pairs = np.unique(codes.astype(np.int64) * n + device)
+        counts = np.bincount(pairs // n, minlength=len(self._categories[name]))
+        categories = self._categories[name]
+        return {categories[c]: int(counts[c]) for c in np.flatnonzero(counts >= min_devices).tolist()}
+
+
+def build_line_table(phones: Any, device_profiles: Any) -> LineTable:
+    """
+    Build the line table in a single pass over the lines of all phones and device profiles
+    :param phones: phone container
+    :param device_profiles: device profile container
+    :return: line table
+    """
+    start = perf_counter()
+    devices: List[Any] = []
+    device = array('i')
+    line_index = array('h')
+    names = list(LINE_COLUMNS)
+    # columns read from the lines; missing columns (for example because of a projection) are empty
+    line_columns = [column for column in LINE_COLUMNS.values() if column]
+    # value -> code for each column
+    code_maps: Dict[str, Dict[str, int]] = {name: dict() for name in names + list(DEVICE_COLUMNS)}
+    line_codes = [array('i') for _ in names]
+    line_maps = [code_maps[name] for name in names]
+    dnp_position = names.index('dn_and_partition')
+    kind_codes = array('i')
+    device_css_codes = array('i')
+    kind_map = code_maps['kind']
+    device_css_map = code_maps['device_css']
+
+    def code(code_map: Dict[str, int], value: Optional[str]) -> int:
+        value = value or ''
+        if (c := code_map.get(value)) is None:
+            c = code_map[value] = len(code_map)
+        return c
+
+    for kind, container in ((KIND_PHONE, phones), (KIND_DEVICE_PROFILE, device_profiles)):
+        kind_code = code(kind_map, kind)
+        for o in container.list:
+            d = len(devices)
+            devices.append(o)
+            kind_codes.append(kind_code)
+            device_css_codes.append(code(device_css_map, o.dict.get('CSS')))
+            for index, line in o.lines.items():
+                device.append(d)
+                line_index.append(index)
+                get = line.dict.get
+                values = [get(column) or '' for column in line_columns]
+                values.insert(dnp_position, f'{values[0]}:{values[1]}')
+                for codes, code_map, value in zip(line_codes, line_maps, values):
+                    codes.append(code(code_map, value))
+    table = LineTable(devices=devices,
+                      device=np.frombuffer(device, dtype=np.intc),
+                      line_index=np.frombuffer(line_index, dtype=np.short),
+                      codes={name: np.frombuffer(codes, dtype=np.intc) for name, codes in zip(names, line_codes)},
+                      device_codes={'kind': np.frombuffer(kind_codes, dtype=np.intc),
+                                    'device_css': np.frombuffer(device_css_codes, dtype=np.intc)},
+                      categories={name: list(code_map) for name, code_map in code_maps.items()})
+    log.debug(f'build_line_table: {table} in {(perf_counter() - start) * 1000:.2f}ms')
+    return table
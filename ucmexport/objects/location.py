@@ -1,4 +1,5 @@
 from .base import *
+from .coltypes import ColumnTypes, Int
 
 from typing import Dict, List, Set
 from dataclasses import dataclass
@@ -13,6 +14,7 @@ class AssociatedLocation:
 
 
 class Location(ObjBase):
+    column_types = ColumnTypes(Int('AUDIO BANDWIDTH'), Int('VIDEO BANDWIDTH'), Int('IMMERSIVE VIDEO BANDWIDTH'))
 
     def __init__(self, o: Dict):
         super().__init__(o)
@@ -27,15 +29,15 @@ class Location(ObjBase):
 
     @property
     def audio_bandwidth(self) -> int:
-        return int(self.dict['AUDIO BANDWIDTH'])
+        return self.value('AUDIO BANDWIDTH')
 
     @property
     def video_bandwidth(self) -> int:
-        return int(self.dict['VIDEO BANDWIDTH'])
+        return self.value('VIDEO BANDWIDTH')
 
     @property
     def immersive_video_bandwidth(self) -> int:
-        return int(self.dict['IMMERSIVE VIDEO BANDWIDTH'])
+        return self.value('IMMERSIVE VIDEO BANDWIDTH')
 
     @property
     def associated_locations(self) -> List[AssociatedLocation]:
@@ -1,4 +1,5 @@
 from .base import *
+from .coltypes import ColumnTypes, Int
 
 from typing import List
 
@@ -6,6 +7,8 @@ __all__ = ['LocationEdge', 'LocationEdgeContainer']
 
 
 class LocationEdge(ObjBase):
+    column_types = ColumnTypes(Int('WEIGHT'), Int('AUDIO BANDWIDTH'), Int('VIDEO BANDWIDTH'),
+                               Int('IMMERSIVE VIDEO BANDWIDTH'))
 
     def __str__(self):
         return f'{self.location}->{self.neighboring_location}'
@@ -20,19 +23,19 @@ class LocationEdge(ObjBase):
 
     @property
     def weight(self) -> int:
-        return int(self.dict['WEIGHT'])
+        return self.value('WEIGHT')
 
     @property
     def audio_bandwidth(self) -> int:
-        return int(self.dict['AUDIO BANDWIDTH'])
+        return self.value('AUDIO BANDWIDTH')
 
     @property
     def video_bandwidth(self) -> int:
-        return int(self.dict['VIDEO BANDWIDTH'])
+        return self.value('VIDEO BANDWIDTH')
 
     @property
     def immersive_video_bandwidth(self) -> int:
-        return int(self.dict['IMMERSIVE VIDEO BANDWIDTH'])
+        return self.value('IMMERSIVE VIDEO BANDWIDTH')
 
 
 class LocationEdgeContainer(CsvBase):
@@ -1,19 +1,36 @@
 from .base import *
+from .index import Index, IndexStats, MultiIndex, UniqueIndex
+from .references import DnReference, ROLE_LINE, ROLE_BLF
+from .cssgraph import CssReference, ROLE_DEVICE_CSS, ROLE_LINE_CSS, ROLE_AAR_CSS
+from .dntrie import DnTrie, build_dn_tries
+from .relations import DeviceRelations, ID_CALL_PICKUP_GROUP
+from .ids import ID_DN_AND_PARTITION, ID_USER
+from .row import Row, RowGroup
 
 from collections import defaultdict
-from re import compile, match
+from collections.abc import MutableMapping
+from functools import lru_cache
+from time import perf_counter
+from re import compile, match, Pattern
 import itertools
+import logging
 
-from typing import List, Dict, Iterable, Set
+from typing import Callable, List, Dict, Iterable, Set, Iterator, Optional, Sequence, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
 
 __all__ = ['Phone', 'PhoneContainer', 'BusyLampField', 'SpeedDial', 'Line', 'Uri', 'PhoneDict',
            'CommonPhoneAndDeviceProfileContainer', 'CommonPhoneAndDeviceProfile']
 
+log = logging.getLogger(__name__)
+
 
 class Uri(ObjBase):
     """
     URI information on a line
     """
+    __slots__ = ()
 
     @property
     def uri(self) -> str:
@@ -32,11 +49,16 @@ URI_PATTERN = compile(r'URI (\d) (.+)')
 
 class Line(ObjBase):
     """
-    a line on a phone
+    a line on a phone. Directory number and partition are kept on the line; all other values are read from the
+    columns of the line in the phone's row
     """
+    __slots__ = ['_dn', '_partition', '_uris']
 
-    def __init__(self, o: Dict):
+    def __init__(self, o: MutableMapping):
         super(Line, self).__init__(o)
+        # None if the column does not exist
+        self._dn: Optional[str] = o.get('DIRECTORY NUMBER')
+        self._partition: Optional[str] = o.get('ROUTE PARTITION')
         self._uris = None
 
     def __str__(self):
@@ -44,11 +66,15 @@ class Line(ObjBase):
 
     @property
     def directory_number(self) -> str:
-        return self.__getattr__('directory_number')
+        if (dn := self._dn) is None:
+            return self.__getattr__('directory_number')
+        return dn
 
     @property
     def partition(self) -> str:
-        return self.route_partition
+        if (partition := self._partition) is None:
+            return self.route_partition
+        return partition
 
     @property
     def dn_and_partition(self) -> str:
@@ -73,20 +99,28 @@ class Line(ObjBase):
     @property
     def uris(self) -> Dict[int, Uri]:
         if self._uris is None:
-            # collect uri information
-            uris: Dict[int, Dict] = defaultdict(dict)
-            remove_keys = []
-            for k, v in self.dict.items():
+            # collect uri information: attribute names and columns of each URI
+            d = self.dict
+            uri_columns: Dict[str, Tuple[List[str], List[str]]] = dict()
+            for k in d:
                 if k.startswith('URI '):
-                    if REMOVE_ATTR_FROM_PARENT:
-                        remove_keys.append(k)
                     uri_index = k.split(' ')[1]
-                    attribute = k[5 + len(uri_index):]
-                    uris[uri_index][attribute] = v
-            d = self.dict
-            for k in remove_keys:
-                d.pop(k)
-            self._uris = {int(k): Uri(uri) for k, uri in uris.items() if uri['ON DIRECTORY NUMBER']}
+                    attributes, keys = uri_columns.setdefault(uri_index, ([], []))
+                    attributes.append(k[5 + len(uri_index):])
+                    keys.append(k)
+            uris = dict()
+            for uri_index, (attributes, keys) in uri_columns.items():
+                if isinstance(d, RowGroup):
+                    uri = d.select(tuple(attributes), keys)
+                else:
+                    uri = {attribute: d[k] for attribute, k in zip(attributes, keys)}
+                if uri['ON DIRECTORY NUMBER']:
+                    uris[int(uri_index)] = Uri(uri)
+            if REMOVE_ATTR_FROM_PARENT:
+                for _, keys in uri_columns.values():
+                    for k in keys:
+                        d.pop(k)
+            self._uris = uris
         return self._uris
 
 
@@ -94,6 +128,8 @@ SD_PATTERN = compile(r'SPEED DIAL (\w+) (\d+)')
 
 
 class SpeedDial(ObjBase):
+    __slots__ = ()
+
     @property
     def label(self) -> str:
         return self.dict['LABEL']
@@ -110,7 +146,9 @@ BLF_PATTERN = compile(r'BUSY LAMP FIELD (.+) (\d+)')
 
 
 class BusyLampField(ObjBase):
-    def __init__(self, o: Dict):
+    __slots__ = ['_dn', '_partition']
+
+    def __init__(self, o: MutableMapping):
         super(BusyLampField, self).__init__(o)
         dn = self.dict['DIRECTORY NUMBER']
         if dn and (m := match(r'(\d+) in (\D+)', dn)):
@@ -152,6 +190,79 @@ class BusyLampField(ObjBase):
 ATTRIBUTE_PATTERN = compile(r'(.+) (\d+)')
 
 
+class ColumnPlan:
+    """
+    Location of the repeated groups of columns of phones and device profiles in a CSV header: lines, speed dials, BLFs
+    and user ids. The layout is the same for all rows read from a CSV file; with the plan the groups of a row are
+    sliced from the values of the row w/o looking at the column names of each row
+    """
+    __slots__ = ['lines', 'speed_dials', 'busy_lamp_fields', 'user_ids']
+
+    def __init__(self, header: Sequence[str]):
+        """
+        :param header: CSV header or keys of a dictionary
+        """
+        # lines: (line index, first column, end column, attribute names); the first column is the directory number.
+        # A line has all columns up to the next directory number; lines end at the first speed dial column
+        self.lines: List[Tuple[int, int, int, Tuple[str, ...]]] = []
+        line_start = None
+        for i, k in enumerate(header):
+            if k[0] in 'DS' and ((dn := k.startswith('DIRECTORY N')) or k.startswith('SPEE')):
+                if line_start is not None:
+                    self._add_line(header, line_start, i)
+                    line_start = None
+                if not dn:
+                    break
+                line_start = i
+        if line_start is not None:
+            self._add_line(header, line_start, len(header))
+        # speed dials and BLFs: index -> (attribute names, columns)
+        self.speed_dials = self._groups(header, 'SPEED ', SD_PATTERN)
+        self.busy_lamp_fields = self._groups(header, 'BUSY', BLF_PATTERN)
+        # columns of user id 1, 2, ...
+        attributes: Dict[str, int] = dict()
+        for i, k in enumerate(header):
+            attributes.setdefault(to_snail(k), i)
+        self.user_ids: List[int] = []
+        while (column := attributes.get(f'user_id_{len(self.user_ids) + 1}')) is not None:
+            self.user_ids.append(column)
+
+    def _add_line(self, header: Sequence[str], start: int, end: int):
+        line_index = header[start].split(' ')[-1]
+        # attribute names are the column names w/o the line index
+        line_index_len = len(line_index) + 1
+        self.lines.append((int(line_index), start, end, tuple(k[:-line_index_len] for k in header[start:end])))
+
+    @staticmethod
+    def _groups(header: Sequence[str], prefix: str,
+                pattern: Pattern) -> Dict[int, Tuple[Tuple[str, ...], Tuple[int, ...]]]:
+        groups: Dict[int, List[Tuple[str, int]]] = defaultdict(list)
+        for i, k in enumerate(header):
+            if k.startswith(prefix) and (m := pattern.match(k)):
+                groups[int(m.group(2))].append((m.group(1), i))
+        return {index: (tuple(a for a, _ in columns), tuple(i for _, i in columns))
+                for index, columns in groups.items()}
+
+    def columns(self) -> Iterator[int]:
+        """
+        All columns of the groups
+        """
+        for _, start, end, _ in self.lines:
+            yield from range(start, end)
+        for groups in (self.speed_dials, self.busy_lamp_fields):
+            for _, columns in groups.values():
+                yield from columns
+        yield from self.user_ids
+
+
+@lru_cache(maxsize=32)
+def column_plan(header: Tuple[str, ...]) -> ColumnPlan:
+    """
+    Column plan for a CSV header; plans are computed once per header
+    """
+    return ColumnPlan(header)
+
+
 class CommonPhoneAndDeviceProfile(ObjBase):
     """
     Commonalities of Phone and DeviceProfile
@@ -163,94 +274,80 @@ class CommonPhoneAndDeviceProfile(ObjBase):
         self._blfs = None
         self._user_ids = None
 
+    def _plan_and_values(self) -> Tuple[ColumnPlan, Callable[[int], str], Optional[Row], bool]:
+        """
+        Column plan of the object's dictionary and access to the values by column
+        :return: plan, function returning the value of a column of the plan's header, the row if groups can be views
+            onto the row (else groups are copied to dictionaries), and True if empty values are kept
+        """
+        o = self.dict
+        if type(o) is Row and not o.modified:
+            schema = o.schema
+            return column_plan(schema.header), o._text, o if schema.keep_empty else None, schema.keep_empty
+        return column_plan(tuple(o)), list(o.values()).__getitem__, None, True
+
+    def _remove_group_columns(self):
+        """
+        Remove the columns of all groups from the object's dictionary; see REMOVE_ATTR_FROM_PARENT
+        """
+        d = self.dict
+        header = list(d)
+        for column in list(column_plan(tuple(header)).columns()):
+            d.pop(header[column], None)
+
     @property
     def lines(self) -> Dict[int, Line]:
         if self._lines is None:
-            line = None
-            line_index = None
+            plan, value, row, keep_empty = self._plan_and_values()
             lines = dict()
-            remove_keys = []
-            line_index_len = None
-            for k, v in self.dict.items():
-                k: str
-                # look for 'Directory Number" and 'Speed Dial'
-                if (k[0] in 'DS') and \
-                        ((sd := k.startswith('DIRECTORY N')) or k.startswith('SPEE')):
-                    # end collecting the current line
-                    if line is not None:
-                        # collect the line
-                        lines[int(line_index)] = Line(line)
-                        line = None
-                    # noinspection PyUnboundLocalVariable
-                    if sd and v:
-                        # start a new line only if the directory number is not empty
-                        line = dict()
-                        line_index = k.split(' ')[-1]
-                        # index len including preceeding space
-                        line_index_len = len(line_index) + 1
-                    elif not sd:
-                        # we are done as soon as we hit the 1st Speed Dial
-                        break
-                    else:
-                        line = None
-
-                if line is not None:
-                    # remove this key from phone
-                    if REMOVE_ATTR_FROM_PARENT:
-                        remove_keys.append(k)
-                    # add an attribute to the line
-                    # attribute is all up to the line index
-                    k = k[:-line_index_len]
-                    line[k] = v
-
-            if line is not None:
-                # store the line
-                lines[int(line_index)] = Line(line)
+            for line_index, start, end, attributes in plan.lines:
+                if not value(start):
+                    # lines only exist if the directory number is not empty
+                    continue
+                if row is not None:
+                    line = RowGroup(row, attributes, range(start, end))
+                else:
+                    line = dict(zip(attributes, map(value, range(start, end))))
+                    if not keep_empty:
+                        line = {k: v for k, v in line.items() if v}
+                lines[line_index] = Line(line)
             self._lines = lines
-            d = self.dict
-            for k in remove_keys:
-                d.pop(k)
+            if REMOVE_ATTR_FROM_PARENT:
+                self._remove_group_columns()
         return self._lines
 
+    @staticmethod
+    def _group_dicts(groups: Dict[int, Tuple[Tuple[str, ...], Tuple[int, ...]]], value: Callable[[int], str],
+                     row: Optional[Row], keep_empty: bool) -> Iterator[Tuple[int, MutableMapping]]:
+        for index, (attributes, columns) in groups.items():
+            if row is not None:
+                yield index, RowGroup(row, attributes, columns)
+                continue
+            d = dict(zip(attributes, map(value, columns)))
+            if not keep_empty:
+                d = {k: v for k, v in d.items() if v}
+            yield index, d
+
     @property
     def speed_dials(self) -> Dict[int, SpeedDial]:
         if self._speed_dials is None:
-            keys_to_delete = []
-            speed_dials = defaultdict(dict)
-            for k, v in self.dict.items():
-                if not k.startswith('SPEED '):
-                    continue
-                if m := SD_PATTERN.match(k):
-                    if REMOVE_ATTR_FROM_PARENT:
-                        keys_to_delete.append(k)
-                    attribute = m.group(1)
-                    index = int(m.group(2))
-                    speed_dials[index][attribute] = v
-            self._speed_dials = {k: SpeedDial(v) for k, v in speed_dials.items() if v['NUMBER']}
-            d = self.dict
-            for k in keys_to_delete:
-                d.pop(k)
+            plan, value, row, keep_empty = self._plan_and_values()
+            self._speed_dials = {k: SpeedDial(v)
+                                 for k, v in self._group_dicts(plan.speed_dials, value, row, keep_empty)
+                                 if v['NUMBER']}
+            if REMOVE_ATTR_FROM_PARENT:
+                self._remove_group_columns()
         return self._speed_dials
 
     @property
     def busy_lamp_fields(self) -> Dict[int, BusyLampField]:
         if self._blfs is None:
-            blfs = defaultdict(dict)
-            keys_to_delete = []
-            for k, v in self.dict.items():
-                if not k.startswith('BUSY'):
-                    continue
-                if m := BLF_PATTERN.match(k):
-                    if REMOVE_ATTR_FROM_PARENT:
-                        keys_to_delete.append(k)
-                    attribute = m.group(1)
-                    index = int(m.group(2))
-                    blfs[index][attribute] = v
-            self._blfs = {k: BusyLampField(v) for k, v in blfs.items() if
-                          v['DESTINATION'] or v['DIRECTORY NUMBER'] or v['CALL PICKUP']}
-            d = self.dict
-            for k in keys_to_delete:
-                d.pop(k)
+            plan, value, row, keep_empty = self._plan_and_values()
+            self._blfs = {k: BusyLampField(v)
+                          for k, v in self._group_dicts(plan.busy_lamp_fields, value, row, keep_empty)
+                          if v['DESTINATION'] or v['DIRECTORY NUMBER'] or v['CALL PICKUP']}
+            if REMOVE_ATTR_FROM_PARENT:
+                self._remove_group_columns()
         return self._blfs
 
     def __lt__(self, other):
@@ -281,18 +378,12 @@ class CommonPhoneAndDeviceProfile(ObjBase):
     @property
     def user_ids(self) -> List[str]:
         if self._user_ids is None:
+            plan, value, _, _ = self._plan_and_values()
             self._user_ids = []
-            i = 1
-
-            while True:
-                try:
-                    uid = self.user_id(i)
-                    if not uid:
-                        break
-                    self._user_ids.append(uid)
-                except AttributeError:
+            for column in plan.user_ids:
+                if not (uid := value(column)):
                     break
-                i += 1
+                self._user_ids.append(uid)
         return self._user_ids
 
     @property
@@ -354,12 +445,120 @@ class CommonPhoneAndDeviceProfileContainer(CsvBase):
     """
     Commonalities of Phone and Device Profile Container
     """
-    def __init__(self, tar: str):
+    indexes = (Index('device_type'),
+               # all user ids referenced on the phone or profile
+               MultiIndex('user_id', key='user_set'),
+               MultiIndex('dn_and_partition', key=lambda p: (line.dn_and_partition for line in p.lines.values()),
+                          collection=set),
+               # call pickup groups on all lines; we skip lines w/ empty CPG
+               MultiIndex('call_pickup_group', key=lambda p: (line.call_pickup_group for line in p.lines.values()),
+                          collection=set, skip_empty=True))
+
+    # indexes built from the device relations instead of scanning the devices: index name -> target of the relation
+    relation_indexes = {'user_id': ID_USER, 'dn_and_partition': ID_DN_AND_PARTITION,
+                        'call_pickup_group': ID_CALL_PICKUP_GROUP}
+
+    def __init__(self, tar: TarSource):
         super().__init__(tar)
         self._line_related_patterns_and_partitions = None
-        self._by_user_id = None
-        self._by_dn_and_partition = None
-        self._by_call_pickup_group = None
+        # DN prefix tries indexed by line index (None: all lines) and partition
+        self._dn_tries: Dict[Optional[int], Dict[Optional[str], DnTrie]] = dict()
+        self._relations: Optional[DeviceRelations] = None
+
+    def invalidate(self) -> None:
+        self._dn_tries = dict()
+        self._relations = None
+
+    @property
+    def relations(self) -> DeviceRelations:
+        """
+        DN:partitions, call pickup groups and user ids of all devices; built in a single pass on first use. The indexes
+        by DN:partition, call pickup group and user id and related_lines() are derived from the relations
+        """
+        if self._relations is None:
+            self._relations = DeviceRelations(self.list)
+        return self._relations
+
+    def _scan_indexes(self, indexes: List[Index]) -> Tuple[Dict[str, Dict], Dict[str, IndexStats]]:
+        relation_indexes = self.relation_indexes
+        if not (derived := [index for index in indexes if index.name in relation_indexes]):
+            return super()._scan_indexes(indexes)
+        built, stats = super()._scan_indexes([index for index in indexes if index.name not in relation_indexes])
+        # if the relations are built here then the time to build them is split between the indexes derived from them
+        new_relations = self._relations is None
+        relations = self.relations
+        relations_seconds = relations.seconds / len(derived) if new_relations else 0.0
+        for index in derived:
+            start = perf_counter()
+            d = built[index.name] = relations.index(relation_indexes[index.name], index.collection)
+            stats[index.name] = index.stats(d, perf_counter() - start + relations_seconds)
+            log.debug(f'build_indexes: {stats[index.name]}, from relations')
+        return built, stats
+
+    def lines_frame(self, columns: Optional[Sequence[str]] = None) -> 'DataFrame':
+        """
+        pandas DataFrame with one row per line appearance: key columns of the device, LINE INDEX, and the line columns
+        w/o the line index; built from the parsed CSV file w/o creating objects. Requires pandas
+        :param columns: line columns to include; for example ('DIRECTORY NUMBER', 'ROUTE PARTITION'). Default: all
+        :return: frame
+        """
+        # pandas is only imported if frames are used
+        from .frames import lines_frame
+        return lines_frame(self.frame_table(), key_columns=self.key_columns, columns=columns)
+
+    def related_lines(self) -> DNAandPartitionRelated:
+        """
+        Determine which DN:partitions are related b/c they exist on the same device
+        :return: dictionary, key is DN:partition, values are set of DN:partition.
+        Only contains DN:partition keys where there are actually related DN:partition values
+        """
+        return self.relations.related_lines()
+
+    def dn_tries(self, line_index: Optional[int] = None) -> Dict[Optional[str], DnTrie]:
+        """
+        Prefix tries over the directory numbers on the lines; all tries are built in a single pass on first use
+        :param line_index: only DNs on the line with this index; for example 1 for the first line. Default: all lines
+        :return: tries indexed by partition in the order partitions were first seen; the trie for all DNs has the key
+            None
+        """
+        if (tries := self._dn_tries.get(line_index)) is None:
+            if line_index is None:
+                dn_and_partitions = ((line.directory_number, line.partition)
+                                     for p in self.list for line in p.lines.values())
+            else:
+                dn_and_partitions = ((line.directory_number, line.partition)
+                                     for p in self.list if (line := p.lines.get(line_index)))
+            tries = self._dn_tries[line_index] = build_dn_tries(dn_and_partitions)
+        return tries
+
+    def dn_trie(self, partition: Optional[str] = None, line_index: Optional[int] = None) -> DnTrie:
+        """
+        Prefix trie over the directory numbers on the lines; see dn_tries()
+        :param partition: only DNs in this partition; default: DNs in all partitions
+        :param line_index: only DNs on the line with this index; default: all lines
+        :return: trie; empty if there are no DNs in the partition
+        """
+        return self.dn_tries(line_index).get(partition) or DnTrie()
+
+    def dn_references(self, objects: Optional[Iterable] = None) -> Iterator[DnReference]:
+        for p in (self.list if objects is None else objects):
+            for index, line in p.lines.items():
+                yield DnReference.of(line.dn_and_partition, p, ROLE_LINE, index)
+            for index, blf in p.busy_lamp_fields.items():
+                # BLFs can also monitor destinations which are not DNs
+                if blf.directory_number:
+                    yield DnReference.of(blf.dn_and_partition, p, ROLE_BLF, index)
+
+    def css_references(self, objects: Optional[Iterable] = None) -> Iterator[CssReference]:
+        for p in (self.list if objects is None else objects):
+            # phones and device profiles both have CSS and AAR CSS columns
+            if css := p.dict.get('CSS'):
+                yield CssReference.of(css, p, ROLE_DEVICE_CSS)
+            if aar_css := p.dict.get('AAR CSS'):
+                yield CssReference.of(aar_css, p, ROLE_AAR_CSS)
+            for index, line in p.lines.items():
+                if line_css := line.css:
+                    yield CssReference.of(line_css, p, ROLE_LINE_CSS, index, line.dn_and_partition)
 
     @property
     def by_device_type(self) -> PhoneAndDevicePoolDict:
@@ -371,13 +570,7 @@ class CommonPhoneAndDeviceProfileContainer(CsvBase):
         indexed by user ids
         :return:
         """
-        if self._by_user_id is None:
-            d: PhoneAndDevicePoolDict = defaultdict(list)
-            for phone in self.list:
-                for user_id in phone.user_set:
-                    d[user_id].append(phone)
-            self._by_user_id = d
-        return self._by_user_id
+        return self.by_attribute('user_id')
 
     @property
     def by_dn_and_partition(self) -> PhoneAndDevicePoolDict:
@@ -385,13 +578,7 @@ class CommonPhoneAndDeviceProfileContainer(CsvBase):
         Get sets of phones indexed by dn:partition provisioned on these phones
         :return: dict of sets of phones indexed by dn:partition provisioned on these phones
         """
-        if self._by_dn_and_partition is None:
-            r = defaultdict(set)
-            for phone in self.list:
-                for line in phone.lines.values():
-                    r[line.dn_and_partition].add(phone)
-            self._by_dn_and_partition = dict(r)
-        return self._by_dn_and_partition
+        return self.by_attribute('dn_and_partition')
 
     @property
     def by_call_pickup_group(self) -> PhoneAndDevicePoolDict:
@@ -399,17 +586,7 @@ class CommonPhoneAndDeviceProfileContainer(CsvBase):
         Get sets of phones indexed by call pickup groups provisioned on lines of these phones
         :return: dict of sets of phones indexed by call pickup group name
         """
-        if self._by_call_pickup_group is None:
-            result = defaultdict(set)
-            for phone in self.list:
-                # DPGs on all lines; we skip lines w/ empty DPG
-                cpgs = set(cpg
-                           for line in phone.lines.values()
-                           if (cpg := line.call_pickup_group))
-                for cpg in cpgs:
-                    result[cpg].add(phone)
-            self._by_call_pickup_group = dict(result)
-        return self._by_call_pickup_group
+        return self.by_attribute('call_pickup_group')
 
 
 PhoneDict = Dict[str, List[Phone]]
@@ -417,8 +594,12 @@ PhoneDict = Dict[str, List[Phone]]
 
 class PhoneContainer(CommonPhoneAndDeviceProfileContainer):
     factory = Phone
+    key_columns = ('DEVICE NAME',)
+    indexes = CommonPhoneAndDeviceProfileContainer.indexes + (UniqueIndex('key', key='device_name'),
+                                                              Index('device_name'), Index('device_pool'),
+                                                              Index('owner'))
 
-    def __init__(self, tar: str):
+    def __init__(self, tar: TarSource):
         super(PhoneContainer, self).__init__(tar)
 
     @property
@@ -426,7 +607,7 @@ class PhoneContainer(CommonPhoneAndDeviceProfileContainer):
         return self.by_attribute('device_name')
 
     def __getitem__(self, item) -> Phone:
-        return self.by_device_name[item][0]
+        return self.by_key[item]
 
     @property
     def list(self) -> List[Phone]:
@@ -466,14 +647,3 @@ class PhoneContainer(CommonPhoneAndDeviceProfileContainer):
     @property
     def by_call_pickup_group(self) -> PhoneDict:
         return super().by_call_pickup_group
-
-    def related_lines(self) -> DNAandPartitionRelated:
-        """
-        Determine which DN:partitions are related b/c they exist on the same device
-        :return: dictionary, key is DN:partition, values are set of DN:partition.
-        Only contains DN:partition keys where there are actually related DN:partition values
-        """
-        return {dnp: others for dnp, phone_set in self.by_dn_and_partition.items()
-                if (others := set(itertools.chain.from_iterable((line.dn_and_partition
-                                                                 for line in p.lines.values()
-                                                                 ) for p in phone_set)) - {dnp})}
@@ -1,4 +1,6 @@
 from .base import *
+from .index import UniqueIndex
+from .coltypes import ColumnTypes, Int
 
 from re import compile
 
@@ -34,6 +36,8 @@ BUTTON_ATTRIBUTES = compile(r'(.+) (\d+)')
 
 
 class PhoneButtonTemplate(ObjBase):
+    column_types = ColumnTypes(Int('NUMBER OF BUTTONS'))
+
     def __init__(self, o: Dict):
         super(PhoneButtonTemplate, self).__init__(o)
         self._buttons = None
@@ -44,7 +48,7 @@ class PhoneButtonTemplate(ObjBase):
 
     @property
     def number_of_buttons(self) -> int:
-        return int(self.dict['NUMBER OF BUTTONS'])
+        return self.value('NUMBER OF BUTTONS')
 
     @property
     def model_type(self) -> str:
@@ -80,10 +84,12 @@ class PhoneButtonTemplate(ObjBase):
 
 class PhoneButtonTemplateContainer(CsvBase):
     factory = PhoneButtonTemplate
+    key_columns = ('NAME',)
+    indexes = (UniqueIndex('key', key='name'),)
 
     @property
     def list(self) -> List[PhoneButtonTemplate]:
         return super(PhoneButtonTemplateContainer, self).list
 
     def __getitem__(self, item) -> PhoneButtonTemplate:
-        return self.by_name[item][0]
+        return self.by_key[item]
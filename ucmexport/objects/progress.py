@@ -0,0 +1,112 @@
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, TypeVar
+
+__all__ = ['LoadMetrics', 'ProgressReporter', 'SilentProgress', 'MetricsCollector', 'TqdmProgress']
+
+log = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+@dataclass
+class LoadMetrics:
+    """
+    Metrics for reading the objects of a container: where the rows came from, how long parsing took and how long it
+    took to create the objects from the parsed rows
+    """
+    container: str
+    csv_file: str
+    # 'csv': parsed from the TAR file, 'snapshot': loaded from a snapshot, 'worker': parsed by a worker process
+    source: str = 'csv'
+    rows: int = 0
+    # size of the CSV file in the TAR file
+    bytes: int = 0
+    parse_seconds: float = 0.0
+    construct_seconds: float = 0.0
+
+    @property
+    def seconds(self) -> float:
+        return self.parse_seconds + self.construct_seconds
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.parse_seconds if self.parse_seconds else 0.0
+
+    def __str__(self):
+        return (f'{self.container}: {self.rows} rows from {self.source} {self.csv_file}, '
+                f'parse {self.parse_seconds * 1000:.1f}ms ({self.bytes_per_second / 1e6:.1f} MB/s), '
+                f'construct {self.construct_seconds * 1000:.1f}ms, {self.rows_per_second:.0f} rows/s')
+
+
+class ProgressReporter:
+    """
+    Hooks called while reading CSV files. The base class does not report anything
+    """
+
+    def track(self, csv_file: str, rows: Iterable[T], total_bytes: Optional[int] = None) -> Iterable[T]:
+        """
+        Wrap the iterator of rows read from a CSV file
+        :param csv_file: name of the CSV file
+        :param rows: rows read
+        :param total_bytes: size of the CSV file if known
+        :return: iterator of the same rows
+        """
+        return rows
+
+    def report(self, metrics: LoadMetrics) -> None:
+        """
+        Called after the objects of a container have been created
+        :param metrics: metrics of the container
+        """
+        pass
+
+
+class SilentProgress(ProgressReporter):
+    """
+    Don't report any progress
+    """
+    pass
+
+
+class MetricsCollector(ProgressReporter):
+    """
+    Collect the metrics of all containers read
+    """
+
+    def __init__(self):
+        self.metrics: Dict[str, LoadMetrics] = dict()
+
+    def report(self, metrics: LoadMetrics) -> None:
+        self.metrics[metrics.container] = metrics
+
+    def summary(self) -> str:
+        """
+        Metrics of all containers read; slowest first
+        """
+        return '\n'.join(map(str, sorted(self.metrics.values(), key=lambda m: m.seconds, reverse=True)))
+
+
+class TqdmProgress(ProgressReporter):
+    """
+    Show a progress bar per CSV file parsed and a summary line per container read
+    """
+
+    def __init__(self, **tqdm_args):
+        """
+        :param tqdm_args: additional arguments for tqdm; for example file=sys.stdout
+        """
+        from tqdm import tqdm
+        self._tqdm = tqdm
+        self._args = dict(unit=' rows', leave=False, mininterval=0.5)
+        self._args.update(tqdm_args)
+
+    def track(self, csv_file: str, rows: Iterable[T], total_bytes: Optional[int] = None) -> Iterable[T]:
+        return self._tqdm(rows, desc=csv_file, **self._args)
+
+    def report(self, metrics: LoadMetrics) -> None:
+        self._tqdm.write(str(metrics), file=self._args.get('file'))
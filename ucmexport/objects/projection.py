@@ -0,0 +1,131 @@
+import hashlib
+import re
+from operator import itemgetter
+from typing import Iterable, List, Iterator, Sequence, Optional, Tuple
+
+__all__ = ['Projection', 'project_rows']
+
+
+def group_pattern(group: str) -> str:
+    """
+    Regular expression for a group of repeated columns.
+    A group "ROUTE PARTITION" matches "ROUTE PARTITION" and "ROUTE PARTITION <n>". A "#" in the group name matches
+    any number: "URI # ON DIRECTORY NUMBER" matches "URI 1 ON DIRECTORY NUMBER 3". A trailing " n" is ignored:
+    "DIRECTORY NUMBER n" is the same as "DIRECTORY NUMBER".
+    :param group: group name
+    :return: regular expression
+    """
+    if group.endswith(' n') or group.endswith(' N'):
+        group = group[:-2]
+    pattern = r'\d+'.join(re.escape(part) for part in group.split('#'))
+    return pattern + r'(?: \d+)?'
+
+
+class Projection:
+    """
+    Selection of columns to keep when reading a CSV file.
+    Columns can be selected by name, by group of repeated columns (like "DIRECTORY NUMBER n") or by regular expression.
+    If no columns are selected explicitly then all columns are selected. Excluded groups are removed from the
+    selection. All comparisons are case-insensitive.
+    """
+
+    def __init__(self, columns: Iterable[str] = (), groups: Iterable[str] = (), patterns: Iterable[str] = (),
+                 exclude: Iterable[str] = ()):
+        """
+        :param columns: column names
+        :param groups: groups of repeated columns; for example "DIRECTORY NUMBER n"
+        :param patterns: regular expressions; a column is selected if the expression matches the complete column name
+        :param exclude: groups of columns to exclude; same syntax as groups. Can be used with the lists of excluded
+            fields in transform_tar.py
+        """
+        self.columns = tuple(columns)
+        self.groups = tuple(groups)
+        self.patterns = tuple(patterns)
+        self.exclude = tuple(exclude)
+        self._include_all = not (self.columns or self.groups or self.patterns)
+        self._column_set = frozenset(c.upper() for c in self.columns)
+        self._include_re = self._compile([group_pattern(g) for g in self.groups] + list(self.patterns))
+        self._exclude_re = self._compile([group_pattern(g) for g in self.exclude])
+
+    @staticmethod
+    def _compile(expressions: List[str]) -> Optional['re.Pattern']:
+        if not expressions:
+            return None
+        return re.compile('|'.join(f'(?:{e})' for e in expressions), re.IGNORECASE)
+
+    def __repr__(self):
+        return (f'Projection(columns={self.columns}, groups={self.groups}, patterns={self.patterns}, '
+                f'exclude={self.exclude})')
+
+    @property
+    def signature(self) -> str:
+        """
+        Short identifier of the projection; for example used to distinguish snapshots with different projections
+        """
+        return hashlib.sha1(repr((sorted(self._column_set), sorted(self.groups), sorted(self.patterns),
+                                  sorted(self.exclude))).encode()).hexdigest()[:12]
+
+    def with_columns(self, columns: Iterable[str]) -> 'Projection':
+        """
+        Projection also selecting the given columns. Excluded columns are still excluded
+        :param columns: additional columns
+        :return: new projection
+        """
+        columns = tuple(columns)
+        if self._include_all or not columns:
+            return self
+        return Projection(columns=self.columns + columns, groups=self.groups, patterns=self.patterns,
+                          exclude=self.exclude)
+
+    def selects(self, column: str) -> bool:
+        """
+        Check whether a column is selected by the projection
+        :param column: column name
+        :return: True if the column is selected
+        """
+        if self._exclude_re is not None and self._exclude_re.fullmatch(column):
+            return False
+        if self._include_all or column.upper() in self._column_set:
+            return True
+        return self._include_re is not None and self._include_re.fullmatch(column) is not None
+
+    def select(self, header: Sequence[str]) -> List[int]:
+        """
+        Indices of the columns selected from a CSV header
+        :param header: CSV header
+        :return: list of indices of the selected columns
+        """
+        return [i for i, column in enumerate(header) if self.selects(column)]
+
+
+def project_rows(header: List[str], rows: Iterator[Sequence[str]],
+                 projection: Optional[Projection]) -> Tuple[List[str], Iterator[Sequence[str]]]:
+    """
+    Apply a projection to rows read from a CSV file
+    :param header: CSV header
+    :param rows: iterator of rows
+    :param projection: projection to apply; if None then the rows are not changed
+    :return: projected header and iterator of projected rows
+    """
+    if projection is None:
+        return header, rows
+    selected = projection.select(header)
+    if len(selected) == len(header):
+        return header, rows
+    projected_header = [header[i] for i in selected]
+    if not selected:
+        return projected_header, (() for _ in rows)
+    getter = itemgetter(*selected)
+    last = selected[-1]
+
+    def projected():
+        for row in rows:
+            if len(row) <= last:
+                # short row: same as csv.DictReader missing values are None
+                row = list(row) + [None] * (last + 1 - len(row))
+            values = getter(row)
+            if len(selected) == 1:
+                values = (values,)
+            yield values
+
+    return projected_header, projected()
@@ -0,0 +1,335 @@
+import logging
+import operator
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Tuple, Iterator, Iterable, Sequence
+
+from .index import attribute_getter
+from .row import to_snail
+
+__all__ = ['Query', 'QueryPlan', 'QueryStep', 'OPERATORS']
+
+log = logging.getLogger(__name__)
+
+# operators of conditions; the operator is appended to the attribute path: where(device_type__in=[...])
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    'eq': operator.eq,
+    'ne': operator.ne,
+    'in': lambda value, values: value in values,
+    'not_in': lambda value, values: value not in values,
+    'contains': lambda value, item: value is not None and item in value,
+    'startswith': lambda value, prefix: isinstance(value, str) and value.startswith(prefix),
+    'gt': lambda value, other: value is not None and value > other,
+    'ge': lambda value, other: value is not None and value >= other,
+    'lt': lambda value, other: value is not None and value < other,
+    'le': lambda value, other: value is not None and value <= other,
+}
+
+# operators which can be answered by index lookups and by column filters
+LOOKUP_OPERATORS = ('eq', 'in')
+
+
+@dataclass
+class Condition:
+    """
+    Condition of a query: attribute path, operator and value
+    """
+    path: Tuple[str, ...]
+    operator: str
+    value: Any
+
+    @staticmethod
+    def parse(name: str, value: Any) -> 'Condition':
+        """
+        Parse a keyword condition; for example lines__partition__in=[...]
+        """
+        path = name.split('__')
+        op = 'eq'
+        if len(path) > 1 and path[-1] in OPERATORS:
+            op = path.pop()
+        if op in ('in', 'not_in'):
+            value = set(value) if not isinstance(value, (set, frozenset)) else value
+        return Condition(path=tuple(path), operator=op, value=value)
+
+    def __str__(self):
+        op = '' if self.operator == 'eq' else f'__{self.operator}'
+        return f'{"__".join(self.path)}{op}={self.value!r}'
+
+    def lookup_keys(self) -> Iterable:
+        """
+        Index keys for an index lookup
+        """
+        return self.value if self.operator == 'in' else (self.value,)
+
+
+def path_values(o: Any, path: Sequence[str], first: Optional[Callable[[Any], Any]] = None) -> Iterator[Any]:
+    """
+    Values of an attribute path of an object. Collections on the path (for example the lines of a phone) are expanded:
+    the path yields a value for each element
+    :param o: object
+    :param path: attribute names
+    :param first: optional getter for the first attribute
+    :return: iterator of values; missing attributes yield None
+    """
+    try:
+        value = first(o) if first is not None else getattr(o, path[0])
+    except AttributeError:
+        value = None
+    if len(path) == 1:
+        yield value
+        return
+    if isinstance(value, Mapping):
+        values = value.values()
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        values = value
+    elif value is None:
+        return
+    else:
+        values = (value,)
+    for v in values:
+        yield from path_values(v, path[1:])
+
+
+@dataclass
+class QueryStep:
+    """
+    Step of a query plan
+    """
+    # 'index', 'stream', 'scan' or 'filter'
+    kind: str
+    description: str
+    # number of candidates after the step; None if not known before execution
+    candidates: Optional[int] = None
+
+    def __str__(self):
+        candidates = '' if self.candidates is None else f' -> {self.candidates} candidates'
+        return f'{self.kind}: {self.description}{candidates}'
+
+
+@dataclass
+class QueryPlan:
+    """
+    Plan of a query; see Query.explain()
+    """
+    container: str
+    steps: List[QueryStep] = field(default_factory=list)
+    # objects from index lookups; None if all objects need to be scanned
+    candidates: Optional[List[Any]] = None
+    # filters pushed into reading the CSV file: column -> value or collection of values
+    columns: Dict[str, Any] = field(default_factory=dict)
+    residual: List[Callable[[Any], bool]] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def __str__(self):
+        return '\n'.join([f'query {self.container} (planned in {self.seconds * 1000:.2f}ms)',
+                          *(f'  {step}' for step in self.steps)])
+
+
+class Query:
+    """
+    Query over the objects of a container; for example:
+        proxy.query(Phone).where(device_type__in={'Cisco 8845', 'Cisco 8865'}, lines__partition='PT_INTERNAL')
+    Conditions are keyword arguments: attribute path with optional operator (see OPERATORS) and value. Collections on
+    the path are expanded; the condition holds if it holds for any element. Predicates on objects can be passed as
+    positional arguments.
+    Equality and "in" conditions are answered by indexes of the container if an index on the attribute is declared or
+    already built. If no index applies and the container has not been read, conditions on columns are pushed into
+    reading the CSV file and objects are streamed w/o being kept. Else all objects are scanned. Conditions on columns
+    not selected by the projection of the container are always checked while reading the CSV file.
+    """
+
+    def __init__(self, container: Any):
+        """
+        :param container: container to query
+        """
+        self.container = container
+        self._conditions: List[Condition] = []
+        self._predicates: List[Callable[[Any], bool]] = []
+        self._select: Tuple[str, ...] = ()
+
+    def where(self, *predicates: Callable[[Any], bool], **conditions) -> 'Query':
+        """
+        Add conditions; all conditions need to hold
+        :param predicates: predicates on objects
+        :param conditions: conditions on attribute paths
+        :return: the query
+        """
+        self._predicates.extend(predicates)
+        self._conditions.extend(Condition.parse(name, value) for name, value in conditions.items())
+        return self
+
+    def select(self, *attributes: str) -> 'Query':
+        """
+        Select attributes; iterating the query then yields tuples of attribute values instead of objects
+        :param attributes: attribute names
+        :return: the query
+        """
+        self._select = attributes
+        return self
+
+    def _index_for(self, condition: Condition) -> Optional[str]:
+        """
+        Name of an index which can answer a condition
+        """
+        if condition.operator not in LOOKUP_OPERATORS or len(condition.path) != 1:
+            return None
+        container = self.container
+        name = condition.path[0]
+        for index in container.indexes:
+            if index.name == name or index.key == name:
+                return index.name
+        return name if container.has_index(name) else None
+
+    def _pushdown(self, condition: Condition, header: List[str]) -> Optional[str]:
+        """
+        Column a condition can be pushed to when reading the CSV file
+        """
+        if condition.operator not in LOOKUP_OPERATORS or len(condition.path) != 1:
+            return None
+        name = condition.path[0]
+        values = condition.lookup_keys()
+        if not all(isinstance(v, (str, bool)) for v in values):
+            # typed values need to be compared after coercion
+            return None
+        return name if name in header or any(to_snail(column) == name for column in header) else None
+
+    def plan(self) -> QueryPlan:
+        """
+        Plan the query; index lookups are executed while planning
+        :return: plan
+        """
+        start = perf_counter()
+        container = self.container
+        plan = QueryPlan(container=container.__class__.__name__)
+        factory = container.factory
+        residual: List[Condition] = []
+        lookups: List[Tuple[str, Condition, List[Any]]] = []
+        conditions = self._conditions
+        if (projection := container.projection) is not None:
+            # objects don't have the values of columns not selected by the projection: conditions on these columns are
+            # always checked while reading the CSV file; see CsvBase.iter()
+            csv_header = container.csv_header()
+            selected = [column for column in csv_header if projection.selects(column)]
+            conditions = []
+            for condition in self._conditions:
+                if ((column := self._pushdown(condition, csv_header)) is not None
+                        and self._pushdown(condition, selected) is None):
+                    plan.columns[column] = condition.value
+                else:
+                    conditions.append(condition)
+        not_read = ', '.join(f'{column}={value!r}' for column, value in plan.columns.items())
+        for condition in conditions:
+            if (index_name := self._index_for(condition)) is None:
+                residual.append(condition)
+                continue
+            index = container.by_attribute(index_name)
+            # a unique index only holds the first object for a duplicate key
+            duplicates = getattr(index, 'duplicates', None) or dict()
+            objects = []
+            for k in condition.lookup_keys():
+                if (entries := index.get(k)) is None:
+                    continue
+                if isinstance(entries, (list, set, frozenset)):
+                    objects.extend(entries)
+                else:
+                    objects.extend(duplicates.get(k, (entries,)))
+            lookups.append((index_name, condition, objects))
+
+        if lookups:
+            # start with the most selective index and intersect with the other index results
+            lookups.sort(key=lambda lookup: len(lookup[2]))
+            candidates = None
+            for index_name, condition, objects in lookups:
+                if candidates is None:
+                    candidates = list({id(o): o for o in objects}.values())
+                else:
+                    ids = {id(o) for o in objects}
+                    candidates = [o for o in candidates if id(o) in ids]
+                plan.steps.append(QueryStep('index', f'by_{index_name}: {condition}', len(candidates)))
+            plan.candidates = candidates
+            if not_read:
+                plan.steps.append(QueryStep('filter', f'{container.csv_file()} where {not_read}'))
+        elif not container.loaded and (residual or plan.columns):
+            header = container.csv_header()
+            for condition in list(residual):
+                if (column := self._pushdown(condition, header)) is not None:
+                    plan.columns[column] = condition.value
+                    # properties are assumed to return the column of the same name; they are still checked on the
+                    # objects as they might transform the value
+                    if not isinstance(getattr(factory, column, None), property):
+                        residual.remove(condition)
+            pushed = ', '.join(f'{column}={value!r}' for column, value in plan.columns.items())
+            plan.steps.append(QueryStep('stream', f'{container.csv_file()}{f" where {pushed}" if pushed else ""}'))
+        else:
+            description = f'{len(container.list)} objects'
+            if not_read:
+                description = f'{description}, {container.csv_file()} where {not_read}'
+            plan.steps.append(QueryStep('scan', description, len(container.list)))
+
+        # conditions on nested paths are more expensive and are checked last
+        residual.sort(key=lambda c: len(c.path))
+        for condition in residual:
+            getter = attribute_getter(factory, condition.path[0])
+            op = OPERATORS[condition.operator]
+            plan.residual.append(lambda o, c=condition, g=getter, op=op: any(op(v, c.value)
+                                                                             for v in path_values(o, c.path, g)))
+        plan.residual.extend(self._predicates)
+        if residual or self._predicates:
+            plan.steps.append(QueryStep('filter', ', '.join([*map(str, residual),
+                                                             *(getattr(p, '__name__', repr(p))
+                                                               for p in self._predicates)])))
+        plan.seconds = perf_counter() - start
+        return plan
+
+    def explain(self) -> str:
+        """
+        Describe how the query is executed
+        :return: plan as text
+        """
+        return str(self.plan())
+
+    def objects(self) -> Iterator[Any]:
+        """
+        Iterate over the objects matching the query; selected attributes are ignored
+        """
+        plan = self.plan()
+        log.debug(f'{plan}')
+        if plan.candidates is not None:
+            objects = plan.candidates
+            if plan.columns:
+                matching = {id(o) for o in self.container.iter(**plan.columns)}
+                objects = [o for o in objects if id(o) in matching]
+        elif plan.steps[0].kind == 'stream' or plan.columns:
+            objects = self.container.iter(**plan.columns)
+        else:
+            objects = self.container.list
+        residual = plan.residual
+        if not residual:
+            return iter(objects)
+        return (o for o in objects if all(predicate(o) for predicate in residual))
+
+    def __iter__(self) -> Iterator[Any]:
+        if not self._select:
+            return self.objects()
+        getters = [attribute_getter(self.container.factory, attribute) for attribute in self._select]
+        return (tuple(getter(o) for getter in getters) for o in self.objects())
+
+    def all(self) -> List[Any]:
+        """
+        All results of the query
+        """
+        return list(self)
+
+    def first(self) -> Optional[Any]:
+        """
+        First result of the query; None if no object matches
+        """
+        return next(iter(self), None)
+
+    def count(self) -> int:
+        """
+        Number of objects matching the query
+        """
+        return sum(1 for _ in self.objects())
+
@@ -1,11 +1,15 @@
 from .base import *
+from .cssgraph import CssReference, ROLE_DEVICE_CSS
 
-from typing import List
+from typing import List, Iterator, Optional, Iterable
 
 __all__ = ['Rdp', 'RdpContainer']
 
 
 class Rdp(ObjBase):
+    def __str__(self):
+        return self.name
+
     @property
     def name(self) -> str:
         return self.remote_destination_profile_name
@@ -35,3 +39,7 @@ class RdpContainer(CsvBase):
     @property
     def list(self) -> List[Rdp]:
         return super(RdpContainer, self).list
+
+    def css_references(self, objects: Optional[Iterable] = None) -> Iterator[CssReference]:
+        return (CssReference.of(rdp.css, rdp, ROLE_DEVICE_CSS)
+                for rdp in (self.list if objects is None else objects) if rdp.css)
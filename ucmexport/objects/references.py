@@ -0,0 +1,128 @@
+import logging
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Optional, Dict, List, Iterable, Iterator
+
+__all__ = ['DnReference', 'ReferenceIndex', 'ROLE_LINE', 'ROLE_BLF', 'ROLE_MEMBER', 'ROLE_PILOT', 'ROLE_DESTINATION',
+           'ROLE_NUMBER', 'ROLE_PRIMARY_EXTENSION']
+
+log = logging.getLogger(__name__)
+
+# roles of a reference to a DN:partition
+ROLE_LINE = 'line'                              # line of a phone or device profile; index is the line index
+ROLE_BLF = 'blf'                                # BLF of a phone or device profile; index is the BLF index
+ROLE_MEMBER = 'member'                          # member of a line group; index is the selection order
+ROLE_PILOT = 'pilot'                            # hunt pilot
+ROLE_DESTINATION = 'destination'                # line associated with a remote destination; index of the destination
+ROLE_NUMBER = 'number'                          # DN, call park, directed call park, or call pickup group number
+ROLE_PRIMARY_EXTENSION = 'primary extension'    # primary extension of an end user
+
+
+@dataclass(frozen=True)
+class DnReference:
+    """
+    Reference to a DN:partition from an object
+    """
+    dn_and_partition: str
+    # class name of the referencing object; for example "Phone"
+    object_type: str
+    # key of the referencing object; for example the device name of a phone
+    key: str
+    role: str
+    index: Optional[int] = None
+    obj: Any = field(default=None, compare=False, repr=False)
+
+    @staticmethod
+    def of(dn_and_partition: str, obj: Any, role: str, index: Optional[int] = None) -> 'DnReference':
+        """
+        Create a reference from an object; the key of the object is its string representation
+        """
+        return DnReference(dn_and_partition=dn_and_partition, object_type=obj.__class__.__name__, key=str(obj),
+                           role=role, index=index, obj=obj)
+
+    def __str__(self):
+        index = '' if self.index is None else f' {self.index}'
+        return f'{self.dn_and_partition} <- {self.object_type} {self.key} ({self.role}{index})'
+
+
+class ReferenceIndex:
+    """
+    Inverted index from DN:partition to all references to that DN:partition. Built in a single pass over the objects
+    of all containers; see CsvBase.dn_references()
+    """
+
+    def __init__(self, containers: Iterable[Any]):
+        """
+        :param containers: containers to collect references from
+        """
+        start = perf_counter()
+        self._index: Dict[str, List[DnReference]] = dict()
+        for container in containers:
+            self.add(container.dn_references())
+        index = self._index
+        log.debug(f'ReferenceIndex: {len(index)} DN:partitions, {sum(map(len, index.values()))} references, '
+                  f'{(perf_counter() - start) * 1000:.2f}ms')
+
+    def add(self, references: Iterable[DnReference]) -> None:
+        """
+        Add references to the index
+        :param references: references to add
+        """
+        index = self._index
+        get = index.get
+        for reference in references:
+            if (entries := get(reference.dn_and_partition)) is None:
+                index[reference.dn_and_partition] = [reference]
+            else:
+                entries.append(reference)
+
+    def discard(self, references: Iterable[DnReference]) -> None:
+        """
+        Remove references from the index; references are identified by value and by the identity of the referencing
+        object. DN:partitions w/o references are removed
+        :param references: references to remove
+        """
+        index = self._index
+        for reference in references:
+            if (entries := index.get(reference.dn_and_partition)) is None:
+                continue
+            entries = [r for r in entries if r.obj is not reference.obj or r != reference]
+            if entries:
+                index[reference.dn_and_partition] = entries
+            else:
+                del index[reference.dn_and_partition]
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, dn_and_partition: str) -> bool:
+        return dn_and_partition in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __getitem__(self, dn_and_partition: str) -> List[DnReference]:
+        return self._index.get(dn_and_partition, [])
+
+    def get(self, dn_and_partition: str, object_type: Optional[str] = None,
+            role: Optional[str] = None) -> List[DnReference]:
+        """
+        References to a DN:partition
+        :param dn_and_partition: DN:partition
+        :param object_type: only references from objects of this type; for example "Phone"
+        :param role: only references with this role; for example ROLE_LINE
+        :return: list of references
+        """
+        references = self._index.get(dn_and_partition, [])
+        if object_type is not None:
+            references = [r for r in references if r.object_type == object_type]
+        if role is not None:
+            references = [r for r in references if r.role == role]
+        return references
+
+    def objects(self, dn_and_partition: str, object_type: Optional[str] = None, role: Optional[str] = None) -> List:
+        """
+        Distinct objects referencing a DN:partition; see get()
+        """
+        return list({id(r.obj): r.obj for r in self.get(dn_and_partition, object_type=object_type,
+                                                        role=role)}.values())
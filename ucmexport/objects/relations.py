@@ -0,0 +1,166 @@
+import logging
+from array import array
+from time import perf_counter
+from typing import Any, Dict, List, Sequence, Set
+
+from .ids import IdSpace, IdRelation, ID_TYPECODE, ID_DN_AND_PARTITION, ID_PARTITION, ID_USER
+
+__all__ = ['DeviceRelations', 'ID_DEVICE', 'ID_CALL_PICKUP_GROUP']
+
+log = logging.getLogger(__name__)
+
+# entity types of the device relations in addition to the entity types of the ID registry
+ID_DEVICE = 'device'                            # position of a phone or device profile in its container
+ID_CALL_PICKUP_GROUP = 'call_pickup_group'      # call pickup group on a line
+
+
+class DeviceRelations:
+    """
+    Relations of the phones or device profiles of a container built in a single pass over the devices: DN:partitions on
+    the lines, non-empty call pickup groups on the lines, and user ids referenced on the device. Devices are identified
+    by their position in the container, DN:partitions, partitions, call pickup groups and user ids by dense IDs in the
+    order they were first seen.
+    The indexes by_dn_and_partition, by_call_pickup_group and by_user_id of the container and related_lines() are
+    derived from these relations w/o touching the devices again
+    """
+    __slots__ = ['objects', 'dn_and_partitions', 'partitions', 'call_pickup_groups', 'users', 'lines', 'partition_of',
+                 'call_pickup', 'user_ids', 'seconds', '_inverse']
+
+    def __init__(self, objects: Sequence):
+        """
+        :param objects: phones or device profiles of a container
+        """
+        start = perf_counter()
+        self.objects = objects
+        partitions: Dict[str, int] = dict()
+        # key -> ID and the devices of each ID for DN:partitions, call pickup groups and users
+        dnp_ids: Dict[str, int] = dict()
+        dnp_devices: List[List[int]] = []
+        cpg_ids: Dict[str, int] = dict()
+        cpg_devices: List[List[int]] = []
+        user_ids: Dict[str, int] = dict()
+        user_devices: List[List[int]] = []
+        # partition ID for each DN:partition ID
+        partition_of = array(ID_TYPECODE)
+        line_offsets = array(ID_TYPECODE, [0])
+        line_targets = array(ID_TYPECODE)
+        cpg_offsets = array(ID_TYPECODE, [0])
+        cpg_targets = array(ID_TYPECODE)
+        user_offsets = array(ID_TYPECODE, [0])
+        user_targets = array(ID_TYPECODE)
+        # devices are visited in ascending order: a device already is related to a target if it is the last device of
+        # the target
+        for position, o in enumerate(objects):
+            for line in o.lines.values():
+                dnp = line.dn_and_partition
+                if (i := dnp_ids.get(dnp)) is None:
+                    i = dnp_ids[dnp] = len(dnp_devices)
+                    dnp_devices.append([position])
+                    partition = line.partition
+                    if (partition_id := partitions.get(partition)) is None:
+                        partition_id = partitions[partition] = len(partitions)
+                    partition_of.append(partition_id)
+                    line_targets.append(i)
+                elif (devices := dnp_devices[i])[-1] != position:
+                    devices.append(position)
+                    line_targets.append(i)
+                if cpg := line.call_pickup_group:
+                    if (i := cpg_ids.get(cpg)) is None:
+                        i = cpg_ids[cpg] = len(cpg_devices)
+                        cpg_devices.append([position])
+                        cpg_targets.append(i)
+                    elif (devices := cpg_devices[i])[-1] != position:
+                        devices.append(position)
+                        cpg_targets.append(i)
+            line_offsets.append(len(line_targets))
+            cpg_offsets.append(len(cpg_targets))
+            for user in o.user_set:
+                if (i := user_ids.get(user)) is None:
+                    i = user_ids[user] = len(user_devices)
+                    user_devices.append([position])
+                    user_targets.append(i)
+                elif (devices := user_devices[i])[-1] != position:
+                    devices.append(position)
+                    user_targets.append(i)
+            user_offsets.append(len(user_targets))
+        self.dn_and_partitions = IdSpace.from_ids(ID_DN_AND_PARTITION, dnp_ids)
+        self.partitions = IdSpace.from_ids(ID_PARTITION, partitions)
+        self.call_pickup_groups = IdSpace.from_ids(ID_CALL_PICKUP_GROUP, cpg_ids)
+        self.users = IdSpace.from_ids(ID_USER, user_ids)
+        self.partition_of = partition_of
+        self.lines = IdRelation(ID_DEVICE, ID_DN_AND_PARTITION, line_offsets, line_targets)
+        self.call_pickup = IdRelation(ID_DEVICE, ID_CALL_PICKUP_GROUP, cpg_offsets, cpg_targets)
+        self.user_ids = IdRelation(ID_DEVICE, ID_USER, user_offsets, user_targets)
+        # the inverse relations are collected in the same pass
+        self._inverse: Dict[str, IdRelation] = {
+            ID_DN_AND_PARTITION: IdRelation.from_rows(ID_DN_AND_PARTITION, ID_DEVICE, dnp_devices),
+            ID_CALL_PICKUP_GROUP: IdRelation.from_rows(ID_CALL_PICKUP_GROUP, ID_DEVICE, cpg_devices),
+            ID_USER: IdRelation.from_rows(ID_USER, ID_DEVICE, user_devices)}
+        self.seconds = perf_counter() - start
+        log.debug(f'DeviceRelations: {self} in {self.seconds * 1000:.2f}ms')
+
+    def __repr__(self):
+        return (f'DeviceRelations({len(self.objects)} devices, {len(self.dn_and_partitions)} DN:partitions, '
+                f'{len(self.call_pickup_groups)} call pickup groups, {len(self.users)} users)')
+
+    def relation(self, target: str) -> IdRelation:
+        """
+        Relation device -> target
+        :param target: ID_DN_AND_PARTITION, ID_CALL_PICKUP_GROUP, or ID_USER
+        :return: relation
+        """
+        if target == ID_DN_AND_PARTITION:
+            return self.lines
+        if target == ID_CALL_PICKUP_GROUP:
+            return self.call_pickup
+        if target == ID_USER:
+            return self.user_ids
+        raise KeyError(f'no relation {ID_DEVICE} -> {target}')
+
+    def space(self, target: str) -> IdSpace:
+        """
+        ID space of a target entity type; see relation()
+        """
+        return {ID_DN_AND_PARTITION: self.dn_and_partitions, ID_CALL_PICKUP_GROUP: self.call_pickup_groups,
+                ID_USER: self.users}[target]
+
+    def inverse(self, target: str) -> IdRelation:
+        """
+        Relation target -> devices
+        :param target: ID_DN_AND_PARTITION, ID_CALL_PICKUP_GROUP, or ID_USER
+        :return: relation; the devices of each target are in ascending order
+        """
+        if (inverse := self._inverse.get(target)) is None:
+            raise KeyError(f'no relation {target} -> {ID_DEVICE}')
+        return inverse
+
+    def index(self, target: str, collection: type = list) -> Dict[str, Any]:
+        """
+        Devices grouped by target; same result as scanning the devices with the respective index of the container
+        :param target: ID_DN_AND_PARTITION, ID_CALL_PICKUP_GROUP, or ID_USER
+        :param collection: list or set; collection type for the devices with the same key
+        :return: index: key -> devices in the order of the container
+        """
+        get = self.objects.__getitem__
+        inverse = self.inverse(target)
+        offsets = inverse.offsets
+        devices = inverse.targets
+        return {key: collection(map(get, devices[offsets[i]:offsets[i + 1]]))
+                for i, key in enumerate(self.space(target))}
+
+    def related_lines(self) -> Dict[str, Set[str]]:
+        """
+        Determine which DN:partitions are related b/c they exist on the same device
+        :return: dictionary, key is DN:partition, values are set of DN:partition.
+            Only contains DN:partition keys where there are actually related DN:partition values
+        """
+        targets_of = self.lines.targets_of
+        keys = self.dn_and_partitions.keys
+        inverse = self.inverse(ID_DN_AND_PARTITION)
+        result = dict()
+        for i, dnp in enumerate(self.dn_and_partitions):
+            others = targets_of(inverse[i])
+            others.discard(i)
+            if others:
+                result[dnp] = set(keys(others))
+        return result
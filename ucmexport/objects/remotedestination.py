@@ -1,9 +1,10 @@
 from .base import *
+from .references import DnReference, ROLE_DESTINATION
 
 from re import compile
 from collections import defaultdict
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Iterator, Optional, Iterable
 
 __all__ = ['RemoteDestination', 'RemoteDestinationContainer', 'Destination', 'Schedule']
 
@@ -152,7 +153,7 @@ class RemoteDestination(ObjBase):
 class RemoteDestinationContainer(CsvBase):
     factory = RemoteDestination
 
-    def __init__(self, tar: str):
+    def __init__(self, tar: TarSource):
         super(RemoteDestinationContainer, self).__init__(tar)
         self._by_line_number_and_partition = None
 
@@ -160,6 +161,17 @@ class RemoteDestinationContainer(CsvBase):
     def list(self) -> List[RemoteDestination]:
         return super(RemoteDestinationContainer, self).list
 
+    def invalidate(self) -> None:
+        self._by_line_number_and_partition = None
+
+    def dn_references(self, objects: Optional[Iterable] = None) -> Iterator[DnReference]:
+        for remote_destination in (self.list if objects is None else objects):
+            for index, destination in enumerate(remote_destination.destinations, 1):
+                if not destination.associated_line_number:
+                    continue
+                yield DnReference.of(destination.line_number_and_partition, remote_destination, ROLE_DESTINATION,
+                                     index)
+
     @property
     def by_line_number_and_partition(self) -> Dict[str, List[Tuple[RemoteDestination, Destination]]]:
         if self._by_line_number_and_partition is None:
@@ -1,4 +1,5 @@
 from .base import *
+from .index import UniqueIndex
 
 __all__ = ['RoutePattern', 'RoutePatternContainer']
 
@@ -24,18 +25,23 @@ class RoutePattern(ObjBase):
 
 class RoutePatternContainer(CsvBase):
     factory = RoutePattern
+    key_columns = ('ROUTE PATTERN', 'ROUTE PARTITION')
+    indexes = (UniqueIndex('key', key='pattern_and_partition'),)
 
-    def __init__(self, tar: str):
+    def __init__(self, tar: TarSource):
         super(RoutePatternContainer, self).__init__(tar)
         self._list = None
 
     @property
     def list(self) -> List[RoutePattern]:
         if self._list is None:
-            r = super(RoutePatternContainer, self).list
-            r.sort(key=lambda v: v.pattern_and_partition)
-            self._list = r
+            # sort a copy: the objects of the container stay in the order of the CSV file
+            self._list = sorted(super(RoutePatternContainer, self).list, key=lambda v: v.pattern_and_partition)
         return self._list
 
     def __getitem__(self, item) -> RoutePattern:
-        return self.by_pattern_and_partition[item]
+        return self.by_key[item]
+
+    def invalidate(self) -> None:
+        # objects added by a delta need to be sorted in
+        self._list = None
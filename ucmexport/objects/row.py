@@ -0,0 +1,481 @@
+from array import array
+from bisect import bisect_left
+from collections.abc import MutableMapping, ItemsView, ValuesView
+from functools import lru_cache
+from itertools import compress
+from re import compile
+from typing import Dict, Tuple, Sequence, Iterator, Union, Optional, List
+
+from .coltypes import ColumnType, ColumnTypes, CoercionError
+from .table import row_dict
+
+__all__ = ['Row', 'RowGroup', 'RowSchema', 'RE_TO_SNAIL', 'to_snail']
+
+_MISSING = object()
+
+RE_TO_SNAIL = compile(r"[ ./\-()']")
+
+
+@lru_cache(maxsize=None)
+def to_snail(key: str) -> str:
+    """
+    Convert a header ro snail case. For example: "JIM DOE" -> "jim_doe"
+    :param key: string to convert
+    :return: snail case version
+    """
+    return RE_TO_SNAIL.sub('_', key).lower().strip('_')
+
+
+# ascending indices of the non-empty columns of a row: bytes for up to 256 columns, else a tuple
+Columns = Union[bytes, Tuple[int, ...]]
+
+
+class RowSchema:
+    """
+    Header shared by all rows read from a CSV file. Rows only store their non-empty values and the indices of the
+    non-empty columns; the column names are kept once in the schema. Identical sets of non-empty columns are shared
+    between rows.
+    Values of typed columns are coerced when a row is created and are kept in one array per column indexed by the row
+    id. Values which can't be coerced are recorded as errors and are kept as strings.
+    """
+    __slots__ = ['header', 'keep_empty', 'index', 'typed', 'errors', '_attributes', '_columns', '_typed', '_rows']
+
+    def __init__(self, header: Sequence[str], keep_empty: bool = True, types: Optional[ColumnTypes] = None):
+        """
+        :param header: CSV header
+        :param keep_empty: if True then empty cells are part of the rows (with value ''); else rows only have the
+            non-empty cells
+        :param types: declared column types
+        """
+        self.header: Tuple[str, ...] = tuple(header)
+        self.keep_empty = keep_empty
+        # column name -> column index
+        self.index: Dict[str, int] = {column: i for i, column in enumerate(self.header)}
+        # typed columns: column index -> (type, storage)
+        self.typed: Dict[int, Tuple[ColumnType, array]] = dict()
+        if types is not None:
+            self.typed = {i: (t, t.storage()) for i, t in types.resolve(self.header).items()}
+        self.errors: List[CoercionError] = []
+        self._attributes: Optional[Dict[str, int]] = None
+        # interned sets of non-empty columns
+        self._columns: Dict[Columns, Columns] = dict()
+        self._typed = [(i, t, storage) for i, (t, storage) in self.typed.items()]
+        self._rows = 0
+
+    def __repr__(self):
+        return f'RowSchema({len(self.header)} columns, {len(self._columns)} layouts)'
+
+    @property
+    def attributes(self) -> Dict[str, int]:
+        """
+        Mapping from attribute names (snail case versions of the column names) to column indices. If multiple columns
+        have the same snail case version then the first column is used.
+        """
+        if self._attributes is None:
+            attributes = dict()
+            for i, column in enumerate(self.header):
+                attributes.setdefault(to_snail(column), i)
+            self._attributes = attributes
+        return self._attributes
+
+    def row(self, values: Sequence[str]) -> Union['Row', Dict]:
+        """
+        Create a row from the values read from a CSV file
+        :param values: values in the order of the header
+        :return: row; a plain dictionary (same semantics as csv.DictReader) if the number of values does not match the
+            header
+        """
+        header = self.header
+        row_id = self._rows
+        self._rows += 1
+        if len(values) != len(header):
+            for _, t, storage in self._typed:
+                storage.append(t.empty)
+            d = row_dict(list(header), values)
+            if not self.keep_empty:
+                d = {k: v for k, v in d.items() if v}
+            return d
+        if self._typed:
+            values = list(values)
+            for i, t, storage in self._typed:
+                stored = t.empty
+                if value := values[i]:
+                    try:
+                        stored = t.encode(value)
+                    except ValueError as e:
+                        # keep the string value
+                        self.errors.append(CoercionError(row=row_id, column=header[i], value=value, reason=str(e)))
+                    else:
+                        values[i] = ''
+                storage.append(stored)
+        columns = compress(range(len(values)), values)
+        # bytes are much more compact than tuples of ints; both can be searched with bisect
+        columns = bytes(columns) if len(header) <= 256 else tuple(columns)
+        columns = self._columns.setdefault(columns, columns)
+        return Row(self, columns, tuple(filter(None, values)), row_id)
+
+    @property
+    def layouts(self) -> int:
+        """
+        Number of distinct sets of non-empty columns of the rows created so far
+        """
+        return len(self._columns)
+
+
+class RowItems(ItemsView):
+    __slots__ = ()
+
+    def __iter__(self):
+        return self._mapping.iter_items()
+
+
+class RowValues(ValuesView):
+    __slots__ = ()
+
+    def __iter__(self):
+        return (v for _, v in self._mapping.iter_items())
+
+
+class Row(MutableMapping):
+    """
+    Compact read-mostly mapping for a CSV row. Only the non-empty values are stored per row; the header is shared via
+    the schema. Values of typed columns are kept by the schema; the mapping presents them as strings. Modifying a row
+    converts it to a plain dictionary internally.
+    """
+    __slots__ = ['_schema', '_columns', '_values', '_id', '_dict']
+
+    def __init__(self, schema: RowSchema, columns: Columns, values: Tuple[str, ...], row_id: int):
+        """
+        :param schema: schema of the row
+        :param columns: ascending indices of the non-empty columns
+        :param values: non-empty values
+        :param row_id: index of the row in the typed storage of the schema
+        """
+        self._schema = schema
+        self._columns = columns
+        self._values = values
+        self._id = row_id
+        self._dict: Optional[Dict] = None
+
+    @property
+    def schema(self) -> RowSchema:
+        return self._schema
+
+    def _text(self, column: int) -> str:
+        """
+        Value of a column as string
+        :param column: column index
+        :return: value; '' if the cell is empty
+        """
+        if typed := self._schema.typed.get(column):
+            t, storage = typed
+            if (stored := storage[self._id]) != t.empty:
+                return t.text(stored)
+        columns = self._columns
+        position = bisect_left(columns, column)
+        if position < len(columns) and columns[position] == column:
+            return self._values[position]
+        return ''
+
+    def _typed_value(self, column: int):
+        """
+        Typed value of a column
+        :param column: column index
+        :return: value; '' if the cell is empty
+        """
+        typed = self._schema.typed.get(column)
+        if self._dict is not None:
+            # modified row: coerce the current value
+            value = self._dict.get(self._schema.header[column], '')
+            if typed is None or not value:
+                return value
+            t = typed[0]
+            try:
+                return t.decode(t.encode(value))
+            except ValueError:
+                return value
+        if typed is not None:
+            t, storage = typed
+            if (stored := storage[self._id]) != t.empty:
+                return t.decode(stored)
+        return self._text(column)
+
+    def attribute(self, name: str):
+        """
+        Get a typed value by attribute name (snail case version of the column name)
+        :param name: attribute name
+        :return: value; raises KeyError if there is no such column or if the cell is empty and empty cells are not
+            part of the row
+        """
+        schema = self._schema
+        column = schema.attributes[name]
+        if self._dict is not None and not schema.typed:
+            return self._dict[schema.header[column]]
+        value = self._typed_value(column)
+        if value == '' and not schema.keep_empty:
+            raise KeyError(name)
+        return value
+
+    def value(self, key: str):
+        """
+        Typed value of a column; values of typed columns are bool, int, or str (enums). Columns without declared type
+        are strings.
+        :param key: column name
+        :return: value; None for empty cells of typed columns. Values which could not be coerced are returned as strings
+        """
+        column = self._schema.index[key]
+        value = self._typed_value(column)
+        if value == '':
+            if column in self._schema.typed:
+                return None
+            if not self._schema.keep_empty:
+                raise KeyError(key)
+        return value
+
+    def typed_items(self) -> Iterator[Tuple[str, object]]:
+        """
+        Iterate over the items in header order; values of typed columns are typed, empty cells are ''
+        """
+        if not self._schema.typed or self._dict is not None:
+            if self._dict is None:
+                return self.iter_items()
+            return ((k, self.value(k) if v and k in self._schema.index else v) for k, v in self._dict.items())
+        values = self._full()
+        for column, (t, storage) in self._schema.typed.items():
+            if (stored := storage[self._id]) != t.empty:
+                values[column] = t.decode(stored)
+        items = zip(self._schema.header, values)
+        if self._schema.keep_empty:
+            return items
+        return ((k, v) for k, v in items if v != '')
+
+    def _full(self) -> List:
+        """
+        List of all untyped values in header order; '' for empty cells
+        """
+        values = [''] * len(self._schema.header)
+        for column, value in zip(self._columns, self._values):
+            values[column] = value
+        return values
+
+    def __getitem__(self, key):
+        if self._dict is not None:
+            return self._dict[key]
+        column = self._schema.index.get(key)
+        if column is None:
+            raise KeyError(key)
+        value = self._text(column)
+        if not value and not self._schema.keep_empty:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        if self._dict is not None:
+            return self._dict.get(key, default)
+        column = self._schema.index.get(key)
+        if column is None:
+            return default
+        value = self._text(column)
+        if not value and not self._schema.keep_empty:
+            return default
+        return value
+
+    def __contains__(self, key):
+        if self._dict is not None:
+            return key in self._dict
+        if self._schema.keep_empty:
+            return key in self._schema.index
+        column = self._schema.index.get(key)
+        return column is not None and self._text(column) != ''
+
+    def __iter__(self) -> Iterator[str]:
+        if self._dict is not None:
+            return iter(self._dict)
+        if self._schema.keep_empty:
+            return iter(self._schema.header)
+        if self._schema.typed:
+            return (k for k, _ in self.iter_items())
+        return map(self._schema.header.__getitem__, self._columns)
+
+    def __len__(self):
+        if self._dict is not None:
+            return len(self._dict)
+        if self._schema.keep_empty:
+            return len(self._schema.header)
+        if self._schema.typed:
+            return sum(1 for _ in self.iter_items())
+        return len(self._columns)
+
+    @property
+    def modified(self) -> bool:
+        """
+        True if the row has been modified; the row then does not follow the header of the schema anymore
+        """
+        return self._dict is not None
+
+    def texts(self) -> List[str]:
+        """
+        All values as strings in header order; '' for empty cells. Only valid for rows which have not been modified
+        """
+        values = self._full()
+        for column, (t, storage) in self._schema.typed.items():
+            if (stored := storage[self._id]) != t.empty:
+                values[column] = t.text(stored)
+        return values
+
+    def iter_items(self) -> Iterator[Tuple[str, str]]:
+        """
+        Iterate over the items in header order
+        """
+        if self._dict is not None:
+            return iter(self._dict.items())
+        schema = self._schema
+        header = schema.header
+        if not schema.typed:
+            if schema.keep_empty:
+                return zip(header, self._full())
+            return zip(map(header.__getitem__, self._columns), self._values)
+        items = zip(header, self.texts())
+        if schema.keep_empty:
+            return items
+        return ((k, v) for k, v in items if v)
+
+    def items(self):
+        return RowItems(self)
+
+    def values(self):
+        return RowValues(self)
+
+    def _materialize(self) -> Dict:
+        """
+        Convert to a plain dictionary; needed before any modification
+        """
+        if self._dict is None:
+            self._dict = dict(self.iter_items())
+            self._columns = None
+            self._values = None
+        return self._dict
+
+    def __setitem__(self, key, value):
+        self._materialize()[key] = value
+
+    def __delitem__(self, key):
+        del self._materialize()[key]
+
+    def pop(self, key, default=_MISSING):
+        if key not in self:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        return self._materialize().pop(key)
+
+    def copy(self) -> Dict:
+        return dict(self.iter_items())
+
+    def __repr__(self):
+        return f'Row({dict(self.iter_items())!r})'
+
+
+class RowGroup(MutableMapping):
+    """
+    View onto a group of columns of a row; for example the columns of a line of a phone with the line index removed
+    from the column names. Values are read from the row on access: nothing is copied. Modifying the group converts it
+    to a plain dictionary internally
+    """
+    __slots__ = ['_row', '_names', '_columns', '_dict']
+
+    def __init__(self, row: Row, names: Tuple[str, ...], columns: Sequence[int]):
+        """
+        :param row: row; needs to keep empty cells and must not be modified
+        :param names: names of the columns in the group
+        :param columns: indices of the columns of the group in the row; same order as names
+        """
+        self._row = row
+        self._names = names
+        self._columns = columns
+        self._dict: Optional[Dict] = None
+
+    def select(self, names: Tuple[str, ...], keys: Sequence[str]) -> Union['RowGroup', Dict]:
+        """
+        View onto a part of the group
+        :param names: names of the columns in the new group
+        :param keys: names of the columns in this group; same order as names
+        :return: group; a plain dictionary if this group has been modified
+        """
+        if self._dict is not None:
+            d = self._dict
+            return {name: d[k] for name, k in zip(names, keys)}
+        columns = self._columns
+        position = self._names.index
+        return RowGroup(self._row, names, tuple(columns[position(k)] for k in keys))
+
+    def __getitem__(self, key):
+        if self._dict is not None:
+            return self._dict[key]
+        try:
+            position = self._names.index(key)
+        except ValueError:
+            raise KeyError(key)
+        return self._row._text(self._columns[position])
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        if self._dict is not None:
+            return key in self._dict
+        return key in self._names
+
+    def __iter__(self) -> Iterator[str]:
+        if self._dict is not None:
+            return iter(self._dict)
+        return iter(self._names)
+
+    def __len__(self):
+        if self._dict is not None:
+            return len(self._dict)
+        return len(self._names)
+
+    def iter_items(self) -> Iterator[Tuple[str, str]]:
+        """
+        Iterate over the items in column order
+        """
+        if self._dict is not None:
+            return iter(self._dict.items())
+        return zip(self._names, map(self._row._text, self._columns))
+
+    def items(self):
+        return RowItems(self)
+
+    def values(self):
+        return RowValues(self)
+
+    def _materialize(self) -> Dict:
+        if self._dict is None:
+            self._dict = dict(self.iter_items())
+            self._row = None
+            self._columns = None
+        return self._dict
+
+    def __setitem__(self, key, value):
+        self._materialize()[key] = value
+
+    def __delitem__(self, key):
+        del self._materialize()[key]
+
+    def pop(self, key, default=_MISSING):
+        if key not in self:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        return self._materialize().pop(key)
+
+    def copy(self) -> Dict:
+        return dict(self.iter_items())
+
+    def __repr__(self):
+        return f'RowGroup({dict(self.iter_items())!r})'
+
@@ -0,0 +1,273 @@
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+__all__ = ['RowSet', 'RowUniverse']
+
+# positions of the bits set in each byte value
+BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+# type code of the arrays holding the row ids of sparse row sets
+ROW_TYPECODE = 'i'
+
+# a row set is kept as a sorted array of row ids instead of a bitmap if the array needs less memory than the bitmap:
+# each row id in the array takes this many bits while the bitmap takes one bit for each row id up to the highest row
+# id in the set
+SPARSE_BITS_PER_ROW = array(ROW_TYPECODE).itemsize * 8
+
+if hasattr(int, 'bit_count'):
+    popcount = int.bit_count
+else:
+    def popcount(bits: int) -> int:
+        return bin(bits).count('1')
+
+
+def bitmap(rows: Sequence[int]) -> int:
+    """
+    Bitmap for row ids
+    :param rows: row ids; duplicates are allowed
+    :return: bitmap; bit i is set if row id i is in rows
+    """
+    if len(rows) <= 8:
+        bits = 0
+        for row in rows:
+            bits |= 1 << row
+        return bits
+    # setting bits in a byte array avoids creating an intermediate integer for each row id
+    buffer = bytearray((max(rows) >> 3) + 1)
+    for row in rows:
+        buffer[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def bit_positions(bits: int) -> Iterator[int]:
+    """
+    Positions of the bits set in a bitmap in ascending order
+    """
+    if not bits:
+        return
+    data = bits.to_bytes((bits.bit_length() + 7) >> 3, 'little')
+    byte_bits = BYTE_BITS
+    for i, value in enumerate(data):
+        if value:
+            base = i << 3
+            for bit in byte_bits[value]:
+                yield base + bit
+
+
+class RowUniverse:
+    """
+    Dense row ids for the objects of a container: the position of each object in the container. Row sets over the
+    same universe can be combined as bitmaps
+    """
+    __slots__ = ['objects', '_positions']
+
+    def __init__(self, objects: Sequence):
+        """
+        :param objects: objects of the container; the universe is only valid as long as the objects don't change
+        """
+        self.objects = objects
+        self._positions: Dict[int, int] = {id(o): i for i, o in enumerate(objects)}
+
+    def __len__(self):
+        return len(self.objects)
+
+    def position(self, o: Any) -> int:
+        """
+        Row id of an object
+        :param o: object of the container
+        :return: row id; KeyError if the object is not in the universe
+        """
+        return self._positions[id(o)]
+
+    def bits(self, objects: Iterable) -> int:
+        """
+        Bitmap for a collection of objects
+        :param objects: objects of the container
+        :return: bitmap; bit i is set if the object with row id i is in the collection
+        """
+        positions = self._positions
+        return bitmap([positions[id(o)] for o in objects])
+
+    def row_set(self, objects: Iterable = ()) -> 'RowSet':
+        """
+        Row set for a collection of objects of the container
+        """
+        positions = self._positions
+        return RowSet.of_rows(self, [positions[id(o)] for o in objects])
+
+    def all(self) -> 'RowSet':
+        """
+        Row set with all objects of the container
+        """
+        return RowSet(self, (1 << len(self.objects)) - 1)
+
+
+class RowSet:
+    """
+    Set of objects of a container represented by the row ids of the objects. Dense sets are bitmaps: union,
+    intersection, difference and cardinality are operations on integers and don't need to hash the objects. Sparse sets
+    (few objects at high row ids) are sorted arrays of row ids: a bitmap would need memory proportional to the highest
+    row id. Iterating yields the objects in the order of the container
+    """
+    __slots__ = ['universe', '_bits', '_rows']
+
+    def __init__(self, universe: RowUniverse, bits: int = 0):
+        """
+        :param universe: row ids of the objects of the container
+        :param bits: bitmap; bit i is set if the object with row id i is in the set
+        """
+        self.universe = universe
+        self._bits: Optional[int] = bits
+        # sorted row ids of a sparse set; None for a bitmap
+        self._rows: Optional[array] = None
+
+    @classmethod
+    def of_rows(cls, universe: RowUniverse, rows: Sequence[int]) -> 'RowSet':
+        """
+        Row set for row ids; the representation needing less memory is chosen
+        :param universe: row ids of the objects of the container
+        :param rows: row ids; duplicates are allowed
+        :return: row set
+        """
+        if rows and len(rows) * SPARSE_BITS_PER_ROW <= max(rows):
+            row_set = cls(universe)
+            row_set._bits = None
+            row_set._rows = array(ROW_TYPECODE, sorted(set(rows)))
+            return row_set
+        return cls(universe, bitmap(rows))
+
+    def __repr__(self):
+        return f'RowSet({len(self)} of {len(self.universe)} objects{", sparse" if self.sparse else ""})'
+
+    @property
+    def sparse(self) -> bool:
+        """
+        True if the set is represented by an array of row ids instead of a bitmap
+        """
+        return self._rows is not None
+
+    @property
+    def bits(self) -> int:
+        """
+        Bitmap of the set; bit i is set if the object with row id i is in the set. Created on each access for sparse
+        sets
+        """
+        if (bits := self._bits) is None:
+            bits = bitmap(self._rows)
+        return bits
+
+    def __len__(self):
+        if (rows := self._rows) is not None:
+            return len(rows)
+        return popcount(self._bits)
+
+    def __bool__(self):
+        return self._rows is not None or self._bits != 0
+
+    def positions(self) -> Iterator[int]:
+        """
+        Row ids of the objects in the set in ascending order
+        """
+        if (rows := self._rows) is not None:
+            return iter(rows)
+        return bit_positions(self._bits)
+
+    def __iter__(self) -> Iterator[Any]:
+        objects = self.universe.objects
+        return (objects[row] for row in self.positions())
+
+    def _has_row(self, row: int) -> bool:
+        if (rows := self._rows) is not None:
+            i = bisect_left(rows, row)
+            return i < len(rows) and rows[i] == row
+        return bool(self._bits >> row & 1)
+
+    def __contains__(self, o: Any) -> bool:
+        if (row := self.universe._positions.get(id(o))) is None:
+            return False
+        return self._has_row(row)
+
+    def _other(self, other: 'RowSet') -> 'RowSet':
+        if not isinstance(other, RowSet):
+            raise TypeError(f'RowSet can only be combined with RowSet, not {other.__class__.__name__}')
+        if other.universe is not self.universe:
+            raise ValueError('RowSets of different containers can not be combined')
+        return other
+
+    def _filter(self, keep: bool, other: 'RowSet') -> 'RowSet':
+        """
+        Sparse set with the rows of this sparse set which are (keep=True) or are not (keep=False) in another set
+        """
+        has_row = other._has_row
+        return RowSet.of_rows(self.universe, [row for row in self._rows if has_row(row) is keep])
+
+    def __or__(self, other: 'RowSet') -> 'RowSet':
+        return self.union(other)
+
+    def __and__(self, other: 'RowSet') -> 'RowSet':
+        return self.intersection(other)
+
+    def __sub__(self, other: 'RowSet') -> 'RowSet':
+        other = self._other(other)
+        if self._rows is not None:
+            return self._filter(False, other)
+        return RowSet(self.universe, self._bits & ~other.bits)
+
+    def __xor__(self, other: 'RowSet') -> 'RowSet':
+        return RowSet(self.universe, self.bits ^ self._other(other).bits)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, RowSet):
+            return NotImplemented
+        if self.universe is not other.universe:
+            return False
+        if self._rows is not None and other._rows is not None:
+            return self._rows == other._rows
+        return self.bits == other.bits
+
+    def __hash__(self):
+        return hash((id(self.universe), self.bits))
+
+    def __le__(self, other: 'RowSet') -> bool:
+        other = self._other(other)
+        if self._rows is not None:
+            return all(map(other._has_row, self._rows))
+        return self._bits & ~other.bits == 0
+
+    def __ge__(self, other: 'RowSet') -> bool:
+        return self._other(other) <= self
+
+    def union(self, *others: 'RowSet') -> 'RowSet':
+        # bitmaps are combined directly; row ids of sparse sets are collected so that no bitmap is created per set
+        bits = 0
+        rows: List[int] = []
+        for row_set in (self, *map(self._other, others)):
+            if row_set._rows is not None:
+                rows.extend(row_set._rows)
+            else:
+                bits |= row_set._bits
+        if not rows:
+            return RowSet(self.universe, bits)
+        if not bits:
+            return RowSet.of_rows(self.universe, rows)
+        return RowSet(self.universe, bits | bitmap(rows))
+
+    def intersection(self, *others: 'RowSet') -> 'RowSet':
+        result = self
+        for other in map(self._other, others):
+            if result._rows is not None:
+                result = result._filter(True, other)
+            elif other._rows is not None:
+                result = other._filter(True, result)
+            else:
+                result = RowSet(self.universe, result._bits & other._bits)
+        return result
+
+    def isdisjoint(self, other: 'RowSet') -> bool:
+        other = self._other(other)
+        if self._rows is not None:
+            return not any(map(other._has_row, self._rows))
+        if other._rows is not None:
+            return not any(map(self._has_row, other._rows))
+        return not self._bits & other._bits
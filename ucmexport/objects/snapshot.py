@@ -0,0 +1,178 @@
+import logging
+import marshal
+import os
+import shutil
+from time import perf_counter
+from typing import Optional
+
+from .table import CsvTable
+from .tarindex import TarIndex
+
+__all__ = ['SnapshotCache', 'CACHE_SCHEMA_VERSION', 'CACHE_DIR']
+
+log = logging.getLogger(__name__)
+
+# version of the parsed representation stored in snapshots. Needs to be incremented whenever the parsed
+# representation changes so that existing snapshots are not used anymore
+CACHE_SCHEMA_VERSION = 2
+
+# name of the cache directory created next to the TAR file
+CACHE_DIR = '.ucmexport_cache'
+
+# magic at the beginning of each snapshot file
+SNAPSHOT_MAGIC = b'UCMSNAP\x00'
+
+
+class SnapshotCache:
+    """
+    On-disk cache of parsed CSV files of a TAR file.
+    Snapshots are stored in a directory specific to the identity of the TAR file (see TarIndex.fingerprint) and the
+    code schema version. Each CSV file is stored in a separate snapshot so that only the CSV files actually needed
+    have to be loaded.
+    """
+
+    def __init__(self, tar: TarIndex, cache_dir: Optional[str] = None):
+        """
+        :param tar: TAR file to cache parsed contents for
+        :param cache_dir: base directory for the cache. Default: directory .ucmexport_cache next to the TAR file
+        """
+        self.tar = tar
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.dirname(os.path.abspath(tar.tar)), CACHE_DIR)
+        self.cache_dir = cache_dir
+        self._directory: Optional[str] = None
+
+    def __repr__(self):
+        return f'SnapshotCache({self.directory})'
+
+    @property
+    def prefix(self) -> str:
+        """
+        Common prefix of the snapshot directories for this TAR file
+        """
+        return f'{os.path.basename(self.tar.tar)}.'
+
+    @property
+    def directory(self) -> str:
+        """
+        Directory with the snapshots of this TAR file
+        """
+        if self._directory is None:
+            self._directory = os.path.join(self.cache_dir,
+                                           f'{self.prefix}{self.tar.fingerprint[:16]}.v{CACHE_SCHEMA_VERSION}')
+        return self._directory
+
+    def path(self, name: str, variant: str = '') -> str:
+        """
+        Path of the snapshot for a TAR member
+        :param name: name of the TAR member
+        :param variant: optional variant of the snapshot; for example to distinguish different parsing options
+        :return: path of the snapshot file
+        """
+        if variant:
+            name = f'{name}.{variant}'
+        return os.path.join(self.directory, f'{name}.snap')
+
+    def load(self, name: str, variant: str = '') -> Optional[CsvTable]:
+        """
+        Load a parsed CSV file from the cache
+        :param name: name of the TAR member
+        :param variant: optional variant of the snapshot
+        :return: parsed table or None if no snapshot exists
+        """
+        data = self.load_data(name=name, variant=variant)
+        if data is None:
+            return None
+        header, rows = data
+        return CsvTable(header=header, rows=rows)
+
+    def store(self, name: str, table: CsvTable, variant: str = '') -> None:
+        """
+        Write a parsed CSV file to the cache
+        :param name: name of the TAR member
+        :param table: parsed table
+        :param variant: optional variant of the snapshot
+        """
+        self.store_data(name=name, data=(table.header, table.rows), variant=variant)
+
+    def load_data(self, name: str, variant: str = ''):
+        """
+        Load arbitrary data from a snapshot
+        :param name: name of the snapshot
+        :param variant: optional variant of the snapshot
+        :return: stored data or None if no (valid) snapshot exists or the cache can't be read
+        """
+        path = self.path(name=name, variant=variant)
+        start = perf_counter()
+        try:
+            with open(path, mode='rb') as f:
+                if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                    raise ValueError('invalid magic')
+                data = marshal.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            # cache location not usable; for example not a directory or no permission
+            log.debug(f'ignoring snapshot {path}: {e}')
+            return None
+        except (EOFError, ValueError, TypeError) as e:
+            log.warning(f'ignoring invalid snapshot {path}: {e}')
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        log.debug(f'loaded snapshot {path}: {(perf_counter() - start) * 1000:.2f}ms')
+        return data
+
+    def store_data(self, name: str, data, variant: str = '') -> None:
+        """
+        Write arbitrary data (anything marshal can serialize) to a snapshot. Nothing is written if the cache can't be
+        written to
+        :param name: name of the snapshot
+        :param data: data to store
+        :param variant: optional variant of the snapshot
+        """
+        path = self.path(name=name, variant=variant)
+        if not os.path.isdir(self.directory):
+            try:
+                self.remove_stale()
+                os.makedirs(self.directory, exist_ok=True)
+            except OSError as e:
+                # cache location not usable; for example a read-only directory. Snapshots are optional
+                log.debug(f'not writing snapshot {path}: {e}')
+                return
+        start = perf_counter()
+        # write to a temporary file first so that concurrent readers never see partial snapshots
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(temp_path, mode='wb') as f:
+                f.write(SNAPSHOT_MAGIC)
+                f.write(marshal.dumps(data))
+            os.replace(temp_path, path)
+        except OSError as e:
+            log.debug(f'failed to write snapshot {path}: {e}')
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+        log.debug(f'wrote snapshot {path}: {(perf_counter() - start) * 1000:.2f}ms')
+
+    def remove_stale(self) -> None:
+        """
+        Remove snapshot directories of previous versions of the TAR file
+        """
+        if not os.path.isdir(self.cache_dir):
+            return
+        current = os.path.basename(self.directory)
+        for entry in os.listdir(self.cache_dir):
+            if entry.startswith(self.prefix) and entry != current:
+                log.debug(f'removing stale snapshots {entry}')
+                shutil.rmtree(os.path.join(self.cache_dir, entry), ignore_errors=True)
+
+    def clear(self) -> None:
+        """
+        Remove all snapshots of this TAR file
+        """
+        shutil.rmtree(self.directory, ignore_errors=True)
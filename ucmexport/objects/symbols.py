@@ -0,0 +1,96 @@
+import logging
+from time import perf_counter
+from typing import Dict, List, Sequence
+
+from .table import CsvTable
+
+__all__ = ['SymbolTable']
+
+log = logging.getLogger(__name__)
+
+# number of rows used to determine the cardinality of columns
+LOW_CARDINALITY_SAMPLE = 1000
+
+# a column has low cardinality if the number of distinct values in the sample is at most this fraction of the number
+# of non-empty values in the sample
+LOW_CARDINALITY_RATIO = 0.1
+
+# all values of tables with at most this many rows are added to the symbol table. Small tables hold the objects
+# referenced by other tables (device pools, CSSes, locations, ...): their values are shared regardless of the order in
+# which tables are read
+SMALL_TABLE_ROWS = 1000
+
+
+class SymbolTable:
+    """
+    Interned values shared by all tables read for a Proxy. Values of columns with low cardinality (device pools, CSSes,
+    partitions, device types, ...) are replaced by a single instance of each value: this saves memory and identical
+    objects are cheaper to compare.
+    """
+
+    def __init__(self):
+        self._symbols: Dict[str, str] = dict()
+
+    def __len__(self):
+        return len(self._symbols)
+
+    def __repr__(self):
+        return f'SymbolTable({len(self)} symbols)'
+
+    def intern(self, value: str) -> str:
+        """
+        Get the interned instance of a value
+        :param value: value
+        :return: interned value
+        """
+        return self._symbols.setdefault(value, value)
+
+    @staticmethod
+    def low_cardinality_columns(header: Sequence[str], rows: Sequence[Sequence[str]]) -> List[int]:
+        """
+        Determine columns with low cardinality from a sample of rows
+        :param header: CSV header
+        :param rows: rows
+        :return: indices of the columns with low cardinality
+        """
+        sample = rows[:LOW_CARDINALITY_SAMPLE]
+        columns = []
+        for i in range(len(header)):
+            values = [v for row in sample if i < len(row) and (v := row[i])]
+            if values and len(set(values)) <= max(1, LOW_CARDINALITY_RATIO * len(values)):
+                columns.append(i)
+        return columns
+
+    def intern_table(self, table: CsvTable) -> List[int]:
+        """
+        Intern the values of a table. Identical values within the table are replaced by a single instance; values
+        also present in the symbol table are replaced by the instance from the symbol table. Only the values of columns
+        with low cardinality and the values of small tables are added to the symbol table.
+        Snapshots of interned tables only restore the instances shared within the table; tables loaded from snapshots
+        or transferred from other processes need to be interned again to share values with other tables.
+        :param table: parsed CSV file; the rows are replaced by tuples of interned values
+        :return: indices of the columns with low cardinality
+        """
+        rows = table.rows
+        if not rows:
+            return []
+        start = perf_counter()
+        columns = self.low_cardinality_columns(table.header, rows)
+        # interning all values is cheaper than only interning selected columns as it all happens in C; the values
+        # of columns with high cardinality don't stay in the symbol table though
+        values = dict(self._symbols)
+        setdefault = values.setdefault
+        rows = [tuple(map(setdefault, row, row)) for row in rows]
+        table.rows = rows
+        symbols = self._symbols
+        for row in rows[:LOW_CARDINALITY_SAMPLE]:
+            for i in columns:
+                if i < len(row) and (v := row[i]):
+                    symbols.setdefault(v, v)
+        if len(rows) <= SMALL_TABLE_ROWS:
+            for row in rows:
+                for v in row:
+                    symbols.setdefault(v, v)
+        log.debug(f'intern_table: {len(values)} distinct values, {len(columns)} of {len(table.header)} columns with '
+                  f'low cardinality, {(perf_counter() - start) * 1000:.2f}ms')
+        return columns
@@ -0,0 +1,97 @@
+import csv
+import logging
+from itertools import chain
+from typing import List, Dict, Iterator, Iterable, TextIO, Optional, Callable, Sequence
+
+from .projection import Projection, project_rows
+
+__all__ = ['CsvTable', 'read_table', 'read_rows']
+
+log = logging.getLogger(__name__)
+
+# CSV dialect used by UCM exports
+CSV_DIALECT = dict(delimiter=',', doublequote=True, escapechar=None, quotechar='"', skipinitialspace=True, strict=True)
+
+
+class CsvTable:
+    """
+    Parsed contents of a CSV file: header and list of rows. Each row is a sequence of values in the order of the
+    header
+    """
+    __slots__ = ['header', 'rows']
+
+    def __init__(self, header: List[str], rows: List[Sequence[str]]):
+        self.header = header
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def dicts(self) -> Iterator[Dict]:
+        """
+        Rows as dictionaries; same semantics as csv.DictReader: missing values are None and additional values are
+        collected in a list under the None key
+        """
+        return (row_dict(self.header, row) for row in self.rows)
+
+
+def row_dict(header: List[str], row: Sequence[str]) -> Dict:
+    """
+    Create a dictionary for a CSV row the same way csv.DictReader does
+    :param header: column names
+    :param row: values
+    :return: dictionary
+    """
+    d = dict(zip(header, row))
+    header_len = len(header)
+    row_len = len(row)
+    if header_len < row_len:
+        d[None] = list(row[header_len:])
+    elif header_len > row_len:
+        for key in header[row_len:]:
+            d[key] = None
+    return d
+
+
+def read_rows(file: TextIO, csv_file: str, upper_header: bool = True,
+              warn_lowercase_header: bool = True) -> Iterator[List[str]]:
+    """
+    Read rows from a CSV file. The first row yielded is the header.
+    :param file: text file to read from
+    :param csv_file: name of the CSV file; only used for logging
+    :param upper_header: convert header to uppercase
+    :param warn_lowercase_header: log a warning if the header was not uppercase
+    :return: iterator of rows; blank lines are skipped
+    """
+    lines: Iterable[str] = file
+    if upper_header:
+        def upper_first_line(it):
+            first_line = next(it, '')
+            first_line_upper = first_line.upper()
+            if warn_lowercase_header and first_line != first_line_upper:
+                logging.warning(f'found lowercase header in {csv_file}')
+            return chain([first_line_upper], it)
+
+        lines = upper_first_line(iter(file))
+    return (row for row in csv.reader(lines, **CSV_DIALECT) if row)
+
+
+def read_table(file: TextIO, csv_file: str, upper_header: bool = True, warn_lowercase_header: bool = True,
+               progress: Optional[Callable[[Iterator[List[str]]], Iterator[List[str]]]] = None,
+               projection: Optional[Projection] = None) -> CsvTable:
+    """
+    Read a complete CSV file
+    :param file: text file to read from
+    :param csv_file: name of the CSV file; only used for logging
+    :param upper_header: convert header to uppercase
+    :param warn_lowercase_header: log a warning if the header was not uppercase
+    :param progress: optional wrapper for the iterator of data rows
+    :param projection: optional projection; only the selected columns are kept
+    :return: parsed table
+    """
+    rows = read_rows(file=file, csv_file=csv_file, upper_header=upper_header,
+                     warn_lowercase_header=warn_lowercase_header)
+    header, rows = project_rows(header=next(rows, []), rows=rows, projection=projection)
+    if progress is not None:
+        rows = progress(rows)
+    return CsvTable(header=header, rows=list(rows))
@@ -0,0 +1,215 @@
+import hashlib
+import io
+import logging
+import os
+import tarfile
+from dataclasses import dataclass
+from tarfile import TarFile, TarInfo
+from time import perf_counter
+from typing import Dict, Optional, List, Union, IO
+
+__all__ = ['TarIndex', 'TarMember', 'MemberTiming']
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class TarMember:
+    """
+    Location of a member in a TAR file
+    """
+    name: str
+    offset: int
+    size: int
+    mtime: int
+    chksum: int
+    info: TarInfo
+
+
+@dataclass
+class MemberTiming:
+    """
+    Timing information for a TAR member: how often was the member opened, how many bytes were read and how much time
+    was spent between opening and closing the member (this includes the time the consumer spent on parsing)
+    """
+    name: str
+    size: int
+    reads: int = 0
+    bytes_read: int = 0
+    seconds: float = 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes_read / self.seconds if self.seconds else 0.0
+
+
+class _MemberFile(io.RawIOBase):
+    """
+    Raw file object giving access to the data of a single member of a TAR file
+    """
+
+    def __init__(self, file: IO[bytes], size: int, timing: MemberTiming):
+        """
+        :param file: file object positioned at the data of the member
+        :param size: size of the member
+        :param timing: timing information updated while reading
+        """
+        super(_MemberFile, self).__init__()
+        self._file = file
+        self._remaining = size
+        self._timing = timing
+        self._start = perf_counter()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = min(len(b), self._remaining)
+        if n <= 0:
+            return 0
+        n = self._file.readinto(memoryview(b)[:n])
+        self._remaining -= n
+        self._timing.bytes_read += n
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._file.close()
+            self._timing.seconds += perf_counter() - self._start
+        super(_MemberFile, self).close()
+
+
+class TarIndex:
+    """
+    Index of the members of a TAR file.
+    The TAR headers are only scanned once; after that each member can be opened directly at its data offset w/o having
+    to scan the TAR headers again.
+    Offsets of compressed TAR files refer to the decompressed stream: members are read from a TAR file object which is
+    opened once and kept open until close() is called. Members of compressed TAR files should be read one after the
+    other as reading them interleaved requires to decompress the stream again.
+    """
+
+    def __init__(self, tar: str):
+        """
+        :param tar: path of the TAR file
+        """
+        self.tar = tar
+        self._members: Optional[Dict[str, TarMember]] = None
+        # offsets are only usable for uncompressed TAR files
+        self._compressed = False
+        # open TAR file object for reading members of compressed TAR files
+        self._tar_file: Optional[TarFile] = None
+        self._fingerprint: Optional[str] = None
+        self.scan_seconds = 0.0
+        self.timing: Dict[str, MemberTiming] = dict()
+
+    def __str__(self):
+        return self.tar
+
+    def __repr__(self):
+        return f'TarIndex({self.tar})'
+
+    def __getstate__(self):
+        # the index is passed to worker processes; the TAR file object is opened again if needed
+        state = self.__dict__.copy()
+        state['_tar_file'] = None
+        return state
+
+    def close(self) -> None:
+        """
+        Close the TAR file object kept for reading members of compressed TAR files
+        """
+        if self._tar_file is not None:
+            self._tar_file.close()
+            self._tar_file = None
+
+    def _scan(self):
+        """
+        Read all TAR headers and build the member index
+        """
+        start = perf_counter()
+        try:
+            tar = TarFile.open(name=self.tar, mode='r:')
+        except tarfile.ReadError:
+            # compressed TAR file: offsets refer to the decompressed stream
+            tar = TarFile.open(name=self.tar, mode='r')
+            self._compressed = True
+        members = {ti.name: TarMember(name=ti.name, offset=ti.offset_data, size=ti.size, mtime=ti.mtime,
+                                      chksum=ti.chksum, info=ti)
+                   for ti in tar.getmembers() if ti.isfile()}
+        if self._compressed:
+            # keep the TAR file object so that members can be read w/o opening and scanning the TAR file again
+            self.close()
+            self._tar_file = tar
+        else:
+            tar.close()
+        self._members = members
+        self.scan_seconds = perf_counter() - start
+        log.debug(f'{self.tar}: indexed {len(members)} members in {self.scan_seconds * 1000:.2f}ms')
+
+    @property
+    def members(self) -> Dict[str, TarMember]:
+        if self._members is None:
+            self._scan()
+        return self._members
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.members)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.members
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Identity of the TAR file: hash over size and mtime of the TAR file and name, size, mtime and header checksum of
+        all members.
+        """
+        if self._fingerprint is None:
+            stat = os.stat(self.tar)
+            h = hashlib.sha1(f'{stat.st_size}:{stat.st_mtime_ns}'.encode())
+            for member in self.members.values():
+                h.update(f'{member.name}:{member.size}:{member.mtime}:{member.chksum}'.encode())
+            self._fingerprint = h.hexdigest()
+        return self._fingerprint
+
+    def open(self, name: str) -> IO[bytes]:
+        """
+        Open a member of the TAR file for binary reading
+        :param name: member name
+        :return: binary file object. Raises KeyError if the member does not exist
+        """
+        member = self.members[name]
+        timing = self.timing.get(name)
+        if timing is None:
+            timing = MemberTiming(name=name, size=member.size)
+            self.timing[name] = timing
+        timing.reads += 1
+        if not self._compressed:
+            file = open(self.tar, mode='rb')
+            file.seek(member.offset)
+        else:
+            if self._tar_file is None:
+                # index passed to a worker process
+                self._tar_file = TarFile.open(name=self.tar, mode='r')
+            file = self._tar_file.extractfile(member.info)
+        return io.BufferedReader(_MemberFile(file=file, size=member.size, timing=timing))
+
+    def open_text(self, name: str, encoding: str = 'utf-8') -> io.TextIOWrapper:
+        """
+        Open a member of the TAR file for reading text
+        :param name: member name
+        :param encoding: encoding
+        :return: text file object. Raises KeyError if the member does not exist
+        """
+        return io.TextIOWrapper(self.open(name), encoding=encoding)
+
+    @staticmethod
+    def of(tar: Union[str, 'TarIndex']) -> 'TarIndex':
+        """
+        Get a TAR index for a TAR file name or existing index
+        """
+        if isinstance(tar, TarIndex):
+            return tar
+        return TarIndex(tar=os.fspath(tar))
@@ -1,7 +1,8 @@
 import re
 from .base import *
+from .cssgraph import CssReference, ROLE_PATTERN_CSS
 
-from typing import List
+from typing import List, Iterator, Optional, Iterable
 
 __all__ = ['TranslationPattern', 'TranslationPatternContainer', 'TP_UNLIMITED']
 
@@ -113,3 +114,7 @@ class TranslationPatternContainer(CsvBase):
     @property
     def list(self) -> List[TranslationPattern]:
         return super(TranslationPatternContainer, self).list
+
+    def css_references(self, objects: Optional[Iterable] = None) -> Iterator[CssReference]:
+        return (CssReference.of(tp.css, tp, ROLE_PATTERN_CSS)
+                for tp in (self.list if objects is None else objects) if tp.css)
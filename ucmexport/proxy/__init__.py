@@ -1,11 +1,59 @@
 from ucmexport.objects import *
+from ucmexport.objects.base import CsvBase, ObjBase, parse_csv
 
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from itertools import chain
-from typing import List, Dict, Set
+import logging
+import marshal
+import os
+from time import perf_counter
+from typing import List, Dict, Set, Optional, Iterable, Tuple, Callable, Iterator, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+    from ucmexport.objects.linetable import LineTable
+
+log = logging.getLogger(__name__)
+
+
+def _parse_worker(tar: TarIndex, csv_file: str, snapshot: Optional[SnapshotCache], projection: Optional[Projection],
+                  symbols: Optional[SymbolTable],
+                  metrics: LoadMetrics) -> Tuple[Optional[bytes], Optional[MemberTiming], LoadMetrics]:
+    """
+    Parse a CSV file in a worker process
+    :param tar: TAR file index; the index is passed to the worker so that the worker does not need to scan the TAR file
+    :param csv_file: CSV file to parse
+    :param snapshot: snapshot cache; the worker also writes the snapshot
+    :param projection: projection to apply
+    :param symbols: copy of the symbol table of the parent process; values are interned within the table which keeps
+        the transfer to the parent process small. The parent process interns the values against its symbol table
+    :param metrics: metrics to update with the parse time
+    :return: marshalled header and rows of the parsed table, timing information for the TAR member, and metrics
+    """
+    table = parse_csv(tar=tar, csv_file=csv_file, snapshot=snapshot, projection=projection, symbols=symbols,
+                      metrics=metrics)
+    # marshal is considerably faster than pickle for transferring the parsed table to the parent process
+    data = None if table is None else marshal.dumps((table.header, table.rows))
+    metrics.source = 'worker'
+    return data, tar.timing.get(csv_file), metrics
 
 
 class Proxy:
-    def __init__(self, tar: str):
+    def __init__(self, tar: str, use_cache: bool = True, cache_dir: Optional[str] = None,
+                 projections: Optional[Dict[str, Projection]] = None, progress: Optional[ProgressReporter] = None):
+        """
+        :param tar: TAR file with UCM config export
+        :param use_cache: use snapshots of parsed CSV files to speed up loading
+        :param cache_dir: directory for snapshots. Default: directory .ucmexport_cache next to the TAR file
+        :param projections: columns to read for containers; keys are attribute names of containers. For example
+            {'phones': Projection(groups=['DIRECTORY NUMBER n', 'ROUTE PARTITION n'])}. Key columns of the containers
+            are always read
+        :param progress: reporter for the progress of reading CSV files; for example TqdmProgress(). Default: no
+            progress is reported. Metrics are available via stats() in any case
+        """
+        # all containers share the same index of the TAR file: the TAR headers only get scanned once
+        self.tar = TarIndex(tar)
+        tar = self.tar
         self.css = CssContainer(tar)
         self.device_pools = DevicePoolContainer(tar)
         self.directed_call_park = DirectedCallParkContainer(tar)
@@ -29,6 +77,318 @@ class Proxy:
         self.location_edge = LocationEdgeContainer(tar)
 
         self._dn_partition_by_enduser = None
+        self._references: Optional[ReferenceIndex] = None
+        self._css_graph: Optional[CssGraph] = None
+        self._ids: Optional[IdRegistry] = None
+        self._line_table: Optional['LineTable'] = None
+        # callbacks notified about deltas applied; see subscribe()
+        self._subscribers: List[Callable[[Dict[str, Delta]], None]] = []
+
+        self.snapshot = SnapshotCache(tar=self.tar, cache_dir=cache_dir) if use_cache else None
+        # values read from CSV files are interned; values of low cardinality columns are shared by all containers
+        self.symbols = SymbolTable()
+        self.progress = progress
+        for container in self.containers().values():
+            container.snapshot = self.snapshot
+            container.symbols = self.symbols
+            container.progress = progress
+        if projections:
+            self.set_projections(projections)
+
+    def set_projections(self, projections: Dict[str, Projection]) -> None:
+        """
+        Set projections for containers; only possible before the objects of the containers are read
+        :param projections: projections indexed by attribute names of containers
+        """
+        all_containers = self.containers()
+        if unknown := [name for name in projections if name not in all_containers]:
+            raise ValueError(f'unknown container(s): {", ".join(unknown)}')
+        for name, projection in projections.items():
+            all_containers[name].projection = projection
+
+    def containers(self) -> Dict[str, CsvBase]:
+        """
+        All containers of the proxy
+        :return: dictionary of containers indexed by attribute name
+        """
+        return {name: container for name, container in vars(self).items() if isinstance(container, CsvBase)}
+
+    @property
+    def references(self) -> ReferenceIndex:
+        """
+        Inverted index from DN:partition to all references to that DN:partition: lines and BLFs of phones and device
+        profiles, line group members, hunt pilots, remote destinations, call parks, directed call parks, call pickup
+        groups, directory numbers, and primary extensions of end users. Built in a single pass on first access
+        """
+        if self._references is None:
+            self._references = ReferenceIndex(self.containers().values())
+        return self._references
+
+    @property
+    def css_graph(self) -> CssGraph:
+        """
+        Bidirectional index between CSSes, partitions and the objects using CSSes: device, AAR and line CSSes of phones
+        and device profiles, CSSes of RDPs and translation patterns, and AAR CSSes of device pools. Built in a single
+        pass on first access
+        """
+        if self._css_graph is None:
+            self._css_graph = CssGraph(self.css, self.containers().values())
+        return self._css_graph
+
+    @property
+    def ids(self) -> IdRegistry:
+        """
+        Dense integer IDs for phones, device profiles, users, DN:partitions, partitions and line groups, and relations
+        between them keyed by these IDs; see build_id_registry(). Built in a single pass on first access and dropped
+        when a delta is applied
+        """
+        if self._ids is None:
+            self._ids = build_id_registry(phones=self.phones, device_profiles=self.device_profile,
+                                          end_users=self.end_user, line_groups=self.line_group)
+        return self._ids
+
+    @property
+    def line_table(self) -> 'LineTable':
+        """
+        Line appearances of phones and device profiles as NumPy arrays of integer codes; see LineTable. Built in a
+        single pass on first access and dropped when a delta is applied. Requires NumPy
+        """
+        if self._line_table is None:
+            # NumPy is only imported if the line table is used
+            from ucmexport.objects.linetable import build_line_table
+            self._line_table = build_line_table(phones=self.phones, device_profiles=self.device_profile)
+        return self._line_table
+
+    # frames of line appearances in addition to the frames of the containers: frame name -> container attribute name
+    LINE_FRAMES = {'phone_lines': 'phones', 'device_profile_lines': 'device_profile'}
+
+    def to_frames(self, names: Optional[Iterable[str]] = None) -> Dict[str, 'DataFrame']:
+        """
+        pandas DataFrames for containers and for the line appearances of phones and device profiles; built from the
+        parsed CSV files w/o creating objects. See CsvBase.to_frame() and lines_frame(). Requires pandas
+        :param names: attribute names of containers (for example 'phones', 'end_user', 'hunt_pilot') and/or names of
+            line frames ('phone_lines', 'device_profile_lines'). Default: all containers and line frames
+        :return: frames indexed by name
+        """
+        all_containers = self.containers()
+        if names is None:
+            names = list(all_containers) + list(self.LINE_FRAMES)
+        else:
+            names = list(dict.fromkeys(names))
+        if unknown := [name for name in names if name not in all_containers and name not in self.LINE_FRAMES]:
+            raise ValueError(f'unknown container(s): {", ".join(unknown)}')
+        start = perf_counter()
+        frames = dict()
+        for name in names:
+            if (container_name := self.LINE_FRAMES.get(name)) is not None:
+                frames[name] = all_containers[container_name].lines_frame()
+            else:
+                frames[name] = all_containers[name].to_frame()
+        log.debug(f'to_frames: {len(frames)} frames in {(perf_counter() - start) * 1000:.2f}ms')
+        return frames
+
+    def subscribe(self, callback: Callable[[Dict[str, Delta]], None]) -> Callable[[Dict[str, Delta]], None]:
+        """
+        Register a callback to be notified about deltas applied; see apply_delta()
+        :param callback: called with the changes applied indexed by attribute name of the container
+        :return: callback; for use with unsubscribe()
+        """
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback: Callable[[Dict[str, Delta]], None]) -> None:
+        """
+        Remove a callback registered with subscribe()
+        """
+        self._subscribers.remove(callback)
+
+    def apply_delta(self, added: Optional[Dict[str, Iterable[Dict[str, str]]]] = None,
+                    changed: Optional[Dict[str, Iterable[Dict[str, str]]]] = None,
+                    removed: Optional[Dict[str, Iterable]] = None) -> Dict[str, Delta]:
+        """
+        Apply row changes to the containers, for example the differences between two exports, w/o reading the
+        containers again. All indexes built so far are updated incrementally: indexes of the containers, references and
+        the CSS graph. The changes of all containers are validated before any container is changed: nothing is changed
+        if any of the changes can't be applied. Subscribers are notified about the changes applied; see subscribe()
+        :param added: rows of new objects indexed by attribute name of the container; see CsvBase.apply_delta()
+        :param changed: complete rows of changed objects indexed by attribute name of the container
+        :param removed: keys of objects to remove indexed by attribute name of the container
+        :return: changes applied indexed by attribute name of the container; only containers with changes are included
+        """
+        added = added or dict()
+        changed = changed or dict()
+        removed = removed or dict()
+        all_containers = self.containers()
+        names = list(dict.fromkeys(chain(added, changed, removed)))
+        if unknown := [name for name in names if name not in all_containers]:
+            raise ValueError(f'unknown container(s): {", ".join(unknown)}')
+        start = perf_counter()
+        # all changes are validated before any container is changed
+        prepared: Dict[str, Delta] = dict()
+        for name in names:
+            delta = all_containers[name].prepare_delta(added=added.get(name, ()), changed=changed.get(name, ()),
+                                                       removed=removed.get(name, ()))
+            if delta:
+                prepared[name] = delta
+        deltas: Dict[str, Delta] = dict()
+        try:
+            for name, delta in prepared.items():
+                container = all_containers[name]
+                container.commit_delta(delta)
+                deltas[name] = delta
+                old_objects, new_objects = delta.old_objects, delta.new_objects
+                if self._references is not None:
+                    self._references.discard(container.dn_references(old_objects))
+                    self._references.add(container.dn_references(new_objects))
+                if self._css_graph is not None:
+                    self._css_graph.discard(container.css_references(old_objects))
+                    self._css_graph.add(container.css_references(new_objects))
+                    if container is self.css:
+                        self._css_graph.update_css(self.css)
+        finally:
+            # derived data and subscribers need to reflect the containers changed even if a later container fails
+            if deltas:
+                self._dn_partition_by_enduser = None
+                # IDs are dense: removed objects would leave gaps
+                self._ids = None
+                self._line_table = None
+                log.debug(f'apply_delta: {", ".join(f"{name}: {delta}" for name, delta in deltas.items())} in '
+                          f'{(perf_counter() - start) * 1000:.2f}ms')
+                for callback in list(self._subscribers):
+                    callback(deltas)
+        return deltas
+
+    def query(self, target: Union[str, type, CsvBase]) -> Query:
+        """
+        Query the objects of a container; see Query
+        :param target: container, attribute name of a container, or class of the objects; for example Phone
+        :return: query
+        """
+        if isinstance(target, CsvBase):
+            return Query(target)
+        all_containers = self.containers()
+        if isinstance(target, str):
+            container = all_containers.get(target)
+        else:
+            container = next((c for c in all_containers.values() if c.factory is target), None)
+        if container is None:
+            raise ValueError(f'unknown container: {target}')
+        return Query(container)
+
+    def stats(self) -> Dict[str, LoadMetrics]:
+        """
+        Metrics for all containers read so far: rows, rows/s, bytes/s, parse time and time to create the objects
+        :return: metrics indexed by attribute name of the container
+        """
+        return {name: container.metrics for name, container in self.containers().items()
+                if container.metrics is not None}
+
+    def index_stats(self) -> Dict[str, Dict[str, IndexStats]]:
+        """
+        Build time and memory of all indexes built so far
+        :return: statistics indexed by attribute name of the container and index name; only containers with indexes
+            are included
+        """
+        return {name: dict(stats) for name, container in self.containers().items()
+                if (stats := container.index_stats)}
+
+    def coercion_errors(self) -> Dict[str, List[CoercionError]]:
+        """
+        Values of typed columns which could not be coerced; only containers already read are considered
+        :return: errors indexed by attribute name of the container; only containers with errors are included
+        """
+        return {name: errors for name, container in self.containers().items()
+                if (errors := container.coercion_errors)}
+
+    def preload(self, containers: Optional[Iterable[str]] = None, workers: Optional[int] = None) -> None:
+        """
+        Read the CSV files of multiple containers concurrently. CSV files are parsed in worker processes and the parsed
+        tables are installed into the containers as they become available. Containers which already have been read
+        and CSV files available as snapshots are not handed to the workers.
+        :param containers: attribute names of the containers to read; default: all containers
+        :param workers: number of worker processes; default: number of CPUs
+        """
+        all_containers = self.containers()
+        if containers is None:
+            containers = list(all_containers)
+        else:
+            containers = list(containers)
+            if unknown := [name for name in containers if name not in all_containers]:
+                raise ValueError(f'unknown container(s): {", ".join(unknown)}')
+        pending = [all_containers[name] for name in containers if not all_containers[name].loaded]
+        start = perf_counter()
+
+        # snapshots are loaded directly; that's cheaper than transferring the parsed tables from a worker
+        to_parse: List[CsvBase] = []
+        for container in pending:
+            table = None
+            metrics = container.new_metrics()
+            if self.snapshot is not None:
+                projection = container.projection
+                load_start = perf_counter()
+                table = self.snapshot.load(container.csv_file(),
+                                           variant='' if projection is None else projection.signature)
+                if table is not None:
+                    self.symbols.intern_table(table)
+                    metrics.source = 'snapshot'
+                    metrics.rows = len(table)
+                    metrics.bytes = getattr(self.tar.members.get(container.csv_file()), 'size', 0)
+                    metrics.parse_seconds = perf_counter() - load_start
+            if table is None:
+                to_parse.append(container)
+            else:
+                container.install(table, metrics=metrics)
+
+        # start with the largest CSV files; the total time is bounded by the largest CSV file
+        members = self.tar.members
+        to_parse.sort(key=lambda c: getattr(members.get(c.csv_file()), 'size', 0), reverse=True)
+        workers = min(workers or os.cpu_count() or 1, len(to_parse))
+        if workers <= 1:
+            for container in to_parse:
+                metrics = container.new_metrics()
+                container.install(container.read_table(metrics=metrics), metrics=metrics)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(_parse_worker, self.tar, container.csv_file(), self.snapshot,
+                                           container.projection, self.symbols, container.new_metrics()): container
+                           for container in to_parse}
+                for future in as_completed(futures):
+                    container = futures[future]
+                    data, timing, metrics = future.result()
+                    if timing is not None:
+                        self.tar.timing[timing.name] = timing
+                    # transferring the table to the parent process and interning are part of parsing
+                    load_start = perf_counter()
+                    table = None
+                    if data is not None:
+                        table = CsvTable(*marshal.loads(data))
+                        # the worker interned against a copy of the symbol table
+                        self.symbols.intern_table(table)
+                    metrics.parse_seconds += perf_counter() - load_start
+                    container.install(table, metrics=metrics)
+        log.debug(f'preload: {len(pending)} containers ({len(to_parse)} parsed by {workers} workers) in '
+                  f'{(perf_counter() - start) * 1000:.2f}ms')
+
+    def stream(self, container: str, where: Optional[Callable[[Dict], bool]] = None, **columns) -> Iterator[ObjBase]:
+        """
+        Iterate over the objects of a container w/o reading all objects into memory; see CsvBase.iter()
+        :param container: attribute name of the container; for example "phones"
+        :param where: optional predicate applied to the row dictionary before an object is created
+        :param columns: column filters applied before an object is created
+        :return: iterator of objects
+        """
+        try:
+            c = self.containers()[container]
+        except KeyError:
+            raise ValueError(f'unknown container: {container}')
+        return c.iter(where=where, **columns)
+
+    def member_timing(self) -> Dict[str, MemberTiming]:
+        """
+        Timing information for all TAR members read so far
+        :return: dictionary of timing information indexed by member name
+        """
+        return dict(self.tar.timing)
 
     def dn_partition_by_enduser(self) -> Dict[EndUser, Set[str]]:
         """
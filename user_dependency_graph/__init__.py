@@ -162,15 +162,18 @@ class UserGraph(nx.Graph):
         print('Related users based on hunt pilots...')
         users_added = 0
         ignore_uid = self.ignore_uid(proxy)
+        ids = proxy.ids
+        phones_by_dnp = ids.relation(ID_DN_AND_PARTITION, ID_PHONE)
+        users_by_phone = ids.relation(ID_PHONE, ID_USER)
         for hunt_pilot in proxy.hunt_pilot.list:
             hp_node = self.hunt_pilot_node(hunt_pilot)
             # all patterns:partitions on all line groups
             dnps = hunt_pilot.pattern_and_partition_set(proxy.hunt_pilot)
             # now we want to get the set of users on all phones with these dns
             # start with all phones that have any of these dns
-            phones = set(chain.from_iterable(proxy.phones.by_dn_and_partition.get(dnp, []) for dnp in dnps))
+            phones = phones_by_dnp.targets_of(ids[ID_DN_AND_PARTITION].ids(dnps))
             # finally get all users associated with these phones
-            user_ids = set(chain.from_iterable(phone.user_set for phone in phones))
+            user_ids = set(ids[ID_USER].keys(users_by_phone.targets_of(phones)))
             user_ids -= ignore_uid
             # .. and we only want to look at users which actually exist as end users
             users = [user for user_id in user_ids